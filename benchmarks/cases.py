@@ -0,0 +1,142 @@
+"""Benchmark cases, each measured at every catalog size.
+
+A case receives the synthetic dataset, the threaded fake Grocy server serving
+it and an aiohttp session, and returns the coroutine factory to time.
+"""
+
+import random
+from datetime import timedelta
+
+from homeassistant.util import dt
+
+from custom_components.shopping_list_with_grocy.analysis_const import (
+    SUGGESTION_HISTORY_DAYS,
+    SUGGESTION_RAW_HISTORY_DAYS,
+)
+from custom_components.shopping_list_with_grocy.ml_engine import (
+    PurchasePredictionEngine,
+    merge_history,
+    statistics_to_history,
+)
+from custom_components.shopping_list_with_grocy.transform import (
+    build_item_list,
+    parse_products,
+)
+from tests.fake_grocy import make_api, make_hass
+
+SEARCH_TERMS = ["organic milk", "Fresh Bread", "coffe", "dragon fruit"]
+
+
+def case_retrieve_data(data, grocy, session):
+    """A full forced refresh: every table fetched, transformed and dispatched."""
+
+    async def run():
+        api = make_api(grocy, session)
+        grocy.requests.clear()
+        result = await api.retrieve_data(force=True)
+        return {
+            "requests": grocy.request_count(),
+            "products": len(result["homeassistant_products"]),
+        }
+
+    return run
+
+
+def case_retrieve_data_unchanged(data, grocy, session):
+    """A poll that finds the Grocy database unchanged."""
+    api = None
+
+    async def run():
+        nonlocal api
+        if api is None:
+            api = make_api(grocy, session)
+            await api.retrieve_data()
+        grocy.requests.clear()
+        await api.retrieve_data()
+        return {"requests": grocy.request_count()}
+
+    return run
+
+
+def case_parse_products(data, grocy, session):
+    async def run():
+        return {"products": len(parse_products(data))}
+
+    return run
+
+
+def case_build_item_list(data, grocy, session):
+    async def run():
+        return {"lists": len(build_item_list(data))}
+
+    return run
+
+
+def case_search_products(data, grocy, session):
+    """Exact, contains, fuzzy and missing product searches."""
+    api = make_api(grocy, session)
+    api.final_data = {"products": data["products"]}
+
+    async def run():
+        found = 0
+        for term in SEARCH_TERMS:
+            result = await api.search_product_in_grocy(term)
+            found += len(result["matches"])
+        return {"matches": found}
+
+    return run
+
+
+def synthetic_statistics(product_id: int, now) -> list:
+    """Return a year of daily max statistics for one product sensor."""
+    rng = random.Random(product_id)
+    interval = rng.randint(5, 40)
+    start = now - timedelta(days=SUGGESTION_HISTORY_DAYS)
+    rows = []
+    on_list = 0
+    for day in range(SUGGESTION_HISTORY_DAYS - SUGGESTION_RAW_HISTORY_DAYS):
+        if day % interval == 0:
+            on_list = rng.randint(1, 3)
+        elif on_list and rng.random() < 0.5:
+            on_list = 0
+        rows.append({"start": start + timedelta(days=day), "max": float(on_list)})
+    return rows
+
+
+def case_suggestions(data, grocy, session):
+    """Score every product from a year of statistics, as the daily job does.
+
+    The recorder queries are left out: their cost depends on the database,
+    not on this integration.
+    """
+    now = dt.utcnow()
+    recent_start = now - timedelta(days=SUGGESTION_RAW_HISTORY_DAYS)
+    statistics = {
+        product["id"]: synthetic_statistics(product["id"], now)
+        for product in data["products"]
+    }
+    engine = PurchasePredictionEngine(make_hass(), {})
+
+    async def run():
+        suggested = 0
+        for product in data["products"]:
+            history = merge_history(
+                statistics_to_history(statistics[product["id"]]), [], recent_start
+            )
+            analysis = await engine.analyze_purchase_patterns(
+                f"sensor.product_{product['id']}", history, product["name"]
+            )
+            suggested += engine.should_suggest_purchase(analysis)
+        return {"suggested": suggested}
+
+    return run
+
+
+CASES = {
+    "retrieve_data": case_retrieve_data,
+    "retrieve_data_unchanged": case_retrieve_data_unchanged,
+    "parse_products": case_parse_products,
+    "build_item_list": case_build_item_list,
+    "search_products": case_search_products,
+    "suggestions": case_suggestions,
+}
@@ -0,0 +1,109 @@
+"""Measurement helpers shared by the benchmark cases.
+
+The fake Grocy server runs on its own event loop in a background thread, so
+the time it spends serving pages is not counted as loop-blocking time of the
+integration under test.
+"""
+
+import asyncio
+import threading
+import time
+import tracemalloc
+from typing import Self
+
+from tests.fake_grocy import FakeGrocyServer
+
+# Lag of the loop monitor's timer below this is scheduling noise, not blocking.
+BLOCK_THRESHOLD = 0.002
+
+
+class LoopMonitor:
+    """Measures how long the running event loop was blocked."""
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.blocked = 0.0
+        self.max_block = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        last = loop.time()
+        while True:
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            lag = now - last - self.interval
+            if lag > BLOCK_THRESHOLD:
+                self.blocked += lag
+                self.max_block = max(self.max_block, lag)
+            last = now
+
+    async def __aenter__(self) -> Self:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        # Let the monitor take its first timestamp before the case starts.
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # One more tick accounts for a block that ended the case.
+        await asyncio.sleep(self.interval * 2)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+async def measure(run, repeat: int = 3) -> dict:
+    """Run the ``run()`` coroutine factory and return its best timings.
+
+    Wall and loop-blocking times are the fastest of *repeat* runs; the peak
+    memory is measured by one extra run under tracemalloc, which slows code
+    down too much to be timed at the same time. Any dict returned by ``run``
+    (request counts, result sizes) is merged into the result.
+    """
+    best = None
+    extra = {}
+    for _ in range(repeat):
+        async with LoopMonitor() as monitor:
+            started = time.perf_counter()
+            extra = await run() or {}
+            wall = time.perf_counter() - started
+        if best is None or wall < best["wall_ms"] / 1000:
+            best = {
+                "wall_ms": round(wall * 1000, 2),
+                "loop_blocked_ms": round(monitor.blocked * 1000, 2),
+                "max_block_ms": round(monitor.max_block * 1000, 2),
+            }
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        await run()
+        best["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+    return {**best, **extra}
+
+
+class ThreadedFakeGrocy:
+    """A FakeGrocyServer running on an event loop in a background thread."""
+
+    def __init__(self, data: dict, **options) -> None:
+        self.server = FakeGrocyServer(data, **options)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="fake-grocy", daemon=True
+        )
+
+    def __enter__(self) -> FakeGrocyServer:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self._loop).result()
+        return self.server
+
+    def __exit__(self, *exc_info) -> None:
+        asyncio.run_coroutine_threadsafe(self.server.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
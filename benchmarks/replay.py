@@ -0,0 +1,101 @@
+"""Replay a Grocy traffic capture against the integration, offline.
+
+    python -m benchmarks.replay capture.jsonl.gz
+    python -m benchmarks.replay capture.jsonl.gz --realtime --profile refresh.prof
+    python -m benchmarks.replay capture.jsonl.gz --search "milk" --search "eggs"
+
+Captures are recorded with the ``capture_traffic`` service. The refresh and
+the searches run against the recorded responses, optionally with their
+recorded latency, and the refresh metrics are printed.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import json
+import logging
+import pstats
+import sys
+import time
+
+from custom_components.shopping_list_with_grocy.apis.shopping_list_with_grocy import (
+    ShoppingListWithGrocyApi,
+)
+from custom_components.shopping_list_with_grocy.apis.traffic_capture import (
+    REPLAY_ORIGIN,
+    ReplaySession,
+    load_capture,
+)
+from tests.fake_grocy import make_hass
+
+
+async def replay(path: str, realtime: bool, speed: float, searches: list) -> dict:
+    meta, entries = load_capture(path)
+    session = ReplaySession(entries, realtime=realtime, speed=speed)
+    api = ShoppingListWithGrocyApi(
+        session,
+        make_hass(),
+        {
+            "api_url": REPLAY_ORIGIN,
+            "api_key": "replay",
+            "max_requests_per_second": 0,
+        },
+    )
+
+    started = time.perf_counter()
+    data = await api.retrieve_data(force=True)
+    refresh_ms = (time.perf_counter() - started) * 1000
+
+    search_ms = {}
+    for term in searches:
+        started = time.perf_counter()
+        result = await api.search_product_in_grocy(term)
+        search_ms[term] = {
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+            "search_type": result.get("search_type"),
+            "matches": len(result.get("matches", [])),
+        }
+
+    return {
+        "capture": meta,
+        "refresh_ms": round(refresh_ms, 2),
+        "products": len((data or {}).get("homeassistant_products", {})),
+        "requests": session.requests,
+        "unmatched_requests": session.unmatched,
+        "searches": search_ms,
+        "metrics": api.metrics.summary()["last_refresh"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", help="capture file (.jsonl.gz)")
+    parser.add_argument(
+        "--realtime", action="store_true", help="delay responses as recorded"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="realtime speed-up factor"
+    )
+    parser.add_argument(
+        "--search", action="append", default=[], help="product search to replay"
+    )
+    parser.add_argument("--profile", help="write cProfile stats to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    report = asyncio.run(replay(args.capture, args.realtime, args.speed, args.search))
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+    print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
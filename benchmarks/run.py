@@ -0,0 +1,140 @@
+"""Run the benchmark suite and compare it with the stored baseline.
+
+    python -m benchmarks.run                      # default sizes, compare
+    python -m benchmarks.run --sizes 1000,50000   # other catalog sizes
+    python -m benchmarks.run --update-baseline    # store a new baseline
+
+Results are written as JSON. The run fails (exit code 1) when a case is
+slower, blocks the loop longer, uses more memory or makes more requests than
+the baseline allows.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+import aiohttp
+
+from tests.fake_grocy import generate_dataset
+
+from .cases import CASES
+from .harness import ThreadedFakeGrocy, measure
+
+BENCHMARKS_DIR = Path(__file__).parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCHMARKS_DIR / "results.json"
+DEFAULT_SIZES = [1000, 10000]
+
+# Allowed growth over the baseline per metric: (relative, absolute floor).
+# The floor keeps millisecond-scale cases from failing on timer noise.
+TOLERANCES = {
+    "wall_ms": (0.30, 5.0),
+    "loop_blocked_ms": (0.30, 5.0),
+    "peak_kib": (0.20, 256.0),
+    "requests": (0.0, 0.0),
+}
+
+
+async def run_suite(sizes: list[int], cases: list[str], repeat: int) -> dict:
+    results = {}
+    for size in sizes:
+        data = generate_dataset(size)
+        with ThreadedFakeGrocy(data) as grocy:
+            async with aiohttp.ClientSession() as session:
+                for name in cases:
+                    run = CASES[name](data, grocy, session)
+                    key = f"{name}[{size}]"
+                    results[key] = await measure(run, repeat)
+                    print(f"{key:40} {_format(results[key])}")
+    return {
+        "meta": {
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def _format(result: dict) -> str:
+    return "  ".join(f"{key}={value}" for key, value in result.items())
+
+
+def compare_results(current: dict, baseline: dict) -> list[str]:
+    """Return a description of every metric that regressed beyond tolerance."""
+    regressions = []
+    for key, base in baseline.get("results", {}).items():
+        result = current.get("results", {}).get(key)
+        if result is None:
+            continue
+        for metric, (relative, floor) in TOLERANCES.items():
+            if metric not in base or metric not in result:
+                continue
+            limit = max(base[metric] * (1 + relative), base[metric] + floor)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{key} {metric}: {result[metric]} > {round(limit, 2)} "
+                    f"(baseline {base[metric]})"
+                )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="comma separated catalog sizes",
+    )
+    parser.add_argument(
+        "--cases", default=",".join(CASES), help="comma separated case names"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store this run as the new baseline instead of comparing",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    # Searches that find nothing are logged as errors; that is expected here.
+    logging.getLogger("custom_components").setLevel(logging.CRITICAL)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    cases = args.cases.split(",")
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    current = asyncio.run(run_suite(sizes, cases, args.repeat))
+    args.output.write_text(json.dumps(current, indent=2) + "\n")
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, nothing to compare")
+        return 0
+
+    regressions = compare_results(current, json.loads(args.baseline.read_text()))
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print("No regression against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,19 +7,34 @@ from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, asyncio
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
+from homeassistant.helpers.entity_registry import (
+    async_entries_for_config_entry,
+)
+from homeassistant.helpers.entity_registry import (
+    async_get as async_get_entity_registry,
+)
 
+from .analysis_const import CONF_ANALYSIS_SETTINGS
 from .apis.shopping_list_with_grocy import ShoppingListWithGrocyApi
-from .const import DOMAIN
+from .const import CONF_ENABLE_LOOP_WATCHDOG, DOMAIN
 from .coordinator import ShoppingListWithGrocyCoordinator
+from .entity_index import get_entity_index
 from .frontend import async_setup_frontend, async_unload_frontend
+from .image_cache import async_setup_image_view
+from .loop_watchdog import LoopWatchdog
+from .pinned_products import async_load_pinned_products
 from .schema import configuration_schema
 from .services import (
     async_remove_restart_repair_issue,
     async_setup_services,
+    async_stop_traffic_capture,
     async_unload_services,
 )
+from .suggestions import get_suggestion_manager
+from .translation_service import async_get_translation_service
 from .utils import update_domain_data
+from .webhook import async_register_refresh_webhook, async_unregister_refresh_webhook
+from .websocket_api import async_setup_websocket_api
 
 LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +47,7 @@ PLATFORMS: list[Platform] = [
 ]
 
 MIN_TIME_BETWEEN_UPDATES = timedelta(seconds=60)
+V1_PRODUCT_PREFIX = "sensor.shopping_list_with_grocy_product_v1_"
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
@@ -50,6 +66,9 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         LOGGER.error("Failed to set up frontend: %s", str(e))
         pass
 
+    await async_get_translation_service(hass)
+    async_setup_websocket_api(hass)
+
     update_domain_data(hass, "configuration", CONFIG_SCHEMA(config).get(DOMAIN, {}))
     return True
 
@@ -87,6 +106,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     coordinator = ShoppingListWithGrocyCoordinator(hass, session, entry, api)
 
     api.coordinator = coordinator
+    async_setup_image_view(hass, api.image_cache)
 
     hass.data[DOMAIN]["instances"]["coordinator"] = coordinator
     hass.data[DOMAIN]["instances"]["session"] = session
@@ -97,7 +117,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     if "shopping_lists" not in hass.data[DOMAIN]:
         hass.data[DOMAIN]["shopping_lists"] = []
 
-    deleted = await remove_restored_entities(hass)
+    # A setup retry must not leave the previous watchdog running.
+    previous_watchdog = hass.data[DOMAIN]["instances"].pop("loop_watchdog", None)
+    if previous_watchdog is not None:
+        previous_watchdog.stop()
+    if config.get(CONF_ENABLE_LOOP_WATCHDOG, False):
+        watchdog = LoopWatchdog(hass.loop)
+        watchdog.start()
+        hass.data[DOMAIN]["instances"]["loop_watchdog"] = watchdog
+
+    get_entity_index(hass).seed_from_registry(hass, entry.entry_id)
+    await async_load_pinned_products(hass)
+    suggestion_manager = get_suggestion_manager(hass)
+    await suggestion_manager.async_load()
+
+    deleted = await remove_restored_entities(hass, entry)
 
     if deleted:
         await asyncio.sleep(3)
@@ -110,6 +144,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     async_setup_services(hass)
+    suggestion_manager.async_start(coordinator, config.get(CONF_ANALYSIS_SETTINGS))
+
+    try:
+        await async_register_refresh_webhook(hass, entry)
+    except Exception as e:
+        LOGGER.warning("Unable to register Grocy change webhook: %s", str(e))
 
     try:
         await async_remove_restart_repair_issue(hass)
@@ -190,7 +230,7 @@ async def remove_old_entities_and_init(
     entry: ConfigEntry,
     coordinator: ShoppingListWithGrocyCoordinator,
 ):
-    deleted = await remove_restored_entities(hass)
+    deleted = await remove_restored_entities(hass, entry)
 
     if deleted:
         await asyncio.sleep(3)
@@ -214,10 +254,26 @@ async def remove_old_entities_and_init(
         pass
 
 
-async def remove_restored_entities(hass: HomeAssistant):
+async def remove_restored_entities(hass: HomeAssistant, entry: ConfigEntry):
     entity_registry = async_get_entity_registry(hass)
 
-    entities = set(hass.states.async_entity_ids())
+    entities = {
+        "switch.shoppinglistwithgrocy_pause_update",
+        "binary_sensor.shoppinglistwithgrocy_update_in_progress",
+    }
+    entities.update(
+        registry_entry.entity_id
+        for registry_entry in async_entries_for_config_entry(
+            entity_registry, entry.entry_id
+        )
+    )
+    # Restored v1 product states may have no registry entry for this config
+    # entry; scan the sensor states, not every entity id, for them.
+    entities.update(
+        entity_id
+        for entity_id in hass.states.async_entity_ids("sensor")
+        if entity_id.startswith(V1_PRODUCT_PREFIX)
+    )
 
     rex = re.compile(
         r"^sensor\.shopping_list_with_grocy_product_v1_.+|switch\.shoppinglistwithgrocy_pause_update|binary_sensor\.shoppinglistwithgrocy_update_in_progress$"
@@ -324,6 +380,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     except Exception as e:
         LOGGER.error("Failed to unload frontend: %s", str(e))
 
+    async_unregister_refresh_webhook(hass, entry)
+    get_suggestion_manager(hass).async_stop()
+    watchdog = hass.data.get(DOMAIN, {}).get("instances", {}).get("loop_watchdog")
+    if watchdog is not None:
+        watchdog.stop()
+    await async_stop_traffic_capture(hass)
+
     unload_ok = all(
         await asyncio.gather(
             *[
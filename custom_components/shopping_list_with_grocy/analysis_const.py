@@ -6,11 +6,23 @@ DEFAULT_SEASONAL_WEIGHT = 0.1
 
 DEFAULT_SCORE_THRESHOLD = 0.3
 
+# Suggestions are recomputed in the background every day at this hour and
+# after this many shopping list changes (0 disables change-triggered runs).
+DEFAULT_REFRESH_HOUR = 3
+DEFAULT_REFRESH_AFTER_CHANGES = 10
+
+# Suggestions read daily long-term statistics for the whole seasonal window and
+# raw recorder states only for the most recent days.
+SUGGESTION_HISTORY_DAYS = 365
+SUGGESTION_RAW_HISTORY_DAYS = 10
+
 CONF_ANALYSIS_SETTINGS = "analysis_settings"
 CONF_CONSUMPTION_WEIGHT = "consumption_weight"
 CONF_FREQUENCY_WEIGHT = "frequency_weight"
 CONF_SEASONAL_WEIGHT = "seasonal_weight"
 CONF_SCORE_THRESHOLD = "score_threshold"
+CONF_REFRESH_HOUR = "refresh_hour"
+CONF_REFRESH_AFTER_CHANGES = "refresh_after_changes"
 
 ANALYSIS_SCHEMA = vol.Schema(
     {
@@ -26,5 +38,11 @@ ANALYSIS_SCHEMA = vol.Schema(
         vol.Required(CONF_SCORE_THRESHOLD, default=DEFAULT_SCORE_THRESHOLD): vol.All(
             vol.Coerce(float), vol.Range(min=0.0, max=1.0)
         ),
+        vol.Required(CONF_REFRESH_HOUR, default=DEFAULT_REFRESH_HOUR): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=23)
+        ),
+        vol.Required(
+            CONF_REFRESH_AFTER_CHANGES, default=DEFAULT_REFRESH_AFTER_CHANGES
+        ): vol.All(vol.Coerce(int), vol.Range(min=0)),
     }
 )
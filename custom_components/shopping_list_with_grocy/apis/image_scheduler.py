@@ -0,0 +1,122 @@
+"""Prioritized download queue for product pictures.
+
+After each refresh the API hands over the pictures it still needs, each with
+a priority: products on a shopping list first, then pinned and suggested
+products, then the rest of the catalog. A few workers download them in that
+order. Scheduling again replaces the work list: products that are no longer
+wanted (removed from the catalog, or whose picture changed) are dropped from
+the queue and their download in progress is cancelled.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import Awaitable, Callable
+
+from homeassistant.core import HomeAssistant
+
+LOGGER = logging.getLogger(__name__)
+
+PRIORITY_SHOPPING_LIST = 0
+PRIORITY_FEATURED = 1
+PRIORITY_CATALOG = 2
+
+
+class ImageScheduler:
+    """Runs picture downloads by priority, *concurrency* at a time."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        fetch: Callable[[str, str], Awaitable[bool]],
+        concurrency: int,
+    ) -> None:
+        self._hass = hass
+        self._fetch = fetch
+        self.concurrency = concurrency
+        # (priority, sequence, product id, picture); entries that no longer
+        # match _pending are skipped when popped.
+        self._heap: list[tuple[int, int, str, str]] = []
+        self._sequence = itertools.count()
+        self._pending: dict[str, tuple[int, str]] = {}
+        self._in_flight: dict[str, tuple[str, asyncio.Task]] = {}
+        self._workers = 0
+        self.fetched = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def schedule(self, wanted: dict[str, tuple[int, str]]) -> None:
+        """Make *wanted* (product id -> (priority, picture)) the work list."""
+        for product_id in [pid for pid in self._pending if pid not in wanted]:
+            del self._pending[product_id]
+            self.cancelled += 1
+
+        for product_id, (picture, task) in list(self._in_flight.items()):
+            if wanted.get(product_id, (None, None))[1] != picture:
+                task.cancel()
+                self.cancelled += 1
+
+        for product_id, (priority, picture) in wanted.items():
+            in_flight = self._in_flight.get(product_id)
+            if in_flight is not None and in_flight[0] == picture:
+                continue
+            if self._pending.get(product_id) == (priority, picture):
+                continue
+            self._pending[product_id] = (priority, picture)
+            heapq.heappush(
+                self._heap, (priority, next(self._sequence), product_id, picture)
+            )
+
+        if len(self._heap) > 2 * len(self._pending) + 100:
+            self._compact()
+        self._start_workers()
+
+    def _compact(self) -> None:
+        """Drop the heap entries that were superseded or cancelled."""
+        self._heap = [
+            entry
+            for entry in self._heap
+            if self._pending.get(entry[2]) == (entry[0], entry[3])
+        ]
+        heapq.heapify(self._heap)
+
+    def _start_workers(self) -> None:
+        while self._workers < min(self.concurrency, len(self._pending)):
+            self._workers += 1
+            self._hass.async_create_task(self._worker())
+
+    async def _worker(self) -> None:
+        try:
+            while self._heap:
+                priority, _, product_id, picture = heapq.heappop(self._heap)
+                if self._pending.get(product_id) != (priority, picture):
+                    continue
+                del self._pending[product_id]
+
+                task = self._hass.async_create_task(self._fetch(product_id, picture))
+                self._in_flight[product_id] = (picture, task)
+                try:
+                    # wait() does not raise when the download is cancelled.
+                    await asyncio.wait({task})
+                finally:
+                    if self._in_flight.get(product_id, (None, None))[1] is task:
+                        del self._in_flight[product_id]
+
+                if task.cancelled():
+                    continue
+                if task.exception() is None and task.result():
+                    self.fetched += 1
+                else:
+                    self.failed += 1
+        finally:
+            self._workers -= 1
+
+    def summary(self) -> dict:
+        return {
+            "queued": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "fetched": self.fetched,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
@@ -0,0 +1,294 @@
+"""Rate limiting, circuit breaking, timeouts and retries for Grocy requests.
+
+Every request of ``ShoppingListWithGrocyApi`` goes through one
+``RequestLimiter``, which bounds the number of requests in flight and the
+request rate (token bucket), and one ``CircuitBreaker``. After repeated
+failures the breaker opens and requests fail fast with
+``CircuitOpenError`` instead of each code path waiting for its own timeout;
+once the open period is over, a single probe request decides whether Grocy
+is back (closed) or still down (open again, for twice as long).
+
+GET requests are idempotent: their timeout follows the latency observed for
+their endpoint class (``AdaptiveTimeout``) and they are retried after
+timeouts, connection errors and server errors with ``backoff_delay``.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+# Endpoint classes with their own latency profile, and the shortest
+# timeout (seconds) each may get.
+ENDPOINT_FLOORS = {"system": 5.0, "page": 10.0, "image": 10.0}
+
+MAX_GET_RETRIES = 2
+RETRY_BACKOFF = 0.5
+RETRY_BACKOFF_MAX = 8.0
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of sending a request while Grocy is considered down."""
+
+
+class GrocyServerError(aiohttp.ClientError):
+    """Grocy answered with a server error (5xx)."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def endpoint_class(url: str) -> str:
+    """Return the endpoint class of a relative Grocy API URL."""
+    if url.startswith("api/files/"):
+        return "image"
+    if url.startswith("api/objects/"):
+        return "page"
+    return "system"
+
+
+def backoff_delay(attempt: int, base: float = RETRY_BACKOFF) -> float:
+    """Exponential backoff with jitter before retry number *attempt* + 1.
+
+    Half of the delay is fixed and half is random, so requests that failed
+    together do not all come back at the same moment.
+    """
+    delay = min(RETRY_BACKOFF_MAX, base * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_deadline(timeout: float, retries: int, base: float = RETRY_BACKOFF) -> float:
+    """Longest a GET can take when each of its attempts times out."""
+    pauses = sum(
+        min(RETRY_BACKOFF_MAX, base * 2**attempt) for attempt in range(retries)
+    )
+    return (retries + 1) * timeout + pauses
+
+
+class AdaptiveTimeout:
+    """Timeout derived from the latency observed for one endpoint class.
+
+    The mean latency and its mean deviation are tracked as EWMAs; mean plus
+    two deviations approximates the p95. The timeout is that estimate times
+    *factor*, kept between *floor* and *ceiling*. Until *min_samples*
+    latencies are known, the ceiling is used.
+    """
+
+    def __init__(
+        self,
+        floor: float,
+        ceiling: float,
+        factor: float = 3.0,
+        alpha: float = 0.2,
+        min_samples: int = 5,
+    ) -> None:
+        self.floor = min(floor, ceiling)
+        self.ceiling = ceiling
+        self.factor = factor
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.samples = 0
+        self.timeouts = 0
+        self._mean = 0.0
+        self._deviation = 0.0
+
+    def observe(self, seconds: float) -> None:
+        if self.samples == 0:
+            self._mean = seconds
+            self._deviation = seconds / 2
+        else:
+            self._deviation += self.alpha * (
+                abs(seconds - self._mean) - self._deviation
+            )
+            self._mean += self.alpha * (seconds - self._mean)
+        self.samples += 1
+
+    def observe_timeout(self) -> None:
+        """Count a timeout as a latency of the full timeout, raising it."""
+        self.timeouts += 1
+        self.observe(self.current)
+
+    @property
+    def p95(self) -> float:
+        return self._mean + 2 * self._deviation
+
+    @property
+    def current(self) -> float:
+        if self.samples < self.min_samples:
+            return self.ceiling
+        return min(self.ceiling, max(self.floor, self.p95 * self.factor))
+
+    def summary(self) -> dict:
+        return {
+            "samples": self.samples,
+            "timeouts": self.timeouts,
+            "ewma_ms": round(self._mean * 1000, 1),
+            "p95_ms": round(self.p95 * 1000, 1),
+            "timeout_s": round(self.current, 1),
+        }
+
+
+class TokenBucket:
+    """Allows *rate* requests per second on average, in bursts of *burst*."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Take a token, waiting for one if needed; return the time waited."""
+        waited = 0.0
+        # The lock keeps waiters in arrival order.
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= 1
+        return waited
+
+
+class RequestLimiter:
+    """Bounds the requests in flight and, when *rate* is set, their rate."""
+
+    def __init__(self, concurrency: int, rate: float = 0, burst: int = 0) -> None:
+        self.concurrency = max(1, concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._bucket = TokenBucket(rate, burst or int(rate)) if rate > 0 else None
+        self.in_flight = 0
+        self.throttled = 0
+        self.throttled_ms = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one request slot for the duration of the block."""
+        async with self._semaphore:
+            if self._bucket is not None:
+                waited = await self._bucket.acquire()
+                if waited:
+                    self.throttled += 1
+                    self.throttled_ms += waited * 1000
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    def summary(self) -> dict:
+        return {
+            "max_concurrent_requests": self.concurrency,
+            "max_requests_per_second": self._bucket.rate if self._bucket else 0,
+            "in_flight": self.in_flight,
+            "throttled_requests": self.throttled,
+            "throttled_ms": round(self.throttled_ms, 1),
+        }
+
+
+class CircuitBreaker:
+    """Fails fast after *failure_threshold* consecutive failures."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        max_reset_timeout: float = 300,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.opened_count = 0
+        self.last_error: str | None = None
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until a probe request is allowed, while open."""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def before_request(self) -> None:
+        """Raise ``CircuitOpenError`` unless a request may be sent now."""
+        if self.state == STATE_OPEN and self.retry_in == 0:
+            self.state = STATE_HALF_OPEN
+            self._probing = False
+        if self.state == STATE_HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        if self.state != STATE_CLOSED:
+            self.rejected += 1
+            raise CircuitOpenError(
+                f"Grocy is unavailable ({self.last_error}), "
+                f"next attempt in {self.retry_in:.0f} s"
+            )
+
+    def record_success(self) -> None:
+        if self.state != STATE_CLOSED:
+            LOGGER.info("✅ Grocy is reachable again, resuming requests")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.reset_timeout = self.base_reset_timeout
+        self._probing = False
+
+    def record_failure(self, error: str) -> None:
+        self.last_error = error
+        if self.state == STATE_HALF_OPEN:
+            # The probe failed: stay away for longer.
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            self._open()
+            return
+        self.failures += 1
+        if self.state == STATE_CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+
+    def abandon(self) -> None:
+        """Forget a request that ended without an outcome (cancelled)."""
+        self._probing = False
+
+    def _open(self) -> None:
+        self.state = STATE_OPEN
+        self.opened_count += 1
+        self._opened_at = time.monotonic()
+        self._probing = False
+        LOGGER.warning(
+            "🔌 Grocy looks unavailable (%s), pausing requests for %.0f s",
+            self.last_error,
+            self.reset_timeout,
+        )
+
+    def summary(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in_s": round(self.retry_in, 1),
+            "reset_timeout_s": self.reset_timeout,
+            "opened_count": self.opened_count,
+            "rejected_requests": self.rejected,
+            "last_error": self.last_error,
+        }
@@ -2,6 +2,7 @@ import asyncio
 import base64
 import logging
 import re
+import time
 import unicodedata
 from datetime import date, datetime, timezone
 from difflib import SequenceMatcher
@@ -9,16 +10,57 @@ from urllib.parse import urlencode
 
 import aiohttp
 from async_timeout import timeout
-from homeassistant.components.todo import TodoItemStatus
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, State
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 
-from ..const import DOMAIN, ENTITY_VERSION, OTHER_FIELDS
+from ..const import (
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_REQUESTS_PER_SECOND,
+    CONF_ON_DEMAND_PRODUCT_SENSORS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_REQUESTS_PER_SECOND,
+    DOMAIN,
+)
+from ..entity_index import PRODUCT_UNIQUE_ID_PREFIX, get_entity_index
 from ..frontend_translations import async_load_frontend_translations, get_voice_response
+from ..image_cache import CACHE_DIR, SOURCE_WIDTH, ImageCache
+from ..metrics import RefreshMetrics
+from ..pinned_products import get_pinned_product_ids
+from ..transform import build_item_list, parse_products, transform_grocy_data
 from ..utils import is_update_paused
+from .image_scheduler import (
+    PRIORITY_CATALOG,
+    PRIORITY_FEATURED,
+    PRIORITY_SHOPPING_LIST,
+    ImageScheduler,
+)
+from .resilience import (
+    ENDPOINT_FLOORS,
+    MAX_GET_RETRIES,
+    RETRY_BACKOFF,
+    AdaptiveTimeout,
+    CircuitBreaker,
+    GrocyServerError,
+    RequestLimiter,
+    backoff_delay,
+    endpoint_class,
+    retry_deadline,
+)
 
 LOGGER = logging.getLogger(__name__)
 
+GROCY_TABLES = (
+    "products",
+    "shopping_lists",
+    "shopping_list",
+    "locations",
+    "stock",
+    "product_groups",
+    "quantity_units",
+)
+# Tables a refresh can do without when they never loaded successfully.
+OPTIONAL_TABLES = frozenset({"locations", "product_groups", "quantity_units"})
+
 
 class ShoppingListWithGrocyApi:
     def __init__(self, websession: aiohttp.ClientSession, hass: HomeAssistant, config):
@@ -51,7 +93,60 @@ class ShoppingListWithGrocyApi:
         self.bidirectional_sync_stopped = False
 
         concurrency = 8 if self.image_size <= 50 else 5 if self.image_size <= 100 else 3
-        self._image_fetch_semaphore = asyncio.Semaphore(concurrency)
+        self.image_scheduler = ImageScheduler(
+            hass, self._fetch_and_update_image, concurrency
+        )
+        # Product id -> (picture file name, base64 thumbnail, picture URL) of
+        # the pictures ready so far; refreshes reuse them.
+        self._product_images: dict[str, tuple[str, str, str]] = {}
+        # Pictures are kept on disk across restarts and image size changes.
+        self.image_cache = ImageCache(hass.config.path(".storage", CACHE_DIR))
+        self._catalog_pictures: frozenset[str] | None = None
+        # Cache writes still running, possibly for cancelled downloads.
+        self._image_writes: set[asyncio.Future] = set()
+        self._image_kickoff: asyncio.Task | None = None
+
+        # Single-flight refresh state: overlapping retrieve_data() calls join
+        # the fetch in progress instead of each downloading every table.
+        self._refresh_task: asyncio.Task | None = None
+        self._followup_refresh_task: asyncio.Task | None = None
+        # Incremented on every write sent to Grocy, so a refresh that started
+        # before a write is known to be stale for callers arriving after it.
+        self._write_seq = 0
+        self._refresh_write_seq = 0
+
+        # Fingerprints of the last transformed products and lists, used to
+        # work out what a refresh actually changed.
+        self._product_hashes: dict[str, str] = {}
+        self.shopping_list_hashes: dict[str, str] = {}
+        self.changed_product_ids: set[str] = set()
+        # Incremented by every refresh that transformed new data, so callers
+        # can tell whether changed_product_ids belongs to a refresh they saw.
+        self.refresh_generation = 0
+        self.last_refresh_timing: dict = {}
+        # Last successfully fetched version of each table; a table that
+        # fails falls back to it and is fetched again on the next tick.
+        self._last_good_tables: dict[str, list] = {}
+        self.stale_tables: set[str] = set()
+        self.metrics = RefreshMetrics()
+        # TrafficCapture recording every request while a capture is active.
+        self.capture = None
+        # Shared by every request, so bursts from voice commands, todo
+        # toggles and paginated refreshes cannot saturate a small Grocy.
+        self.limiter = RequestLimiter(
+            config.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS),
+            config.get(CONF_MAX_REQUESTS_PER_SECOND, DEFAULT_MAX_REQUESTS_PER_SECOND),
+        )
+        self.breaker = CircuitBreaker()
+        # GET timeouts follow the observed latency, never exceeding the
+        # fixed timeout of compute_timeout().
+        self.timeouts = {
+            name: AdaptiveTimeout(floor, self.compute_timeout())
+            for name, floor in ENDPOINT_FLOORS.items()
+        }
+        self.get_retries = MAX_GET_RETRIES
+        self.retry_backoff = RETRY_BACKOFF
+        self.retried_requests = 0
 
     async def get_frontend_translation(self, key: str, **kwargs) -> str:
         """Get translation from frontend translation files."""
@@ -75,10 +170,33 @@ class ShoppingListWithGrocyApi:
     def get_entity_in_hass(self, entity_id):
         """Retrieve an entity from Home Assistant."""
         entity = self.hass.states.get(entity_id)
+        if entity is None:
+            entity = self._unmaterialized_product_state(entity_id)
         if entity is None:
             LOGGER.debug("Entity %s not found in Home Assistant.", entity_id)
         return entity
 
+    def _unmaterialized_product_state(self, entity_id):
+        """Build the state of a product sensor that does not exist (yet).
+
+        In on-demand sensor mode most products have no sensor; services that
+        address them by entity id still work from the last parsed data.
+        """
+        prefix = f"sensor.{PRODUCT_UNIQUE_ID_PREFIX}"
+        if not isinstance(entity_id, str) or not entity_id.startswith(prefix):
+            return None
+
+        products = (self.final_data or {}).get("homeassistant_products") or {}
+        product = products.get(entity_id[len(prefix) :])
+        if not product:
+            return None
+
+        return State(
+            entity_id,
+            str(product.get("qty_in_shopping_lists", 0)),
+            {"friendly_name": product.get("name"), **product.get("attributes", {})},
+        )
+
     def encode_base64(self, message):
         """Encode a message in Base64 format."""
         if not isinstance(message, str):
@@ -97,74 +215,92 @@ class ShoppingListWithGrocyApi:
         )
 
     def build_item_list(self, data) -> list:
-        if data is None or "shopping_lists" not in data:
-            return []
-
-        shopping_list_map = {}
-
-        for shopping_list in data["shopping_lists"]:
-            shopping_list_id = shopping_list["id"]
-            shopping_list_map[shopping_list_id] = {
-                "id": shopping_list_id,
-                "name": shopping_list["name"],
-                "products": [],
-            }
+        return build_item_list(data)
 
-        for product in data["products"]:
-            product_id = int(product["id"])
-            qty_factor = (
-                float(product["qu_factor_purchase_to_stock"])
-                if "qu_factor_purchase_to_stock" in product
-                and product["qu_id_purchase"] != product["qu_id_stock"]
-                else 1.0
+    async def request(
+        self,
+        method: str,
+        url: str,
+        accept: str,
+        payload: dict | None = None,
+        *,
+        req_timeout: int | None = None,
+        log_level: int = logging.ERROR,
+        **kwargs,
+    ) -> aiohttp.ClientResponse:
+        """Make an asynchronous HTTP request.
+
+        GET requests get the adaptive timeout of their endpoint class unless
+        *req_timeout* is given, and are retried with jittered exponential
+        backoff after a timeout, a connection error or a server error.
+        """
+        if method.upper() != "GET":
+            return await self._request_once(
+                method,
+                url,
+                accept,
+                payload,
+                req_timeout=req_timeout,
+                log_level=log_level,
+                **kwargs,
             )
 
-            for in_shopping_list in data["shopping_list"]:
-                raw_pid = in_shopping_list.get("product_id")
-                if raw_pid is None:
-                    continue
-                if product_id != int(raw_pid):
-                    continue
-
-                shopping_list_id = in_shopping_list["shopping_list_id"]
-
-                if shopping_list_id in shopping_list_map:
-                    in_shop_list = str(
-                        round(int(in_shopping_list["amount"]) / qty_factor)
-                    )
-                    shopping_list_map[shopping_list_id]["products"].append(
-                        {
-                            "name": f"{product['name']} (x{in_shop_list})",
-                            "shop_list_id": in_shopping_list["id"],
-                            "status": (
-                                TodoItemStatus.NEEDS_ACTION
-                                if int(in_shopping_list["done"]) == 0
-                                else TodoItemStatus.COMPLETED
-                            ),
-                        }
-                    )
-
-        result = list(shopping_list_map.values())
-
-        return result
+        adaptive = self.timeouts[endpoint_class(url)]
+        attempt = 0
+        while True:
+            last_attempt = attempt >= self.get_retries
+            try:
+                return await self._request_once(
+                    method,
+                    url,
+                    accept,
+                    payload,
+                    req_timeout=req_timeout or adaptive.current,
+                    log_level=log_level if last_attempt else logging.DEBUG,
+                    adaptive=adaptive,
+                    **kwargs,
+                )
+            except (
+                TimeoutError,
+                aiohttp.ClientConnectionError,
+                GrocyServerError,
+            ) as err:
+                if last_attempt:
+                    raise
+                delay = backoff_delay(attempt, self.retry_backoff)
+                attempt += 1
+                self.retried_requests += 1
+                LOGGER.debug(
+                    "🔁 Retrying %s in %.1f s (attempt %d/%d): %s",
+                    url,
+                    delay,
+                    attempt + 1,
+                    self.get_retries + 1,
+                    err or type(err).__name__,
+                )
+                await asyncio.sleep(delay)
 
-    async def request(
+    async def _request_once(
         self,
         method: str,
         url: str,
         accept: str,
-        payload: dict = None,
+        payload: dict | None = None,
         *,
-        req_timeout: int | None = None,
+        req_timeout: float | None = None,
         log_level: int = logging.ERROR,
+        adaptive: AdaptiveTimeout | None = None,
         **kwargs,
     ) -> aiohttp.ClientResponse:
-        """Make an asynchronous HTTP request."""
+        """Send one request, without retry."""
         if not self.api_url:
             raise ValueError("Grocy API URL is not configured")
         if not self.api_key:
             raise ValueError("Grocy API key is not configured")
 
+        # Fails fast while Grocy is known to be down.
+        self.breaker.before_request()
+
         method = method.upper()
         is_get = method == "GET"
 
@@ -178,43 +314,60 @@ class ShoppingListWithGrocyApi:
             headers["cache-control"] = "no-cache"
         else:
             headers["Content-Type"] = "application/json"
+            self._write_seq += 1
+
+        self.metrics.record_request()
+        started = time.perf_counter()
+        response = None
 
         try:
             base_url = self.api_url.rstrip("/") if self.api_url else ""
             full_url = f"{base_url}/{url}"
 
-            if self.disable_timeout or req_timeout is None:
-                # No timeout wrapper
-                response = await self.web_session.request(
-                    method,
-                    full_url,
-                    headers=headers,
-                    json=payload if payload and not is_get else None,
-                    ssl=self.verify_ssl,
-                    **kwargs,
-                )
-            else:
-                # Only apply a timeout when explicitly requested
-                async with timeout(req_timeout):
-                    response = await self.web_session.request(
-                        method,
-                        full_url,
-                        headers=headers,
-                        json=payload if payload and not is_get else None,
-                        ssl=self.verify_ssl,
-                        **kwargs,
+            async with self.limiter.slot():
+                # Time spent waiting for a slot is not part of the request.
+                started = time.perf_counter()
+                if self.disable_timeout or req_timeout is None:
+                    # No timeout wrapper
+                    response = await self._send(
+                        method, full_url, headers, payload, is_get, **kwargs
                     )
+                else:
+                    # Only apply a timeout when explicitly requested
+                    async with timeout(req_timeout):
+                        response = await self._send(
+                            method, full_url, headers, payload, is_get, **kwargs
+                        )
+                if adaptive is not None:
+                    adaptive.observe(time.perf_counter() - started)
+
+            if self.capture is not None:
+                await self.capture.async_record(method, url, payload, response, started)
+
+            # Client errors (4xx) come from a healthy Grocy.
+            if response.status >= 500:
+                self.breaker.record_failure(f"HTTP {response.status}")
+            else:
+                self.breaker.record_success()
 
             if response.status >= 400:
                 error_text = await response.text()
-                LOGGER.error("Grocy API error: %s - %s", response.status, error_text)
-                raise aiohttp.ClientError(
-                    f"API request failed: {response.status} - {error_text}"
+                LOGGER.log(
+                    log_level, "Grocy API error: %s - %s", response.status, error_text
                 )
+                message = f"API request failed: {response.status} - {error_text}"
+                if response.status >= 500:
+                    raise GrocyServerError(response.status, message)
+                raise aiohttp.ClientError(message)
 
             return response
 
-        except asyncio.TimeoutError as err:
+        except TimeoutError as err:
+            self.breaker.record_failure("timeout")
+            if adaptive is not None and response is None:
+                adaptive.observe_timeout()
+            if self.capture is not None:
+                self.capture.record_error(method, url, payload, "timeout", started)
             LOGGER.log(
                 log_level,
                 "Timeout connecting to Grocy API at %s: %s",
@@ -223,10 +376,49 @@ class ShoppingListWithGrocyApi:
             )
             raise
         except aiohttp.ClientError as err:
+            if response is None:
+                self.breaker.record_failure(str(err) or type(err).__name__)
+                if self.capture is not None:
+                    self.capture.record_error(method, url, payload, str(err), started)
             LOGGER.log(
                 log_level, "Error connecting to Grocy API at %s: %s", self.api_url, err
             )
             raise
+        except asyncio.CancelledError:
+            if response is None:
+                self.breaker.abandon()
+            raise
+
+    async def _send(
+        self,
+        method: str,
+        full_url: str,
+        headers: dict,
+        payload: dict | None,
+        is_get: bool,
+        **kwargs,
+    ) -> aiohttp.ClientResponse:
+        """Send a request; the body of a GET response is read before returning.
+
+        Table pages and pictures are what load Grocy, so their transfer
+        happens while the caller still holds its limiter slot. The body stays
+        readable from the returned response.
+        """
+        response = await self.web_session.request(
+            method,
+            full_url,
+            headers=headers,
+            json=payload if payload and not is_get else None,
+            ssl=self.verify_ssl,
+            **kwargs,
+        )
+        if is_get:
+            try:
+                await response.read()
+            except BaseException:
+                response.close()
+                raise
+        return response
 
     async def fetch_products(self, path: str, offset: int):
         """Fetch paginated products or other objects."""
@@ -242,14 +434,14 @@ class ShoppingListWithGrocyApi:
 
         return await self.request("get", url, "application/json")
 
-    async def fetch_image(self, image_name: str):
-        """Fetch an image from the API."""
-        url = f"api/files/productpictures/{image_name}?force_serve_as=picture&best_fit_width={self.image_size}"
+    async def fetch_image(self, image_name: str, width: int | None = None):
+        """Fetch an image from the API, *width* pixels wide at most."""
+        width = self.image_size if width is None else width
+        url = f"api/files/productpictures/{image_name}?force_serve_as=picture&best_fit_width={width}"
         return await self.request(
             "get",
             url,
             "application/octet-stream",
-            req_timeout=self.compute_timeout(),
             log_level=logging.DEBUG,
         )
 
@@ -259,7 +451,6 @@ class ShoppingListWithGrocyApi:
             "get",
             "api/system/db-changed-time",
             "application/json",
-            req_timeout=self.compute_timeout(),
         )
 
         last_changed = await response.json()
@@ -271,19 +462,22 @@ class ShoppingListWithGrocyApi:
         data = []
         offset = 0
 
-        while True:
-            response = await self.fetch_products(path, offset)
+        with self.metrics.phase(f"fetch_{path}"):
+            while True:
+                response = await self.fetch_products(path, offset)
 
-            new_results = await response.json()
+                body = await response.read()
+                self.metrics.record_page(path, len(body))
+                new_results = await response.json()
 
-            if not new_results:
-                break
+                if not new_results:
+                    break
 
-            data.extend(new_results)
+                data.extend(new_results)
 
-            offset += self.pagination_limit
-            if offset // self.pagination_limit >= max_pages:
-                break
+                offset += self.pagination_limit
+                if offset // self.pagination_limit >= max_pages:
+                    break
 
         return data
 
@@ -295,25 +489,24 @@ class ShoppingListWithGrocyApi:
             self.hass, f"{DOMAIN}_remove_sensor", product.split("_")[-1]
         )
 
-    async def parse_products(self, data):
-        self.current_time = datetime.now(timezone.utc)
+    async def parse_products(self, data, parsed_products=None, changed=None):
+        """Remove obsolete product sensors and dispatch the parsed products.
 
-        entities = set(self.hass.states.async_entity_ids())
-        rex = re.compile(
-            rf"sensor.shopping_list_with_grocy_product_v{ENTITY_VERSION}_[^|]+"
-        )
-        self.ha_products = set(rex.findall("|".join(entities)))
+        *parsed_products* is the output of the transformation stage; it is
+        computed inline when not provided. When *changed* is given, only those
+        product ids are dispatched.
+        """
+        self.current_time = datetime.now(timezone.utc)
 
-        quantity_units = {q["id"]: q["name"] for q in data["quantity_units"]}
-        locations = {loc["id"]: loc["name"] for loc in data["locations"]}
-        product_groups = {g["id"]: g["name"] for g in data["product_groups"]}
+        if parsed_products is None:
+            parsed_products = parse_products(data)
 
-        current_product_ids = {str(product["id"]) for product in data["products"]}
+        self.ha_products = set(get_entity_index(self.hass).product_entity_ids())
 
         to_remove = {
             entity
             for entity in self.ha_products
-            if entity.split("_")[-1] not in current_product_ids
+            if entity.split("_")[-1] not in parsed_products
         }
 
         if to_remove:
@@ -324,177 +517,176 @@ class ShoppingListWithGrocyApi:
 
         self.ha_products -= to_remove
 
-        parsed_products = []
-        for product in data["products"]:
-            product_id = int(product["id"])
-
-            userfields = product.get("userfields", {})
-            qty_factor = (
-                float(product.get("qu_factor_purchase_to_stock", 1.0))
-                if product.get("qu_id_purchase") != product.get("qu_id_stock")
-                else 1.0
-            )
-
-            qty_unit_purchase = quantity_units.get(product.get("qu_id_purchase"), "")
-            qty_unit_stock = quantity_units.get(product.get("qu_id_stock"), "")
-
-            location = locations.get(product.get("location_id"), "")
-            consume_location = locations.get(
-                product.get("default_consume_location_id"), ""
-            )
-            group = product_groups.get(product.get("product_group_id"), "")
-
-            """
-            if self.image_size > 0 and product.get("picture_file_name"):
-                try:
-                    self.hass.async_create_task(
-                        self._fetch_and_update_image(product_id, product["picture_file_name"])
-                    )
-                except Exception:
-                    LOGGER.debug("Failed to schedule image fetch for product %s", product_id, exc_info=True)
-            """
-
-            shopping_lists = {}
-            qty_in_shopping_lists = 0
-
-            for in_shopping_list in data["shopping_list"]:
-                raw_pid = in_shopping_list.get("product_id")
-                if raw_pid is None:
-                    continue
-                if product_id == int(raw_pid):
-                    shopping_list_id = int(in_shopping_list["shopping_list_id"])
-                    in_shop_list = str(
-                        round(int(in_shopping_list["amount"]) / qty_factor)
-                    )
-                    shopping_lists[f"list_{shopping_list_id}"] = {
-                        "shop_list_id": in_shopping_list["id"],
-                        "qty": int(in_shop_list),
-                        "note": in_shopping_list.get("note", ""),
-                    }
-                    qty_in_shopping_lists += int(in_shop_list)
-
-            stock_qty = sum(
-                float(stock["amount"])
-                for stock in data["stock"]
-                if str(stock["product_id"]) == str(product_id)
-            )
-            opened_qty = sum(
-                float(stock["amount"]) * int(stock["open"])
-                for stock in data["stock"]
-                if str(stock["product_id"]) == str(product_id)
-            )
-
-            unopened_qty = max(0, stock_qty - opened_qty)
-
-            prod_dict = {
-                "product_id": product_id,
-                "parent_product_id": product.get("parent_product_id"),
-                "qty_in_stock": round(stock_qty, 2),
-                "qty_opened": round(opened_qty, 2),
-                "qty_unopened": round(unopened_qty, 2),
-                "qty_unit_purchase": qty_unit_purchase,
-                "qty_unit_stock": qty_unit_stock,
-                "qu_factor_purchase_to_stock": float(qty_factor),
-                "location": location,
-                "consume_location": consume_location,
-                "group": group,
-                "userfields": userfields,
-                "list_count": len(shopping_lists),
-            }
-
-            for shop_list, details in shopping_lists.items():
-                prod_dict.update(
-                    {
-                        f"{shop_list}_qty": details["qty"],
-                        f"{shop_list}_shop_list_id": int(details["shop_list_id"]),
-                        f"{shop_list}_note": details["note"],
-                    }
-                )
-
-            for field in OTHER_FIELDS:
-                if field in product:
-                    prod_dict[field] = product[field]
-
-            parsed_product = {
-                "name": product["name"],
-                "product_id": product_id,
-                "qty_in_shopping_lists": qty_in_shopping_lists,
-                "attributes": prod_dict,
-            }
-            parsed_products.append(parsed_product)
+        for product_id, parsed_product in parsed_products.items():
+            if changed is not None and product_id not in changed:
+                continue
             async_dispatcher_send(
                 self.hass, f"{DOMAIN}_add_or_update_sensor", parsed_product
             )
 
-        parsed_products_dict = {
-            str(product["product_id"]): product for product in parsed_products
-        }
+        return parsed_products
+
+    def _featured_product_ids(self) -> set[str]:
+        """Return the pinned and the suggested products."""
+        featured = set(get_pinned_product_ids(self.hass))
+        manager = self.hass.data.get(DOMAIN, {}).get("suggestion_manager")
+        if manager is not None:
+            prefix = f"sensor.{PRODUCT_UNIQUE_ID_PREFIX}"
+            featured.update(
+                suggestion["id"][len(prefix) :]
+                for suggestion in manager.data.get("products", [])
+                if suggestion["id"].startswith(prefix)
+            )
+        return featured
 
-        return parsed_products_dict
+    def _attach_cached_images(self, raw_products: list, products: dict) -> None:
+        """Add the pictures already downloaded to freshly parsed products."""
+        if not self._product_images:
+            return
+        for raw_product in raw_products:
+            product_id = str(raw_product["id"])
+            cached = self._product_images.get(product_id)
+            product = products.get(product_id)
+            if (
+                cached is None
+                or product is None
+                or cached[0] != raw_product.get("picture_file_name")
+            ):
+                continue
+            product["attributes"]["product_image"] = cached[1]
+            product["attributes"]["entity_picture"] = cached[2]
 
     async def _kick_off_image_fetches(self, data: dict):
-        """Schedule image downloads out-of-band, without blocking startup."""
+        """Queue the missing pictures, those on shopping lists first.
+
+        With on-demand product sensors, pictures of products that are neither
+        on a list nor pinned or suggested are not downloaded until they are.
+        """
         if not data or "products" not in data or self.image_size <= 0:
             return
         try:
-            count = 0
+            on_lists = {
+                str(item.get("product_id")) for item in data.get("shopping_list") or []
+            }
+            featured = self._featured_product_ids()
+            lazy = self.config.get(CONF_ON_DEMAND_PRODUCT_SENSORS, False)
+
+            catalog = set()
+            pictures = set()
+            wanted = {}
             for product in data["products"]:
+                product_id = str(product["id"])
+                catalog.add(product_id)
                 picture = product.get("picture_file_name")
-                if picture:
-                    product_id = int(product["id"])
-                    self.hass.async_create_task(
-                        self._fetch_and_update_image(product_id, picture)
-                    )
-                    count += 1
+                if not picture:
+                    continue
+                pictures.add(picture)
+                cached = self._product_images.get(product_id)
+                if cached is not None and cached[0] == picture:
+                    continue
+                if product_id in on_lists:
+                    wanted[product_id] = (PRIORITY_SHOPPING_LIST, picture)
+                elif product_id in featured:
+                    wanted[product_id] = (PRIORITY_FEATURED, picture)
+                elif not lazy:
+                    wanted[product_id] = (PRIORITY_CATALOG, picture)
+
+            for product_id in self._product_images.keys() - catalog:
+                del self._product_images[product_id]
+            self.image_scheduler.schedule(wanted)
+
+            previous = self._catalog_pictures
+            self._catalog_pictures = frozenset(pictures)
+            if previous is None or previous - pictures:
+                # A download cancelled above may still be writing its files.
+                if self._image_writes:
+                    await asyncio.wait(set(self._image_writes))
+                removed = await self.hass.async_add_executor_job(
+                    self.image_cache.prune, pictures
+                )
+                if removed:
+                    LOGGER.debug("Removed %d unused cached picture(s)", removed)
         except Exception:
             LOGGER.debug("Failed to schedule background image fetches", exc_info=True)
 
-    async def _fetch_and_update_image(self, product_id: int, picture_file_name: str):
-        """Fetch an image in background and dispatch an update for the product sensor."""
-        async with self._image_fetch_semaphore:
-            try:
+    async def _write_image(self, target, *args):
+        """Run a cache write in the executor and return its result.
+
+        Cancelling the caller does not stop the write, so it is shielded and
+        tracked: pruning waits for it instead of racing it.
+        """
+        write = self.hass.async_add_executor_job(target, *args)
+        self._image_writes.add(write)
+        write.add_done_callback(self._image_writes.discard)
+        return await asyncio.shield(write)
+
+    async def _fetch_and_update_image(
+        self, product_id: str, picture_file_name: str
+    ) -> bool:
+        """Get a product picture and dispatch an update for the product sensor.
+
+        The picture is downloaded only if it is not cached on disk yet.
+        """
+        try:
+            cache = self.image_cache
+            key = await self.hass.async_add_executor_job(cache.key, picture_file_name)
+            if not await self.hass.async_add_executor_job(cache.has_source, key):
+                started = time.perf_counter()
                 encoded_name = self.encode_base64(picture_file_name)
-                response = await self.fetch_image(encoded_name)
+                response = await self.fetch_image(encoded_name, SOURCE_WIDTH)
                 if response is None:
                     LOGGER.debug(
                         "No response while fetching image for product %s", product_id
                     )
-                    return
+                    return False
 
                 picture_bytes = await response.read()
-                picture = base64.b64encode(picture_bytes).decode("utf-8")
+                self.metrics.record_image(
+                    (time.perf_counter() - started) * 1000, len(picture_bytes)
+                )
+                await self._write_image(cache.store_source, key, picture_bytes)
 
-                data_uri = f"data:image/png;base64,{picture}"
+            thumbnail = await self._write_image(cache.thumbnail, key, self.image_size)
+            if thumbnail is None:
+                LOGGER.debug("Unreadable picture for product %s", product_id)
+                return False
+            picture = base64.b64encode(thumbnail).decode("utf-8")
 
-                try:
-                    if self.final_data and isinstance(self.final_data, dict):
-                        hap = self.final_data.get("homeassistant_products")
-                        if isinstance(hap, dict):
-                            key = str(product_id)
-                            if key in hap and "attributes" in hap[key]:
-                                hap[key]["attributes"]["product_image"] = picture
-                                hap[key]["attributes"]["entity_picture"] = data_uri
-                except Exception:
-                    LOGGER.debug(
-                        "Failed to persist background image into final_data for product %s",
-                        product_id,
-                        exc_info=True,
-                    )
+            picture_url = cache.url(key, str(self.image_size))
+            self._product_images[product_id] = (picture_file_name, picture, picture_url)
 
-                async_dispatcher_send(
-                    self.hass,
-                    f"{DOMAIN}_add_or_update_sensor",
-                    {
-                        "product_id": product_id,
-                        "attributes": {
-                            "product_image": picture,
-                            "entity_picture": data_uri,
-                        },
-                    },
+            try:
+                if self.final_data and isinstance(self.final_data, dict):
+                    hap = self.final_data.get("homeassistant_products")
+                    if isinstance(hap, dict):
+                        if product_id in hap and "attributes" in hap[product_id]:
+                            hap[product_id]["attributes"]["product_image"] = picture
+                            hap[product_id]["attributes"]["entity_picture"] = (
+                                picture_url
+                            )
+            except Exception:
+                LOGGER.debug(
+                    "Failed to persist background image into final_data for product %s",
+                    product_id,
+                    exc_info=True,
                 )
 
-            except Exception as e:
-                LOGGER.debug("Failed to fetch image for product %s: %s", product_id, e)
+            async_dispatcher_send(
+                self.hass,
+                f"{DOMAIN}_add_or_update_sensor",
+                {
+                    "product_id": int(product_id),
+                    "attributes": {
+                        "product_image": picture,
+                        "entity_picture": picture_url,
+                    },
+                },
+            )
+            return True
+
+        except Exception as e:
+            LOGGER.debug("Failed to fetch image for product %s: %s", product_id, e)
+            return False
 
     async def update_grocy_shoppinglist_product(self, product_id: int, done: bool):
         """Mark a product as done or not in the shopping list."""
@@ -1281,6 +1473,16 @@ class ShoppingListWithGrocyApi:
         nearest = min(table.keys(), key=lambda k: abs(k - int(self.image_size or 0)))
         return table[nearest]
 
+    def fetch_timeout(self) -> float:
+        """Return the time allowed for fetching the Grocy tables.
+
+        A page timing out on every attempt still gets all its retries, so a
+        single slow page does not end the refresh.
+        """
+        return retry_deadline(
+            self.timeouts["page"].ceiling, self.get_retries, self.retry_backoff
+        )
+
     async def update_refreshing_status(self, refreshing):
         entity = self.hass.data[DOMAIN]["entities"].get(
             "updating_shopping_list_with_grocy"
@@ -1292,9 +1494,158 @@ class ShoppingListWithGrocyApi:
         self.hass.async_create_task(entity.update_state(refreshing))
 
     async def retrieve_data(self, force=False):
+        """Retrieve data, joining any refresh already in flight.
+
+        Overlapping callers share a single fetch. A caller that forces a
+        refresh, or that arrives after a write was sent to Grocy while the
+        current fetch was running, waits for one more fetch started after the
+        current one so it never receives stale data.
+        """
+        if self._followup_refresh_task is not None:
+            return await asyncio.shield(self._followup_refresh_task)
+
+        current = self._refresh_task
+        if current is None or current.done():
+            self._refresh_write_seq = self._write_seq
+            self._refresh_task = self.hass.async_create_task(self._retrieve_data(force))
+            return await asyncio.shield(self._refresh_task)
+
+        if not force and self._refresh_write_seq == self._write_seq:
+            return await asyncio.shield(current)
+
+        self._followup_refresh_task = self.hass.async_create_task(
+            self._refresh_after(current)
+        )
+        return await asyncio.shield(self._followup_refresh_task)
+
+    async def _refresh_after(self, current: asyncio.Task):
+        """Run a forced refresh once the refresh in progress has finished."""
+        await asyncio.wait((current,))
+
+        self._followup_refresh_task = None
+        self._refresh_write_seq = self._write_seq
+        self._refresh_task = asyncio.current_task()
+
+        return await self._retrieve_data(True)
+
+    async def _apply_refresh(self, raw_data: dict):
+        """Transform freshly fetched tables and publish the result.
+
+        The CPU-bound transformation runs in the executor; only dispatching
+        and state writes happen on the event loop. How long each part took is
+        kept in ``last_refresh_timing`` and sent on the
+        ``{DOMAIN}_refresh_timing`` signal.
+        """
+        started = time.perf_counter()
+        transformed = await self.hass.async_add_executor_job(
+            transform_grocy_data, raw_data
+        )
+        transformed_at = time.perf_counter()
+
+        products = transformed["homeassistant_products"]
+        self._attach_cached_images(raw_data["products"], products)
+        previous_hashes = self._product_hashes
+        self._product_hashes = transformed["product_hashes"]
+        self.shopping_list_hashes = transformed["shopping_list_hashes"]
+        self.changed_product_ids = {
+            product_id
+            for product_id, product_hash in self._product_hashes.items()
+            if previous_hashes.get(product_id) != product_hash
+        } | (previous_hashes.keys() - self._product_hashes.keys())
+        self.refresh_generation += 1
+
+        self.final_data = {
+            **raw_data,
+            "homeassistant_products": await self.parse_products(
+                raw_data, products, self.changed_product_ids
+            ),
+            "shopping_lists_data": transformed["shopping_lists_data"],
+        }
+        finished = time.perf_counter()
+        self.metrics.add_phase("transform", (transformed_at - started) * 1000)
+        self.metrics.add_phase("parse", (finished - transformed_at) * 1000)
+
+        self.last_refresh_timing = {
+            "executor_ms": round((transformed_at - started) * 1000, 2),
+            "loop_ms": round((finished - transformed_at) * 1000, 2),
+            "products": len(products),
+            "changed_products": len(self.changed_product_ids),
+        }
+        LOGGER.debug(
+            "Refresh transformed %d products in %.1f ms (executor), "
+            "blocked the event loop for %.1f ms",
+            len(products),
+            self.last_refresh_timing["executor_ms"],
+            self.last_refresh_timing["loop_ms"],
+        )
+        with self.metrics.phase("dispatch"):
+            async_dispatcher_send(
+                self.hass, f"{DOMAIN}_refresh_timing", self.last_refresh_timing
+            )
+
+    async def _fetch_table(self, path: str) -> list:
+        """Fetch one table within fetch_timeout().
+
+        Each table has its own bound, so a table that hangs fails alone and
+        falls back to its last good version.
+        """
+        if self.disable_timeout:
+            return await self.fetch_list(path)
+        async with timeout(self.fetch_timeout()):
+            return await self.fetch_list(path)
+
+    def _with_last_good_tables(self, fetched: dict) -> dict | None:
+        """Complete fetched tables with the last good version of the others.
+
+        A table that failed falls back to its last good version, or to an
+        empty table when it is optional, and is marked stale. Returns None
+        when a required table failed and never loaded successfully.
+        """
+        raw_data = {}
+        missing = False
+        for table in GROCY_TABLES:
+            if table not in fetched:
+                raw_data[table] = self._last_good_tables.get(table, [])
+                continue
+
+            result = fetched[table]
+            if not isinstance(result, BaseException):
+                self._last_good_tables[table] = raw_data[table] = result
+                self.stale_tables.discard(table)
+                continue
+
+            self.stale_tables.add(table)
+            # Timeouts have no message.
+            reason = str(result) or type(result).__name__
+            if table in self._last_good_tables:
+                LOGGER.warning(
+                    "⚠️ Fetching %s failed (%s), using its last good version",
+                    table,
+                    reason,
+                )
+                raw_data[table] = self._last_good_tables[table]
+            elif table in OPTIONAL_TABLES:
+                LOGGER.warning(
+                    "⚠️ Fetching %s failed (%s), continuing without it", table, reason
+                )
+                raw_data[table] = []
+            else:
+                LOGGER.warning(
+                    "⚠️ Fetching %s failed (%s), keeping the previous data",
+                    table,
+                    reason,
+                )
+                missing = True
+
+        return None if missing else raw_data
+
+    async def _retrieve_data(self, force=False):
         """Retrieves data and updates if necessary."""
+        self.metrics.start_refresh()
+        updated = False
         try:
-            last_db_changed_time = await self.fetch_last_db_changed_time()
+            with self.metrics.phase("db_changed_time"):
+                last_db_changed_time = await self.fetch_last_db_changed_time()
             paused = is_update_paused(self.hass)
 
             should_update = force or (
@@ -1306,59 +1657,45 @@ class ShoppingListWithGrocyApi:
             )
 
             if should_update:
-                await self.update_refreshing_status(True)
-                titles = [
-                    "products",
-                    "shopping_lists",
-                    "shopping_list",
-                    "locations",
-                    "stock",
-                    "product_groups",
-                    "quantity_units",
-                ]
+                titles = list(GROCY_TABLES)
+            elif self.stale_tables and not paused:
+                # Only the tables that failed last time are fetched again.
+                titles = [table for table in GROCY_TABLES if table in self.stale_tables]
+            else:
+                titles = []
 
+            if titles:
+                await self.update_refreshing_status(True)
                 t = self.compute_timeout()
 
-                if self.disable_timeout:
+                with self.metrics.phase("fetch"):
                     results = await asyncio.gather(
-                        *(self.fetch_list(path) for path in titles),
+                        *(self._fetch_table(path) for path in titles),
                         return_exceptions=True,
                     )
-                else:
-                    async with timeout(t):
-                        results = await asyncio.gather(
-                            *(self.fetch_list(path) for path in titles),
-                            return_exceptions=True,
-                        )
-
-                for idx, r in enumerate(results):
-                    if isinstance(r, Exception):
-                        LOGGER.warning("Fetch %s failed: %s", titles[idx], r)
 
-                self.final_data = dict(zip(titles, results))
+                raw_data = self._with_last_good_tables(dict(zip(titles, results)))
+                if raw_data is None:
+                    return self.final_data
 
                 if self.disable_timeout:
-                    self.final_data[
-                        "homeassistant_products"
-                    ] = await self.parse_products(self.final_data)
-                    self.final_data["shopping_lists_data"] = self.build_item_list(
-                        self.final_data
-                    )
+                    await self._apply_refresh(raw_data)
                 else:
                     async with timeout(t):
-                        self.final_data[
-                            "homeassistant_products"
-                        ] = await self.parse_products(self.final_data)
-                        self.final_data["shopping_lists_data"] = self.build_item_list(
-                            self.final_data
-                        )
+                        await self._apply_refresh(raw_data)
 
                 self.last_db_changed_time = last_db_changed_time
-                self.hass.async_create_task(
+                updated = True
+                self._image_kickoff = self.hass.async_create_task(
                     self._kick_off_image_fetches(self.final_data)
                 )
 
         finally:
             await self.update_refreshing_status(False)
+            self.metrics.finish_refresh(
+                updated=updated,
+                products=len(self._product_hashes) if updated else 0,
+                changed_products=len(self.changed_product_ids) if updated else 0,
+            )
 
         return self.final_data
@@ -0,0 +1,290 @@
+"""Capture of Grocy traffic and its deterministic replay.
+
+While a capture is active, ``ShoppingListWithGrocyApi.request`` records every
+request with its response and timing. Names, notes, descriptions, pictures
+and userfields are replaced by stable pseudonyms, so a capture can be shared
+without sharing the Grocy database; the API key is never recorded.
+
+``ReplaySession`` stands in for the aiohttp session and answers the API from
+a capture, so slow refreshes and voice flows can be reproduced offline.
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import os
+import secrets
+import time
+from datetime import UTC, datetime
+
+import aiohttp
+from yarl import URL
+
+CAPTURE_FORMAT_VERSION = 1
+MAX_CAPTURE_ENTRIES = 20000
+
+ANONYMIZED_FIELDS = frozenset(
+    {
+        "name",
+        "name_plural",
+        "description",
+        "note",
+        "picture_file_name",
+        "barcode",
+        "userfields",
+    }
+)
+PICTURES_PATH = "api/files/productpictures/"
+REPLAY_ORIGIN = "http://replay.invalid"
+
+
+class Anonymizer:
+    """Replaces personal strings by pseudonyms that are stable per capture."""
+
+    def __init__(self, salt: bytes | None = None) -> None:
+        self._salt = salt or secrets.token_bytes(16)
+
+    def pseudonym(self, value: str, field: str = "") -> str:
+        digest = hashlib.blake2b(
+            value.encode(), key=self._salt, digest_size=5
+        ).hexdigest()
+        if field == "picture_file_name":
+            _, ext = os.path.splitext(value)
+            return f"picture-{digest}{ext}"
+        return f"{field or 'value'}-{digest}"
+
+    def _field(self, field: str, value):
+        if isinstance(value, str) and value:
+            return self.pseudonym(value, field)
+        if isinstance(value, dict):
+            return {key: self._field(field, item) for key, item in value.items()}
+        return value
+
+    def data(self, value):
+        """Return *value* with the anonymized fields of every object replaced."""
+        if isinstance(value, list):
+            return [self.data(item) for item in value]
+        if isinstance(value, dict):
+            return {
+                key: self._field(key, item)
+                if key in ANONYMIZED_FIELDS
+                else self.data(item)
+                for key, item in value.items()
+            }
+        return value
+
+    def url(self, url: str) -> str:
+        """Anonymize the picture file name encoded in a product picture URL."""
+        if not url.startswith(PICTURES_PATH):
+            return url
+        encoded, sep, query = url[len(PICTURES_PATH) :].partition("?")
+        try:
+            name = base64.b64decode(encoded).decode()
+        except ValueError:
+            return url
+        anonymized = base64.b64encode(
+            self.pseudonym(name, "picture_file_name").encode()
+        ).decode()
+        return f"{PICTURES_PATH}{anonymized}{sep}{query}"
+
+
+class TrafficCapture:
+    """Records request/response pairs and timings of the Grocy API."""
+
+    def __init__(
+        self, anonymize: bool = True, max_entries: int = MAX_CAPTURE_ENTRIES
+    ) -> None:
+        self.anonymizer = Anonymizer() if anonymize else None
+        self.max_entries = max_entries
+        self.entries: list[dict] = []
+        self.dropped = 0
+        self.started = datetime.now(UTC)
+        self._start = time.perf_counter()
+
+    def _entry(self, method: str, url: str, payload, started: float) -> dict | None:
+        if len(self.entries) >= self.max_entries:
+            self.dropped += 1
+            return None
+        if self.anonymizer is not None:
+            url = self.anonymizer.url(url)
+            payload = self.anonymizer.data(payload)
+        entry = {
+            "at_ms": round((started - self._start) * 1000, 2),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "method": method,
+            "url": url,
+            "request": payload,
+        }
+        self.entries.append(entry)
+        return entry
+
+    async def async_record(
+        self, method: str, url: str, payload, response, started: float
+    ) -> None:
+        """Record a response; its body stays readable by the caller."""
+        entry = self._entry(method, url, payload, started)
+        if entry is None:
+            return
+        body = await response.read()
+        entry["status"] = response.status
+        if "json" in (response.content_type or ""):
+            try:
+                data = json.loads(body) if body else None
+            except ValueError:
+                entry["response"] = {"text": body.decode(errors="replace")}
+            else:
+                if self.anonymizer is not None:
+                    data = self.anonymizer.data(data)
+                entry["response"] = {"json": data}
+        elif self.anonymizer is not None:
+            # Pictures keep their size only.
+            entry["response"] = {
+                "bytes": len(body),
+                "content_type": response.content_type,
+            }
+        else:
+            entry["response"] = {
+                "base64": base64.b64encode(body).decode(),
+                "content_type": response.content_type,
+            }
+
+    def record_error(
+        self, method: str, url: str, payload, error: str, started: float
+    ) -> None:
+        """Record a request that failed without a response (timeout, network)."""
+        entry = self._entry(method, url, payload, started)
+        if entry is not None:
+            entry["error"] = error
+
+    def save(self, path: str) -> None:
+        """Write the capture as gzipped JSON lines; runs in the executor."""
+        save_capture(
+            path,
+            {
+                "version": CAPTURE_FORMAT_VERSION,
+                "started": self.started.isoformat(),
+                "anonymized": self.anonymizer is not None,
+                "entries": len(self.entries),
+                "dropped": self.dropped,
+            },
+            self.entries,
+        )
+
+
+def save_capture(path: str, meta: dict, entries: list) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        file.write(json.dumps(meta) + "\n")
+        for entry in entries:
+            file.write(json.dumps(entry, default=str) + "\n")
+
+
+def load_capture(path: str) -> tuple[dict, list]:
+    """Return the metadata and the entries of a capture file."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        meta = json.loads(file.readline())
+        entries = [json.loads(line) for line in file if line.strip()]
+    return meta, entries
+
+
+class ReplayResponse:
+    """The part of ``aiohttp.ClientResponse`` the API uses."""
+
+    def __init__(self, status: int, body: bytes, content_type: str) -> None:
+        self.status = status
+        self.content_type = content_type
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode(errors="replace")
+
+    async def json(self, **kwargs):
+        return json.loads(self._body) if self._body else None
+
+    def release(self) -> None:
+        pass
+
+
+class ReplaySession:
+    """Answers API requests from a capture, in the order they were recorded.
+
+    Requests are matched on method and URL. When a URL was requested more
+    often than captured, the last response is repeated, so polling keeps
+    working. With *realtime*, every response is delayed by its recorded
+    duration divided by *speed*.
+    """
+
+    def __init__(
+        self, entries: list, realtime: bool = False, speed: float = 1.0
+    ) -> None:
+        self.realtime = realtime
+        self.speed = speed
+        self.requests = 0
+        self.unmatched: list[str] = []
+        self._queues: dict[tuple, list] = {}
+        self._last: dict[tuple, dict] = {}
+        for entry in entries:
+            key = (
+                entry["method"],
+                self._relative_url(f"{REPLAY_ORIGIN}/{entry['url']}"),
+            )
+            self._queues.setdefault(key, []).append(entry)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ReplaySession":
+        return cls(load_capture(path)[1], **kwargs)
+
+    @staticmethod
+    def _relative_url(url) -> str:
+        # Captured and requested URLs go through the same yarl normalization,
+        # which decodes characters such as ":" in query strings.
+        url = URL(str(url))
+        relative = url.raw_path.lstrip("/")
+        query = url.raw_query_string
+        return f"{relative}?{query}" if query else relative
+
+    async def request(self, method: str, url, **kwargs) -> ReplayResponse:
+        self.requests += 1
+        key = (method.upper(), self._relative_url(url))
+        queue = self._queues.get(key)
+        if queue:
+            entry = self._last[key] = queue.pop(0)
+        else:
+            entry = self._last.get(key)
+        if entry is None:
+            self.unmatched.append(f"{key[0]} {key[1]}")
+            return ReplayResponse(
+                404, b'{"error_message": "Not in capture"}', "application/json"
+            )
+
+        if self.realtime:
+            await asyncio.sleep(entry.get("elapsed_ms", 0) / 1000 / self.speed)
+
+        if entry.get("error") == "timeout":
+            raise TimeoutError
+        if "error" in entry:
+            raise aiohttp.ClientError(entry["error"])
+
+        response = entry.get("response") or {}
+        if "json" in response:
+            return ReplayResponse(
+                entry["status"],
+                json.dumps(response["json"]).encode(),
+                "application/json",
+            )
+        if "base64" in response:
+            body = base64.b64decode(response["base64"])
+        elif "bytes" in response:
+            body = bytes(response["bytes"])
+        else:
+            body = response.get("text", "").encode()
+        return ReplayResponse(
+            entry["status"], body, response.get("content_type") or "text/plain"
+        )
+
+    async def close(self) -> None:
+        pass
@@ -13,16 +13,31 @@ from .analysis_const import (
     CONF_ANALYSIS_SETTINGS,
     CONF_CONSUMPTION_WEIGHT,
     CONF_FREQUENCY_WEIGHT,
+    CONF_REFRESH_AFTER_CHANGES,
+    CONF_REFRESH_HOUR,
     CONF_SCORE_THRESHOLD,
     CONF_SEASONAL_WEIGHT,
     DEFAULT_CONSUMPTION_WEIGHT,
     DEFAULT_FREQUENCY_WEIGHT,
+    DEFAULT_REFRESH_AFTER_CHANGES,
+    DEFAULT_REFRESH_HOUR,
     DEFAULT_SCORE_THRESHOLD,
     DEFAULT_SEASONAL_WEIGHT,
 )
 from .const import (
     DOMAIN,
     CONF_ENABLE_PRODUCT_SENSORS,
+    CONF_ON_DEMAND_PRODUCT_SENSORS,
+    CONF_RECORDER_PROFILE,
+    DEFAULT_RECORDER_PROFILE,
+    RECORDER_PROFILES,
+    CONF_ENABLE_WEBHOOK,
+    CONF_ENABLE_METRICS_SENSOR,
+    CONF_ENABLE_LOOP_WATCHDOG,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_REQUESTS_PER_SECOND,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_REQUESTS_PER_SECOND,
     CONF_SELECTION_CRITERIA,
     CONF_PREFER_GENERIC_PRODUCTS,
     CONF_AUTO_SELECT_FIRST,
@@ -68,6 +83,8 @@ class ShoppingListWithGrocyOptionsConfigFlow(config_entries.OptionsFlow):  # typ
                 CONF_FREQUENCY_WEIGHT: DEFAULT_FREQUENCY_WEIGHT,
                 CONF_SEASONAL_WEIGHT: DEFAULT_SEASONAL_WEIGHT,
                 CONF_SCORE_THRESHOLD: DEFAULT_SCORE_THRESHOLD,
+                CONF_REFRESH_HOUR: DEFAULT_REFRESH_HOUR,
+                CONF_REFRESH_AFTER_CHANGES: DEFAULT_REFRESH_AFTER_CHANGES,
             }
 
         if CONF_SELECTION_CRITERIA not in self.options:
@@ -103,6 +120,29 @@ class ShoppingListWithGrocyOptionsConfigFlow(config_entries.OptionsFlow):  # typ
                             CONF_ENABLE_PRODUCT_SENSORS: user_input.get(
                                 CONF_ENABLE_PRODUCT_SENSORS, True
                             ),
+                            CONF_ON_DEMAND_PRODUCT_SENSORS: user_input.get(
+                                CONF_ON_DEMAND_PRODUCT_SENSORS, False
+                            ),
+                            CONF_RECORDER_PROFILE: user_input.get(
+                                CONF_RECORDER_PROFILE, DEFAULT_RECORDER_PROFILE
+                            ),
+                            CONF_ENABLE_WEBHOOK: user_input.get(
+                                CONF_ENABLE_WEBHOOK, False
+                            ),
+                            CONF_ENABLE_METRICS_SENSOR: user_input.get(
+                                CONF_ENABLE_METRICS_SENSOR, False
+                            ),
+                            CONF_ENABLE_LOOP_WATCHDOG: user_input.get(
+                                CONF_ENABLE_LOOP_WATCHDOG, False
+                            ),
+                            CONF_MAX_REQUESTS_PER_SECOND: user_input.get(
+                                CONF_MAX_REQUESTS_PER_SECOND,
+                                DEFAULT_MAX_REQUESTS_PER_SECOND,
+                            ),
+                            CONF_MAX_CONCURRENT_REQUESTS: user_input.get(
+                                CONF_MAX_CONCURRENT_REQUESTS,
+                                DEFAULT_MAX_CONCURRENT_REQUESTS,
+                            ),
                         }
                     )
                     return await self.async_step_advanced()
@@ -125,6 +165,25 @@ class ShoppingListWithGrocyOptionsConfigFlow(config_entries.OptionsFlow):  # typ
                     CONF_ENABLE_PRODUCT_SENSORS: user_input.get(
                         CONF_ENABLE_PRODUCT_SENSORS, True
                     ),
+                    CONF_ON_DEMAND_PRODUCT_SENSORS: user_input.get(
+                        CONF_ON_DEMAND_PRODUCT_SENSORS, False
+                    ),
+                    CONF_RECORDER_PROFILE: user_input.get(
+                        CONF_RECORDER_PROFILE, DEFAULT_RECORDER_PROFILE
+                    ),
+                    CONF_ENABLE_WEBHOOK: user_input.get(CONF_ENABLE_WEBHOOK, False),
+                    CONF_ENABLE_METRICS_SENSOR: user_input.get(
+                        CONF_ENABLE_METRICS_SENSOR, False
+                    ),
+                    CONF_ENABLE_LOOP_WATCHDOG: user_input.get(
+                        CONF_ENABLE_LOOP_WATCHDOG, False
+                    ),
+                    CONF_MAX_REQUESTS_PER_SECOND: user_input.get(
+                        CONF_MAX_REQUESTS_PER_SECOND, DEFAULT_MAX_REQUESTS_PER_SECOND
+                    ),
+                    CONF_MAX_CONCURRENT_REQUESTS: user_input.get(
+                        CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+                    ),
                     "unique_id": self.options.get("unique_id"),
                     CONF_ANALYSIS_SETTINGS: self.options.get(
                         CONF_ANALYSIS_SETTINGS,
@@ -158,6 +217,19 @@ class ShoppingListWithGrocyOptionsConfigFlow(config_entries.OptionsFlow):  # typ
                 old_product_sensors = self.options.get(
                     CONF_ENABLE_PRODUCT_SENSORS, True
                 )
+                old_on_demand = self.options.get(CONF_ON_DEMAND_PRODUCT_SENSORS, False)
+                old_recorder_profile = self.options.get(
+                    CONF_RECORDER_PROFILE, DEFAULT_RECORDER_PROFILE
+                )
+                old_webhook = self.options.get(CONF_ENABLE_WEBHOOK, False)
+                old_metrics_sensor = self.options.get(CONF_ENABLE_METRICS_SENSOR, False)
+                old_loop_watchdog = self.options.get(CONF_ENABLE_LOOP_WATCHDOG, False)
+                old_rate_limit = self.options.get(
+                    CONF_MAX_REQUESTS_PER_SECOND, DEFAULT_MAX_REQUESTS_PER_SECOND
+                )
+                old_concurrency = self.options.get(
+                    CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+                )
 
                 settings_changed = (
                     old_api_url
@@ -172,6 +244,27 @@ class ShoppingListWithGrocyOptionsConfigFlow(config_entries.OptionsFlow):  # typ
                         or old_image_size != user_input.get("image_download_size", 100)
                         or old_product_sensors
                         != user_input.get(CONF_ENABLE_PRODUCT_SENSORS, True)
+                        or old_on_demand
+                        != user_input.get(CONF_ON_DEMAND_PRODUCT_SENSORS, False)
+                        or old_recorder_profile
+                        != user_input.get(
+                            CONF_RECORDER_PROFILE, DEFAULT_RECORDER_PROFILE
+                        )
+                        or old_webhook != user_input.get(CONF_ENABLE_WEBHOOK, False)
+                        or old_metrics_sensor
+                        != user_input.get(CONF_ENABLE_METRICS_SENSOR, False)
+                        or old_loop_watchdog
+                        != user_input.get(CONF_ENABLE_LOOP_WATCHDOG, False)
+                        or old_rate_limit
+                        != user_input.get(
+                            CONF_MAX_REQUESTS_PER_SECOND,
+                            DEFAULT_MAX_REQUESTS_PER_SECOND,
+                        )
+                        or old_concurrency
+                        != user_input.get(
+                            CONF_MAX_CONCURRENT_REQUESTS,
+                            DEFAULT_MAX_CONCURRENT_REQUESTS,
+                        )
                     )
                 )
                 first_time_setup = not (old_api_url and old_api_key)
@@ -209,6 +302,40 @@ class ShoppingListWithGrocyOptionsConfigFlow(config_entries.OptionsFlow):  # typ
                 CONF_ENABLE_PRODUCT_SENSORS,
                 default=self.options.get(CONF_ENABLE_PRODUCT_SENSORS, True),
             ): bool,
+            vol.Optional(
+                CONF_ON_DEMAND_PRODUCT_SENSORS,
+                default=self.options.get(CONF_ON_DEMAND_PRODUCT_SENSORS, False),
+            ): bool,
+            vol.Optional(
+                CONF_RECORDER_PROFILE,
+                default=self.options.get(
+                    CONF_RECORDER_PROFILE, DEFAULT_RECORDER_PROFILE
+                ),
+            ): vol.In(RECORDER_PROFILES),
+            vol.Optional(
+                CONF_ENABLE_WEBHOOK,
+                default=self.options.get(CONF_ENABLE_WEBHOOK, False),
+            ): bool,
+            vol.Optional(
+                CONF_ENABLE_METRICS_SENSOR,
+                default=self.options.get(CONF_ENABLE_METRICS_SENSOR, False),
+            ): bool,
+            vol.Optional(
+                CONF_ENABLE_LOOP_WATCHDOG,
+                default=self.options.get(CONF_ENABLE_LOOP_WATCHDOG, False),
+            ): bool,
+            vol.Optional(
+                CONF_MAX_REQUESTS_PER_SECOND,
+                default=self.options.get(
+                    CONF_MAX_REQUESTS_PER_SECOND, DEFAULT_MAX_REQUESTS_PER_SECOND
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+            vol.Optional(
+                CONF_MAX_CONCURRENT_REQUESTS,
+                default=self.options.get(
+                    CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
             vol.Optional("show_advanced", default=False): bool,
         }
 
@@ -245,6 +372,12 @@ class ShoppingListWithGrocyOptionsConfigFlow(config_entries.OptionsFlow):  # typ
                     CONF_SCORE_THRESHOLD: user_input.get(
                         CONF_SCORE_THRESHOLD, DEFAULT_SCORE_THRESHOLD
                     ),
+                    CONF_REFRESH_HOUR: user_input.get(
+                        CONF_REFRESH_HOUR, DEFAULT_REFRESH_HOUR
+                    ),
+                    CONF_REFRESH_AFTER_CHANGES: user_input.get(
+                        CONF_REFRESH_AFTER_CHANGES, DEFAULT_REFRESH_AFTER_CHANGES
+                    ),
                 }
 
                 # Extract selection criteria
@@ -324,6 +457,18 @@ class ShoppingListWithGrocyOptionsConfigFlow(config_entries.OptionsFlow):  # typ
                             CONF_SEASONAL_WEIGHT, DEFAULT_SEASONAL_WEIGHT
                         ),
                     ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=1.0)),
+                    vol.Required(
+                        CONF_REFRESH_HOUR,
+                        default=current_analysis_settings.get(
+                            CONF_REFRESH_HOUR, DEFAULT_REFRESH_HOUR
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=23)),
+                    vol.Required(
+                        CONF_REFRESH_AFTER_CHANGES,
+                        default=current_analysis_settings.get(
+                            CONF_REFRESH_AFTER_CHANGES, DEFAULT_REFRESH_AFTER_CHANGES
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
                     # Selection Criteria
                     vol.Optional(
                         CONF_PREFER_GENERIC_PRODUCTS,
@@ -6,6 +6,35 @@ ENTITY_VERSION = 2
 
 # Configuration options
 CONF_ENABLE_PRODUCT_SENSORS = "enable_product_sensors"
+CONF_ON_DEMAND_PRODUCT_SENSORS = "on_demand_product_sensors"
+CONF_RECORDER_PROFILE = "recorder_profile"
+
+# How much of the product sensors' attributes the recorder keeps: "full"
+# records everything, "compact" drops bulky, rarely changing attributes and
+# "minimal" records the quantity only.
+RECORDER_PROFILE_FULL = "full"
+RECORDER_PROFILE_COMPACT = "compact"
+RECORDER_PROFILE_MINIMAL = "minimal"
+RECORDER_PROFILES = [
+    RECORDER_PROFILE_FULL,
+    RECORDER_PROFILE_COMPACT,
+    RECORDER_PROFILE_MINIMAL,
+]
+DEFAULT_RECORDER_PROFILE = RECORDER_PROFILE_COMPACT
+CONF_ENABLE_WEBHOOK = "enable_webhook"
+CONF_WEBHOOK_ID = "webhook_id"
+CONF_ENABLE_METRICS_SENSOR = "enable_metrics_sensor"
+CONF_ENABLE_LOOP_WATCHDOG = "enable_loop_watchdog"
+CONF_MAX_REQUESTS_PER_SECOND = "max_requests_per_second"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+# 0 requests per second disables the rate limit.
+DEFAULT_MAX_REQUESTS_PER_SECOND = 50
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+
+# Polling intervals (seconds). When Grocy pushes change notifications through
+# the webhook, polling only remains as a slow safety net.
+UPDATE_INTERVAL = 30
+WEBHOOK_SAFETY_UPDATE_INTERVAL = 600
 
 STATE_INIT = "init"
 STATE_READY = "ready"
@@ -21,6 +50,12 @@ SERVICE_ATTR_PRODUCT_ID = "product_id"
 SERVICE_ATTR_SHOPPING_LIST_ID = "shopping_list_id"
 SERVICE_ATTR_NOTE = "note"
 SERVICE_ATTR_AMOUNT = "amount"
+SERVICE_PIN = "pin_product"
+SERVICE_UNPIN = "unpin_product"
+SERVICE_QUERY = "query_products"
+SERVICE_CAPTURE = "capture_traffic"
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+SERVICE_PROFILE_VOICE_ADD = "profile_voice_add"
 
 # Selection Criteria Configuration Constants
 CONF_SELECTION_CRITERIA = "selection_criteria"
@@ -2,13 +2,16 @@
 
 import logging
 import time
+from collections.abc import Callable
 from datetime import timedelta
 
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN
+from .const import DOMAIN, UPDATE_INTERVAL, WEBHOOK_SAFETY_UPDATE_INTERVAL
+from .transform import build_item_list, fingerprint
 from .utils import is_update_paused
+from .webhook import is_webhook_enabled
 
 LOGGER = logging.getLogger(__name__)
 
@@ -33,11 +36,18 @@ class ShoppingListWithGrocyCoordinator(DataUpdateCoordinator):
 
     def __init__(self, hass, session, entry, api):
         """Initialize the coordinator."""
+        # With push notifications enabled, Grocy tells us when something
+        # changed; polling is only kept as a slow safety net.
+        interval = (
+            WEBHOOK_SAFETY_UPDATE_INTERVAL
+            if is_webhook_enabled(entry)
+            else UPDATE_INTERVAL
+        )
         super().__init__(
             hass,
             LOGGER,
             name=f"{DOMAIN}_coordinator",
-            update_interval=timedelta(seconds=30),
+            update_interval=timedelta(seconds=interval),
         )
         self.hass = hass
         self.session = session
@@ -55,6 +65,107 @@ class ShoppingListWithGrocyCoordinator(DataUpdateCoordinator):
             homeassistant_products = {}
         self._parsed_data.update(homeassistant_products)
 
+        # Todo lists keyed by (stringified) list id, with a version counter
+        # bumped only when a list's content actually changes.
+        self.todo_lists: dict[str, dict] = {}
+        self.todo_list_versions: dict[str, int] = {}
+        self._todo_list_hashes: dict[str, str] = {}
+        self._update_todo_index()
+
+        # Product sensors subscribe by product id and are only called when
+        # their product is part of a refresh's changeset.
+        self._product_listeners: dict[str, list[Callable[[], None]]] = {}
+        self._seen_refresh_generation = None
+        self.changed_product_ids: set[str] = set()
+        self.product_state_writes = 0
+        self.last_refresh_state_writes = 0
+
+    def async_add_product_listener(
+        self, product_id, update_callback: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Listen for changes of a single product; returns a remove callable."""
+        key = str(product_id)
+        self._product_listeners.setdefault(key, []).append(update_callback)
+
+        def remove_listener() -> None:
+            listeners = self._product_listeners.get(key)
+            if listeners and update_callback in listeners:
+                listeners.remove(update_callback)
+                if not listeners:
+                    del self._product_listeners[key]
+
+        return remove_listener
+
+    def async_update_product_listeners(self, product_ids) -> None:
+        """Call the listeners of every product in *product_ids*."""
+        for product_id in product_ids:
+            for update_callback in list(self._product_listeners.get(product_id, ())):
+                update_callback()
+
+    def has_product_listener(self, product_id) -> bool:
+        return bool(self._product_listeners.get(str(product_id)))
+
+    def merge_product(self, product_id, product_data) -> None:
+        """Merge a full or partial product payload into the parsed data.
+
+        Partial payloads (pictures) carry no quantity and leave the per-list
+        attributes alone.
+        """
+        key = str(product_id)
+        existing = self._parsed_data.get(key)
+        if existing is None:
+            self._parsed_data[key] = product_data
+            return
+
+        existing_attributes = existing.setdefault("attributes", {})
+        new_attributes = product_data.get("attributes", {})
+        if "qty_in_shopping_lists" in product_data:
+            existing["qty_in_shopping_lists"] = product_data["qty_in_shopping_lists"]
+            for attribute in [
+                attribute
+                for attribute in existing_attributes
+                if attribute.startswith("list_") and attribute not in new_attributes
+            ]:
+                existing_attributes.pop(attribute, None)
+        for attribute in product_data.get("attributes_to_remove", ()):
+            existing_attributes.pop(attribute, None)
+        existing_attributes.update(new_attributes)
+
+    def record_state_write(self) -> None:
+        """Count a product sensor state write for the current refresh."""
+        self.product_state_writes += 1
+
+    def get_todo_list(self, list_id) -> tuple[dict | None, int | None]:
+        """Return the todo list with *list_id* and its current version."""
+        key = str(list_id)
+        return self.todo_lists.get(key), self.todo_list_versions.get(key)
+
+    def _update_todo_index(self) -> None:
+        """Rebuild the per-list todo index from the current data."""
+        data = self.data or {}
+        shopping_lists_data = data.get("shopping_lists_data")
+        if not shopping_lists_data:
+            has_tables = all(
+                key in data for key in ("products", "shopping_lists", "shopping_list")
+            )
+            shopping_lists_data = build_item_list(data) if has_tables else []
+
+        hashes = getattr(self.api, "shopping_list_hashes", None) or {}
+        todo_lists = {}
+        for list_data in shopping_lists_data:
+            key = str(list_data["id"])
+            list_hash = hashes.get(key) or fingerprint(list_data)
+            if self._todo_list_hashes.get(key) != list_hash:
+                self._todo_list_hashes[key] = list_hash
+                self.todo_list_versions[key] = self.todo_list_versions.get(key, 0) + 1
+            todo_lists[key] = list_data
+
+        for key in self.todo_lists.keys() - todo_lists.keys():
+            self._todo_list_hashes.pop(key, None)
+            self.todo_list_versions.pop(key, None)
+
+        self.todo_lists = todo_lists
+
     async def _async_update_data(self):
         await self.retrieve_data()
         return self.data
@@ -102,6 +213,9 @@ class ShoppingListWithGrocyCoordinator(DataUpdateCoordinator):
         """Fetch fresh data from Grocy if the DB has changed."""
         await self.cleanup_orphaned_choices()
 
+        self.last_refresh_state_writes = self.product_state_writes
+        self.product_state_writes = 0
+
         try:
             paused = is_update_paused(self.hass)
 
@@ -109,42 +223,46 @@ class ShoppingListWithGrocyCoordinator(DataUpdateCoordinator):
                 data = await self.api.retrieve_data(force)
 
                 if data is not None:
+                    merge_started = time.perf_counter()
                     self.last_successful_fetch = self.hass.loop.time()
                     self.data = data
+                    self._update_todo_index()
                     homeassistant_products = self.data.get("homeassistant_products", {})
                     if not isinstance(homeassistant_products, dict):
                         LOGGER.error(
                             "❌ homeassistant_products is not a dictionary! Resetting."
                         )
                         homeassistant_products = {}
-                    for product_id, product_data in homeassistant_products.items():
-                        if product_id in self._parsed_data:
-                            self._parsed_data[product_id]["qty_in_shopping_lists"] = (
-                                product_data["qty_in_shopping_lists"]
-                            )
-
-                            existing_attributes = self._parsed_data[product_id][
-                                "attributes"
-                            ]
-                            new_attributes = product_data.get("attributes", {})
-
-                            existing_shopping_keys = {
-                                key
-                                for key in existing_attributes
-                                if key.startswith("list_")
-                            }
-                            new_shopping_keys = {
-                                key for key in new_attributes if key.startswith("list_")
-                            }
-                            keys_to_remove = existing_shopping_keys - new_shopping_keys
-
-                            for key in keys_to_remove:
-                                existing_attributes.pop(key, None)
-
-                            existing_attributes.update(new_attributes)
-
-                        else:
-                            self._parsed_data[product_id] = product_data
+
+                    generation = getattr(self.api, "refresh_generation", None)
+                    if generation != self._seen_refresh_generation:
+                        self._seen_refresh_generation = generation
+                        changed = getattr(self.api, "changed_product_ids", None)
+                        self.changed_product_ids = set(
+                            homeassistant_products if changed is None else changed
+                        )
+                    else:
+                        self.changed_product_ids = set()
+
+                    for product_id in self.changed_product_ids:
+                        product_data = homeassistant_products.get(product_id)
+                        if product_data is not None:
+                            self.merge_product(product_id, product_data)
+
+                    self.async_update_product_listeners(self.changed_product_ids)
+                    metrics = getattr(self.api, "metrics", None)
+                    if metrics is not None:
+                        metrics.add_phase(
+                            "coordinator_merge",
+                            (time.perf_counter() - merge_started) * 1000,
+                        )
+                    if self.changed_product_ids:
+                        LOGGER.debug(
+                            "%d product(s) changed, %d product state write(s) "
+                            "during the previous refresh",
+                            len(self.changed_product_ids),
+                            self.last_refresh_state_writes,
+                        )
 
                 else:
                     LOGGER.warning("Received empty or invalid data from API.")
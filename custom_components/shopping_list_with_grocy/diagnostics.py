@@ -0,0 +1,51 @@
+"""Diagnostics for the Shopping List with Grocy integration."""
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_WEBHOOK_ID, DOMAIN
+
+TO_REDACT = {"api_key", CONF_WEBHOOK_ID}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Return the configuration and the refresh metrics of the integration."""
+    coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    diagnostics = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+    }
+    if coordinator is None:
+        return diagnostics
+
+    api = coordinator.api
+    data = coordinator.data or {}
+    diagnostics["coordinator"] = {
+        "update_interval": str(coordinator.update_interval),
+        "last_update_success": coordinator.last_update_success,
+        "products": len(data.get("homeassistant_products") or {}),
+        "shopping_lists": len(data.get("shopping_lists_data") or {}),
+        "product_state_writes_last_refresh": coordinator.last_refresh_state_writes,
+    }
+    diagnostics["refresh"] = {
+        "last_db_changed_time": str(api.last_db_changed_time),
+        "last_refresh_timing": api.last_refresh_timing,
+        "stale_tables": sorted(api.stale_tables),
+        "images": api.image_scheduler.summary(),
+        **api.metrics.summary(),
+    }
+    diagnostics["grocy_connection"] = {
+        "circuit_breaker": api.breaker.summary(),
+        "limiter": api.limiter.summary(),
+        "timeouts": {name: timeout.summary() for name, timeout in api.timeouts.items()},
+        "retried_requests": api.retried_requests,
+    }
+    watchdog = hass.data[DOMAIN].get("instances", {}).get("loop_watchdog")
+    if watchdog is not None:
+        diagnostics["loop_watchdog"] = watchdog.summary()
+    return diagnostics
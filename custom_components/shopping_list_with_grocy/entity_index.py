@@ -0,0 +1,80 @@
+"""Index of the entities owned by the Shopping List with Grocy integration.
+
+Product sensors and todo lists register themselves here when they are added
+and removed, so lookups never have to scan every state or registry entry in
+Home Assistant.
+"""
+
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN, ENTITY_VERSION
+
+LOGGER = logging.getLogger(__name__)
+
+PRODUCT_UNIQUE_ID_PREFIX = f"{DOMAIN}_product_v{ENTITY_VERSION}_"
+
+
+def product_entity_id(product_id) -> str:
+    """Return the entity id of the sensor of *product_id*."""
+    return f"sensor.{PRODUCT_UNIQUE_ID_PREFIX}{product_id}"
+
+
+class EntityIndex:
+    """Product id -> sensor entity id and list id -> todo entity."""
+
+    def __init__(self) -> None:
+        self.products: dict[str, str] = {}
+        self.todo_lists: dict[str, object] = {}
+
+    def add_product(self, product_id, entity_id: str | None = None) -> None:
+        key = str(product_id)
+        self.products[key] = entity_id or product_entity_id(key)
+
+    def remove_product(self, product_id, entity_id: str | None = None) -> str | None:
+        key = str(product_id)
+        if entity_id is not None and self.products.get(key) != entity_id:
+            return None
+        return self.products.pop(key, None)
+
+    def product_entity_ids(self) -> list[str]:
+        return list(self.products.values())
+
+    def add_todo_list(self, list_id, entity) -> None:
+        self.todo_lists[str(list_id)] = entity
+
+    def remove_todo_list(self, list_id, entity=None) -> None:
+        key = str(list_id)
+        if entity is None or self.todo_lists.get(key) is entity:
+            self.todo_lists.pop(key, None)
+
+    def todo_entities(self) -> list:
+        return list(self.todo_lists.values())
+
+    def seed_from_registry(self, hass: HomeAssistant, config_entry_id: str) -> None:
+        """Add the product sensors already registered for a config entry.
+
+        Covers sensors restored from a previous run that have not been added
+        as entities yet.
+        """
+        registry = er.async_get(hass)
+        for entry in er.async_entries_for_config_entry(registry, config_entry_id):
+            if entry.domain == "sensor" and entry.unique_id.startswith(
+                PRODUCT_UNIQUE_ID_PREFIX
+            ):
+                self.add_product(
+                    entry.unique_id[len(PRODUCT_UNIQUE_ID_PREFIX) :], entry.entity_id
+                )
+
+        LOGGER.debug("Indexed %d registered product sensor(s)", len(self.products))
+
+
+def get_entity_index(hass: HomeAssistant) -> EntityIndex:
+    """Return the integration's entity index, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    index = domain_data.get("entity_index")
+    if index is None:
+        index = domain_data["entity_index"] = EntityIndex()
+    return index
@@ -1,8 +1,9 @@
 """Support for Grocy shopping suggestions."""
 
+import gzip
+import hashlib
 import logging
 import os
-import time
 
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.components.panel_custom import async_register_panel
@@ -17,6 +18,51 @@ FRONTEND_PATH = os.path.join(os.path.dirname(__file__), "www")
 PANEL_NAME = "grocy-shopping-suggestions"
 PANEL_ICON = "mdi:cart"
 
+PANEL_MODULE = "suggestion-card.js"
+TRANSLATIONS_DIR = "translations"
+
+
+def _write_gzip_variant(path: str, data: bytes) -> None:
+    """Write a pre-compressed copy next to *path*, served to gzip clients."""
+    gz_path = f"{path}.gz"
+    try:
+        if os.path.exists(gz_path) and os.path.getmtime(gz_path) >= os.path.getmtime(
+            path
+        ):
+            return
+        with open(gz_path, "wb") as gz_file:
+            gz_file.write(gzip.compress(data, compresslevel=9, mtime=0))
+    except OSError as err:
+        LOGGER.debug("Unable to write %s: %s", gz_path, err)
+
+
+def fingerprint_assets(frontend_path: str = FRONTEND_PATH) -> dict[str, tuple]:
+    """Return a content-hashed url name and the file path of every asset.
+
+    Runs in the executor: reads and hashes the panel module and its
+    translations, and writes their gzip variants.
+    """
+    names = [PANEL_MODULE]
+    translations_path = os.path.join(frontend_path, TRANSLATIONS_DIR)
+    if os.path.isdir(translations_path):
+        names.extend(
+            f"{TRANSLATIONS_DIR}/{file_name}"
+            for file_name in sorted(os.listdir(translations_path))
+            if file_name.endswith(".json")
+        )
+
+    assets = {}
+    for name in names:
+        path = os.path.join(frontend_path, name)
+        with open(path, "rb") as asset_file:
+            data = asset_file.read()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        stem, extension = os.path.splitext(name)
+        assets[name] = (f"{stem}.{digest}{extension}", path)
+        _write_gzip_variant(path, data)
+
+    return assets
+
 
 async def async_setup_frontend(hass: HomeAssistant) -> None:
     """Set up the Grocy shopping suggestions frontend."""
@@ -24,16 +70,26 @@ async def async_setup_frontend(hass: HomeAssistant) -> None:
     static_url_path = f"/{DOMAIN}"
     panel_url_path = PANEL_NAME
 
+    assets = await hass.async_add_executor_job(fingerprint_assets)
+
     await hass.http.async_register_static_paths(
         [
             StaticPathConfig(
-                url_path=f"{static_url_path}/suggestion-card.js",
-                path=os.path.join(FRONTEND_PATH, "suggestion-card.js"),
+                url_path=f"{static_url_path}/{hashed_name}",
+                path=path,
+                cache_headers=True,
+            )
+            for hashed_name, path in assets.values()
+        ]
+        + [
+            StaticPathConfig(
+                url_path=f"{static_url_path}/{PANEL_MODULE}",
+                path=os.path.join(FRONTEND_PATH, PANEL_MODULE),
                 cache_headers=False,
             ),
             StaticPathConfig(
-                url_path=f"{static_url_path}/translations",
-                path=os.path.join(FRONTEND_PATH, "translations"),
+                url_path=f"{static_url_path}/{TRANSLATIONS_DIR}",
+                path=os.path.join(FRONTEND_PATH, TRANSLATIONS_DIR),
                 cache_headers=False,
             ),
             StaticPathConfig(
@@ -46,7 +102,14 @@ async def async_setup_frontend(hass: HomeAssistant) -> None:
 
     if PANEL_NAME not in hass.data.get(DOMAIN, {}).get("panels", []):
         try:
-            module_url = f"{static_url_path}/suggestion-card.js?t={int(time.time())}"
+            module_url = f"{static_url_path}/{assets[PANEL_MODULE][0]}"
+            translation_urls = {
+                os.path.splitext(os.path.basename(name))[0]: (
+                    f"{static_url_path}/{hashed_name}"
+                )
+                for name, (hashed_name, _) in assets.items()
+                if name.startswith(f"{TRANSLATIONS_DIR}/")
+            }
 
             language = hass.config.language
             sidebar_title_translations = {
@@ -67,6 +130,7 @@ async def async_setup_frontend(hass: HomeAssistant) -> None:
                 module_url=module_url,
                 embed_iframe=False,
                 require_admin=False,
+                config={"translations": translation_urls},
             )
 
             if "panels" not in hass.data[DOMAIN]:
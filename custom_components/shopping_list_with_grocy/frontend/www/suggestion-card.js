@@ -9,9 +9,13 @@ class GrocyShoppingSuggestions extends LitElement {
         return {
             hass: { type: Object },
             config: { type: Object },
+            panel: { type: Object },
             quantities: { type: Object },
             _loading: { type: Boolean },
             _shoppingListItems: { type: Object },
+            _suggestions: { type: Array },
+            _total: { type: Number },
+            _lastUpdate: { type: String },
             narrow: { type: Boolean, reflect: true }
         };
     }
@@ -21,6 +25,11 @@ class GrocyShoppingSuggestions extends LitElement {
         this.quantities = {};
         this._loading = false;
         this._shoppingListItems = {};
+        this._suggestions = [];
+        this._total = 0;
+        this._version = null;
+        this._lastUpdate = null;
+        this._unsubscribe = null;
         this.narrow = false;
         
         this._resizeHandler = this._updateNarrowState.bind(this);
@@ -40,6 +49,10 @@ class GrocyShoppingSuggestions extends LitElement {
     disconnectedCallback() {
         super.disconnectedCallback();
         window.removeEventListener('resize', this._resizeHandler);
+        if (this._unsubscribe) {
+            this._unsubscribe.then(unsub => unsub()).catch(() => {});
+            this._unsubscribe = null;
+        }
     }
 
     updated(changedProps) {
@@ -47,9 +60,72 @@ class GrocyShoppingSuggestions extends LitElement {
         if (changedProps.has('hass')) {
             this._updateShoppingListState();
             this._updateNarrowState();
+            this._subscribeSuggestions();
+        }
+    }
+
+    _subscribeSuggestions() {
+        if (this._unsubscribe || !this.hass?.connection) return;
+        this._unsubscribe = this.hass.connection.subscribeMessage(
+            event => this._handleSuggestionsEvent(event),
+            { type: 'shopping_list_with_grocy/suggestions/subscribe' }
+        );
+    }
+
+    _handleSuggestionsEvent(event) {
+        const isDelta = 'added' in event;
+        if (!isDelta || this._version === null || event.version !== this._version + 1) {
+            this._loadSuggestions(0);
+            return;
+        }
+        const removed = new Set(event.removed);
+        const updated = new Map(event.updated.map(s => [s.id, s]));
+        this._suggestions = [
+            ...this._suggestions
+                .filter(s => !removed.has(s.id))
+                .map(s => updated.get(s.id) || s),
+            ...event.added,
+        ].sort((a, b) => b.score - a.score);
+        this._total += event.added.length - event.removed.length;
+        this._version = event.version;
+        this._lastUpdate = event.last_update;
+    }
+
+    async _loadSuggestions(offset) {
+        try {
+            const page = await this.hass.callWS({
+                type: 'shopping_list_with_grocy/suggestions/list',
+                offset: offset,
+                limit: 20,
+            });
+            this._suggestions = offset === 0 ? page.items : [...this._suggestions, ...page.items];
+            this._total = page.total;
+            this._version = page.version;
+            this._lastUpdate = page.last_update;
+        } catch (err) {
+            console.warn('Failed to load suggestions:', err.message);
+        }
+    }
+
+    async _dismissSuggestion(suggestion) {
+        try {
+            await this.hass.callWS({
+                type: 'shopping_list_with_grocy/suggestions/dismiss',
+                suggestion_id: suggestion.id,
+            });
+        } catch (err) {
+            console.warn('Failed to dismiss suggestion:', suggestion.name, err.message);
         }
     }
 
+    async _acceptSuggestion(suggestion, quantity) {
+        await this.hass.callWS({
+            type: 'shopping_list_with_grocy/suggestions/accept',
+            suggestion_id: suggestion.id,
+            quantity: quantity,
+        });
+    }
+
     _updateNarrowState() {
         const narrow = window.innerWidth < 870 || this._isSidebarCollapsed();
         if (narrow !== this.narrow) {
@@ -119,15 +195,18 @@ class GrocyShoppingSuggestions extends LitElement {
         const lang = langRaw.toLowerCase().split(/[-_]/)[0];
 
         const base = "/shopping_list_with_grocy";
+        // Content-hashed URLs never change for a given file, so the browser may cache them.
+        const hashed = this.panel?.config?.translations || {};
+        const fingerprinted = new Set(Object.values(hashed));
         const candidates = [
-            `${base}/translations/${langRaw}.json`,
-            `${base}/translations/${lang}.json`,
-            `${base}/translations/en.json`,
+            hashed[langRaw] || `${base}/translations/${langRaw}.json`,
+            hashed[lang] || `${base}/translations/${lang}.json`,
+            hashed.en || `${base}/translations/en.json`,
         ];
 
         for (const url of candidates) {
             try {
-            const res = await fetch(url, { cache: "no-store" });
+            const res = await fetch(url, { cache: fingerprinted.has(url) ? "default" : "no-store" });
             if (!res.ok) continue;
             const json = await res.json();
             this._localTranslations = json || {};
@@ -271,7 +350,8 @@ class GrocyShoppingSuggestions extends LitElement {
             this._loading = true;
             this.requestUpdate();
             await this.hass.callService('shopping_list_with_grocy', 'suggest_grocery_list', {
-                disable_notification: true
+                disable_notification: true,
+                max_age: 0
             });
             this.quantities = {};
         } catch (err) {
@@ -308,8 +388,8 @@ class GrocyShoppingSuggestions extends LitElement {
     render() {
         if (!this.hass) return html``;
 
-        const suggestions = this.hass.states['sensor.grocy_shopping_suggestions']?.attributes?.suggestions || [];
-        const lastUpdate = this.hass.states['sensor.grocy_shopping_suggestions']?.attributes?.last_update;
+        const suggestions = this._suggestions;
+        const lastUpdate = this._lastUpdate;
         
         let emptyMessage;
         let showAddButton = false;
@@ -355,6 +435,12 @@ class GrocyShoppingSuggestions extends LitElement {
                                         ${this._getVisibleSuggestions(suggestions)
                                             .map(suggestion => this._renderSuggestion(suggestion))}
                                     </div>
+                                    ${suggestions.length < this._total
+                                        ? html`
+                                            <mwc-button @click=${() => this._loadSuggestions(suggestions.length)}>
+                                                ${this.t('shopping_list_with_grocy.ui.panel.load_more')}
+                                            </mwc-button>`
+                                        : ''}
                                 `
                             }
                         </div>
@@ -412,6 +498,12 @@ class GrocyShoppingSuggestions extends LitElement {
                         ?disabled=${quantity === 0 || this._loading}
                         class=${suggestion._adding ? 'spin' : ''}>
                     </mwc-icon-button>
+                    <ha-icon-button
+                        @click=${() => this._dismissSuggestion(suggestion)}
+                        .path=${"M19,6.41L17.59,5L12,10.59L6.41,5L5,6.41L10.59,12L5,17.59L6.41,19L12,13.41L17.59,19L19,17.59L13.41,12L19,6.41Z"}
+                        label=${this.t('shopping_list_with_grocy.ui.panel.dismiss')}
+                        ?disabled=${this._loading}>
+                    </ha-icon-button>
                 </div>
             </div>
         `;
@@ -450,11 +542,7 @@ class GrocyShoppingSuggestions extends LitElement {
             
             for (const suggestion of productsToAdd) {
                 const quantity = this.quantities[suggestion.id] || 0;
-                await this.hass.callService('shopping_list_with_grocy', 'add_product', {
-                    product_id: suggestion.id,
-                    quantity: quantity,
-                    disable_notification: true
-                });
+                await this._acceptSuggestion(suggestion, quantity);
                 addedProductIds.push(suggestion.id);
             }
 
@@ -495,11 +583,7 @@ class GrocyShoppingSuggestions extends LitElement {
             suggestion._adding = true;
             this.requestUpdate();
 
-            await this.hass.callService('shopping_list_with_grocy', 'add_product', {
-                product_id: suggestion.id,
-                quantity: quantity,
-                disable_notification: true
-            });
+            await this._acceptSuggestion(suggestion, quantity);
 
             // Clear the quantity for this product and update shopping list state
             this.quantities = {
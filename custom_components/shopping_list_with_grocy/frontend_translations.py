@@ -1,39 +1,22 @@
 import logging
-import os
 from typing import Any, Dict
 
 from homeassistant.core import HomeAssistant
-from homeassistant.util.json import load_json_object
 
-LOGGER = logging.getLogger(__name__)
+from .translation_service import async_get_translation_service
 
-FRONTEND_TRANSLATIONS_PATH = os.path.join(
-    os.path.dirname(__file__), "frontend", "www", "translations"
-)
+LOGGER = logging.getLogger(__name__)
 
 
 async def async_load_frontend_translations(
     hass: HomeAssistant, language: str
 ) -> Dict[str, Any]:
-    """Load frontend translations for the specified language."""
-
-    languages_to_try = [language, "en"] if language != "en" else ["en"]
-
-    for lang in languages_to_try:
-        translation_file = os.path.join(FRONTEND_TRANSLATIONS_PATH, f"{lang}.json")
-
-        if os.path.exists(translation_file):
-            try:
-                translations = await hass.async_add_executor_job(
-                    load_json_object, translation_file
-                )
-                return translations.get("shopping_list_with_grocy", {})
-            except Exception as e:
-                LOGGER.warning("Failed to load translations for %s: %s", lang, e)
-                continue
-
-    LOGGER.warning("No frontend translations could be loaded, using empty fallback")
-    return {}
+    """Return the frontend translations for the specified language."""
+    service = await async_get_translation_service(hass, language)
+    translations = service.frontend_bundle(language)
+    if not translations:
+        LOGGER.warning("No frontend translations could be loaded, using empty fallback")
+    return translations
 
 
 def get_notification_strings(
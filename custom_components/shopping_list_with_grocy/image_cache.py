@@ -0,0 +1,210 @@
+"""Disk cache of product pictures, with thumbnails served over HTTP.
+
+Each picture is downloaded from Grocy once, at the largest size served, and
+kept under ``.storage``. Thumbnails are derived from it with Pillow in the
+executor, as WebP (JPEG when Pillow lacks WebP support), and stored next to
+it. Changing the image size option therefore only computes new thumbnails.
+
+Files are named after a keyed hash of the Grocy picture file name, so the
+URLs served by ``GrocyImageView`` cannot be guessed from product data and
+change whenever the picture does, which lets clients cache them forever.
+"""
+
+import contextlib
+import hashlib
+import io
+import logging
+import os
+import re
+import secrets
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+from PIL import Image, ImageOps, features
+
+from .const import DOMAIN
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_DIR = f"{DOMAIN}_images"
+SECRET_FILE = ".secret"
+# Pictures are requested from Grocy at the width of the largest thumbnail.
+SOURCE_WIDTH = 400
+THUMBNAIL_WIDTHS = {"icon": 50, "card": 150, "full": SOURCE_WIDTH}
+# The image size option (best fit width) also gets a thumbnail.
+ALLOWED_WIDTHS = frozenset({50, 100, 150, 200, SOURCE_WIDTH})
+THUMBNAIL_QUALITY = 80
+IMAGE_URL = f"/api/{DOMAIN}/images/{{key}}/{{size}}"
+VIEW_DATA_KEY = f"{DOMAIN}_image_view"
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{24}$")
+
+
+class ImageCache:
+    """Original pictures and their thumbnails, on disk.
+
+    Every method except ``url`` does file I/O and runs in the executor.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._secret: bytes | None = None
+        self.webp = features.check("webp")
+        self.extension = "webp" if self.webp else "jpg"
+        self.content_type = "image/webp" if self.webp else "image/jpeg"
+
+    def _load_secret(self) -> bytes:
+        if self._secret is None:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, SECRET_FILE)
+            try:
+                with open(path, "rb") as file:
+                    self._secret = file.read()
+            except FileNotFoundError:
+                self._secret = secrets.token_bytes(16)
+                with open(path, "wb") as file:
+                    file.write(self._secret)
+        return self._secret
+
+    def key(self, picture_file_name: str) -> str:
+        """Return the cache key of a Grocy picture file name."""
+        return hashlib.blake2b(
+            picture_file_name.encode(), key=self._load_secret(), digest_size=12
+        ).hexdigest()
+
+    @staticmethod
+    def url(key: str, size: str = "card") -> str:
+        return IMAGE_URL.format(key=key, size=size)
+
+    def _source_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.src")
+
+    def _thumbnail_path(self, key: str, width: int) -> str:
+        return os.path.join(self.directory, f"{key}_{width}.{self.extension}")
+
+    def has_source(self, key: str) -> bool:
+        return os.path.exists(self._source_path(key))
+
+    def store_source(self, key: str, data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        _write_atomic(self._source_path(key), data)
+
+    def thumbnail(self, key: str, width: int) -> bytes | None:
+        """Return the thumbnail of *key* at *width*, creating it if needed.
+
+        Returns None when the picture is not cached or cannot be decoded.
+        """
+        path = self._thumbnail_path(key, width)
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            pass
+
+        source_path = self._source_path(key)
+        try:
+            with Image.open(source_path) as source:
+                image = ImageOps.exif_transpose(source)
+                if image.width > width:
+                    height = max(1, round(image.height * width / image.width))
+                    image = image.resize((width, height), Image.Resampling.LANCZOS)
+                data = self._encode(image)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            # Not a picture after all: download it again next time.
+            LOGGER.debug("Cannot create thumbnail %s at %d px: %s", key, width, err)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(source_path)
+            return None
+
+        _write_atomic(path, data)
+        return data
+
+    def _encode(self, image: Image.Image) -> bytes:
+        buffer = io.BytesIO()
+        if self.webp:
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            image.save(buffer, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+        else:
+            image.convert("RGB").save(
+                buffer, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True
+            )
+        return buffer.getvalue()
+
+    def prune(self, pictures: set[str]) -> int:
+        """Delete the cached pictures not in *pictures*; return how many."""
+        keep = {self.key(picture) for picture in pictures}
+        removed = set()
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            key = name.split(".")[0].split("_")[0]
+            if _KEY_PATTERN.match(key) and key not in keep:
+                os.remove(os.path.join(self.directory, name))
+                removed.add(key)
+        return len(removed)
+
+
+def thumbnail_width(size: str) -> int | None:
+    """Return the width of a size name or number, None if not served."""
+    if size in THUMBNAIL_WIDTHS:
+        return THUMBNAIL_WIDTHS[size]
+    if size.isdigit() and int(size) in ALLOWED_WIDTHS:
+        return int(size)
+    return None
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    # Unique temporary name: the view and the downloads may write the same
+    # thumbnail at the same time.
+    temporary = f"{path}.{secrets.token_hex(4)}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+
+class GrocyImageView(HomeAssistantView):
+    """Serves cached product thumbnails."""
+
+    url = IMAGE_URL
+    name = f"api:{DOMAIN}:images"
+    # Keys are unguessable and frontends load entity pictures without
+    # an authorization header.
+    requires_auth = False
+
+    def __init__(self, cache: ImageCache) -> None:
+        self.cache = cache
+
+    async def get(self, request: web.Request, key: str, size: str) -> web.Response:
+        width = thumbnail_width(size)
+        if width is None or not _KEY_PATTERN.match(key):
+            return web.Response(status=404)
+
+        hass = request.app["hass"]
+        data = await hass.async_add_executor_job(self.cache.thumbnail, key, width)
+        if data is None:
+            return web.Response(status=404)
+        return web.Response(
+            body=data,
+            content_type=self.cache.content_type,
+            headers={"Cache-Control": "public, max-age=31536000, immutable"},
+        )
+
+
+def async_setup_image_view(hass: HomeAssistant, cache: ImageCache) -> None:
+    """Register the thumbnail view, or point it at *cache* after a reload.
+
+    Views cannot be unregistered, so it is kept outside ``hass.data[DOMAIN]``
+    which is dropped when the integration unloads.
+    """
+    view = hass.data.get(VIEW_DATA_KEY)
+    if view is None:
+        view = hass.data[VIEW_DATA_KEY] = GrocyImageView(cache)
+        hass.http.register_view(view)
+    else:
+        view.cache = cache
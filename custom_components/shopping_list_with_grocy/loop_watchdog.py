@@ -0,0 +1,167 @@
+"""Opt-in watchdog reporting integration code that blocks the event loop.
+
+A timer on the event loop ticks every few milliseconds. A background thread
+checks that the ticks keep coming; when the loop has not ticked for longer
+than the threshold, it takes one sample of the loop thread's stack. If an
+integration frame is on that stack, the stall is attributed to the innermost
+integration function once the loop is back, logged with a stack snippet and
+counted for diagnostics. Stalls caused by other code are only counted.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+LOGGER = logging.getLogger(__name__)
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_THRESHOLD = 0.1
+DEFAULT_INTERVAL = 0.01
+# An offender is logged at most once per this many seconds.
+LOG_INTERVAL = 60
+SNIPPET_FRAMES = 8
+SUMMARY_FUNCTIONS = 20
+
+
+class LoopWatchdog:
+    """Measures loop stalls and attributes them to integration functions."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        threshold: float = DEFAULT_THRESHOLD,
+        interval: float = DEFAULT_INTERVAL,
+        root: str = PACKAGE_DIR,
+    ) -> None:
+        self._loop = loop
+        self.threshold = threshold
+        self.interval = interval
+        self._root = root + os.sep
+        self._loop_thread_id: int | None = None
+        self._thread: threading.Thread | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._stopped = threading.Event()
+        self._last_tick = 0.0
+        self._sampled_tick = 0.0
+        self._pending: tuple[str, list[str]] | None = None
+        self._logged_at: dict[str, float] = {}
+        self.functions: dict[str, dict] = {}
+        self.stalls = 0
+        self.unattributed_stalls = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start watching; must be called from the event loop thread."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._last_tick = time.monotonic()
+        self._timer = self._loop.call_later(self.interval, self._tick)
+        self._thread = threading.Thread(
+            target=self._watch,
+            args=(self._stopped,),
+            name="grocy_loop_watchdog",
+            daemon=True,
+        )
+        self._thread.start()
+        LOGGER.debug(
+            "🐕 Loop watchdog started (threshold %.0f ms)", self.threshold * 1000
+        )
+
+    def stop(self) -> None:
+        """Stop the timer and the watching thread."""
+        if not self.running:
+            return
+        self._stopped.set()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._thread = None
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        stalled = now - self._last_tick - self.interval
+        pending, self._pending = self._pending, None
+        if stalled >= self.threshold:
+            self.stalls += 1
+            if pending is None:
+                self.unattributed_stalls += 1
+            else:
+                self._record(*pending, stalled * 1000)
+        self._last_tick = now
+        if not self._stopped.is_set():
+            self._timer = self._loop.call_later(self.interval, self._tick)
+
+    def _watch(self, stopped: threading.Event) -> None:
+        while not stopped.wait(self.interval):
+            last_tick = self._last_tick
+            if (
+                last_tick != self._sampled_tick
+                and time.monotonic() - last_tick > self.threshold + self.interval
+            ):
+                self._sampled_tick = last_tick
+                self._pending = self._sample()
+
+    def _sample(self) -> tuple[str, list[str]] | None:
+        """Return the innermost integration function on the loop thread stack."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        stack = traceback.extract_stack(frame)
+        for index in range(len(stack) - 1, -1, -1):
+            entry = stack[index]
+            if entry.filename.startswith(self._root):
+                function = f"{os.path.relpath(entry.filename, self._root)}:{entry.name}"
+                snippet = traceback.format_list(
+                    stack[max(0, index - 2) :][:SNIPPET_FRAMES]
+                )
+                return function, snippet
+        return None
+
+    def _record(self, function: str, snippet: list[str], stalled_ms: float) -> None:
+        stats = self.functions.setdefault(
+            function, {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+        stats["count"] += 1
+        stats["total_ms"] += stalled_ms
+        stats["max_ms"] = max(stats["max_ms"], stalled_ms)
+        stats["last_stack"] = "".join(snippet)
+
+        now = time.monotonic()
+        if now - self._logged_at.get(function, -LOG_INTERVAL) >= LOG_INTERVAL:
+            self._logged_at[function] = now
+            LOGGER.warning(
+                "🐢 %s blocked the event loop for %.0f ms (%d time(s) so far):\n%s",
+                function,
+                stalled_ms,
+                stats["count"],
+                stats["last_stack"],
+            )
+
+    def summary(self) -> dict:
+        """Return stall counts and the worst offenders, for diagnostics."""
+        functions = sorted(
+            self.functions.items(), key=lambda item: item[1]["total_ms"], reverse=True
+        )
+        return {
+            "threshold_ms": round(self.threshold * 1000),
+            "stalls": self.stalls,
+            "unattributed_stalls": self.unattributed_stalls,
+            "functions": {
+                function: {
+                    **stats,
+                    "total_ms": round(stats["total_ms"], 1),
+                    "max_ms": round(stats["max_ms"], 1),
+                }
+                for function, stats in functions[:SUMMARY_FUNCTIONS]
+            },
+        }
@@ -0,0 +1,131 @@
+"""Per-refresh timing and traffic metrics.
+
+Every refresh records how long each phase took (db-changed-time check, each
+table's pagination, transformation, dispatch, coordinator merge), how many
+requests, pages and bytes it used and how many products changed. The last
+refreshes are kept in a rolling window summarised as percentiles for the
+diagnostics download and the optional refresh metrics sensor.
+"""
+
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import UTC, datetime
+
+METRICS_WINDOW = 50
+
+
+def percentile(values: list, q: float) -> float | None:
+    """Return the nearest-rank *q* percentile (0-100) of *values*."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: list) -> dict:
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values) if values else None,
+    }
+
+
+class RefreshMetrics:
+    """Collects the metrics of the current refresh and of the last ones."""
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        self.current: dict | None = None
+        self.history: deque = deque(maxlen=window)
+        self.images: deque = deque(maxlen=window * 4)
+        self._started = None
+
+    def start_refresh(self) -> None:
+        self._started = time.perf_counter()
+        self.current = {
+            "started": datetime.now(UTC).isoformat(),
+            "phases": {},
+            "requests": 0,
+            "bytes": 0,
+            "pages": {},
+            "products": 0,
+            "changed_products": 0,
+        }
+
+    def finish_refresh(self, **values) -> dict | None:
+        """Close the current refresh and add it to the rolling window."""
+        if self.current is None:
+            return None
+        record = self.current
+        record.update(values)
+        record["phases"]["total"] = round(
+            (time.perf_counter() - self._started) * 1000, 2
+        )
+        self.history.append(record)
+        self.current = None
+        return record
+
+    @property
+    def last(self) -> dict | None:
+        return self.history[-1] if self.history else None
+
+    def _target(self) -> dict | None:
+        # Phases that run after the API finished a refresh, such as the
+        # coordinator merge, belong to that last refresh.
+        return self.current if self.current is not None else self.last
+
+    def add_phase(self, name: str, duration_ms: float) -> None:
+        record = self._target()
+        if record is not None:
+            phases = record["phases"]
+            phases[name] = round(phases.get(name, 0) + duration_ms, 2)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as phase *name* of the refresh."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, (time.perf_counter() - started) * 1000)
+
+    def record_request(self) -> None:
+        if self.current is not None:
+            self.current["requests"] += 1
+
+    def record_page(self, table: str, size: int) -> None:
+        if self.current is not None:
+            self.current["pages"][table] = self.current["pages"].get(table, 0) + 1
+            self.current["bytes"] += size
+
+    def record_image(self, duration_ms: float, size: int) -> None:
+        """Record a background image download, outside of any refresh."""
+        self.images.append({"ms": round(duration_ms, 2), "bytes": size})
+
+    def summary(self) -> dict:
+        """Return the last refresh and percentiles over the rolling window."""
+        phase_names = {name for record in self.history for name in record["phases"]}
+        return {
+            "refreshes": len(self.history),
+            "last_refresh": self.last,
+            "phases_ms": {
+                name: summarize(
+                    [
+                        record["phases"][name]
+                        for record in self.history
+                        if name in record["phases"]
+                    ]
+                )
+                for name in sorted(phase_names)
+            },
+            "requests": summarize([record["requests"] for record in self.history]),
+            "bytes": summarize([record["bytes"] for record in self.history]),
+            "changed_products": summarize(
+                [record["changed_products"] for record in self.history]
+            ),
+            "images_ms": summarize([image["ms"] for image in self.images]),
+            "image_bytes": sum(image["bytes"] for image in self.images),
+        }
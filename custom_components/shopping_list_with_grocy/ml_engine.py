@@ -22,6 +22,46 @@ from .analysis_const import (
 LOGGER = logging.getLogger(__name__)
 
 
+def statistics_to_history(rows: List[Dict]) -> List[Dict]:
+    """Convert daily long-term statistics rows into state history entries.
+
+    Each row holds the min/mean/max of a product sensor over one period. A day
+    is turned into an entry only when the quantity rose above the previous
+    period's maximum, or dropped back to zero, so a product staying on the list
+    for a week counts once like it does in raw state history.
+    """
+    history = []
+    previous_max = 0.0
+
+    for row in rows:
+        try:
+            period_max = float(row["max"])
+            start = row["start"]
+        except (KeyError, TypeError, ValueError):
+            continue
+
+        if isinstance(start, (int, float)):
+            start = dt.utc_from_timestamp(start)
+        if not isinstance(start, datetime):
+            continue
+
+        if period_max > previous_max or (period_max == 0 and previous_max > 0):
+            history.append({"state": str(period_max), "last_changed": start})
+        previous_max = period_max
+
+    return history
+
+
+def merge_history(
+    statistics_history: List[Dict], recent_history: List[Dict], recent_start
+) -> List[Dict]:
+    """Combine statistics-derived entries with raw states from *recent_start*."""
+    older = [
+        entry for entry in statistics_history if entry["last_changed"] < recent_start
+    ]
+    return older + recent_history
+
+
 class PurchasePredictionEngine:
     """Engine for predicting shopping needs based on statistical analysis."""
 
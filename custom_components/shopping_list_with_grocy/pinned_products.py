@@ -0,0 +1,68 @@
+"""Products the user pinned so they always keep their sensor.
+
+Only relevant in on-demand product sensor mode, where sensors otherwise exist
+only for products on a shopping list or below their minimum stock amount.
+"""
+
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.pinned_products"
+STORAGE_VERSION = 1
+
+
+class PinnedProducts:
+    """Set of pinned product ids persisted in Home Assistant storage."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self.product_ids: set[str] = set()
+
+    def __contains__(self, product_id) -> bool:
+        return str(product_id) in self.product_ids
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        self.product_ids = {str(pid) for pid in data.get("product_ids", [])}
+        LOGGER.debug("Loaded %d pinned product(s)", len(self.product_ids))
+
+    async def async_pin(self, product_id) -> bool:
+        """Pin a product; returns False if it was already pinned."""
+        key = str(product_id)
+        if key in self.product_ids:
+            return False
+        self.product_ids.add(key)
+        await self._async_save()
+        return True
+
+    async def async_unpin(self, product_id) -> bool:
+        """Unpin a product; returns False if it was not pinned."""
+        key = str(product_id)
+        if key not in self.product_ids:
+            return False
+        self.product_ids.discard(key)
+        await self._async_save()
+        return True
+
+    async def _async_save(self) -> None:
+        await self._store.async_save({"product_ids": sorted(self.product_ids)})
+
+
+async def async_load_pinned_products(hass: HomeAssistant) -> PinnedProducts:
+    """Load the pinned products and keep them in hass.data."""
+    pinned = PinnedProducts(hass)
+    await pinned.async_load()
+    hass.data.setdefault(DOMAIN, {})["pinned_products"] = pinned
+    return pinned
+
+
+def get_pinned_product_ids(hass: HomeAssistant) -> set[str]:
+    """Return the pinned product ids, or an empty set before loading."""
+    pinned = hass.data.get(DOMAIN, {}).get("pinned_products")
+    return pinned.product_ids if pinned is not None else set()
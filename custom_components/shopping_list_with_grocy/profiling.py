@@ -0,0 +1,87 @@
+"""On-demand cProfile runs of a refresh or a voice command.
+
+The profiler covers the event loop thread for the duration of the profiled
+call, including anything else the loop runs meanwhile. Work handed to the
+executor, such as the data transformation of a refresh, shows up as waiting
+time; its own duration is reported by the refresh metrics.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+
+from .const import DOMAIN
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TOP = 25
+
+
+def profile_summary(stats: pstats.Stats, top: int) -> list[dict]:
+    """Return the *top* functions by own time, as a flat list."""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "own_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in rows[:top]
+    ]
+
+
+def _write_profile(profiler: cProfile.Profile, base_path: str, top: int) -> list:
+    """Write the pstats and text summary files; runs in the executor."""
+    profiler.dump_stats(f"{base_path}.prof")
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("tottime").print_stats(top)
+    stats.sort_stats("cumulative").print_stats(top)
+    with open(f"{base_path}.txt", "w", encoding="utf-8") as file:
+        file.write(stream.getvalue())
+
+    return profile_summary(stats, top)
+
+
+async def async_profile(hass: HomeAssistant, name: str, target, top: int) -> dict:
+    """Run the ``target()`` coroutine under cProfile and save the profile.
+
+    Returns the paths of the ``.prof`` (pstats) and ``.txt`` files written
+    to the configuration folder, the duration and the top functions.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as err:
+        # Only one profiler can be active, e.g. not while the profiler
+        # integration is recording.
+        LOGGER.error("Cannot start profiling %s: %s", name, err)
+        return {"error": str(err)}
+
+    started = time.perf_counter()
+    try:
+        await target()
+    finally:
+        profiler.disable()
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    base_path = hass.config.path(
+        f"{DOMAIN}_profile_{name}_{dt.now().strftime('%Y%m%d_%H%M%S')}"
+    )
+    summary = await hass.async_add_executor_job(
+        _write_profile, profiler, base_path, top
+    )
+    LOGGER.info("⏱️ Profiled %s in %.1f ms: %s.prof", name, duration_ms, base_path)
+    return {
+        "duration_ms": duration_ms,
+        "pstats_file": f"{base_path}.prof",
+        "summary_file": f"{base_path}.txt",
+        "top": summary,
+    }
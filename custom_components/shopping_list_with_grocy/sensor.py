@@ -2,20 +2,54 @@ import asyncio
 import copy
 import logging
 import re
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import MATCH_ALL, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import StateInfo
 from homeassistant.helpers.entity_registry import async_get
-from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, ENTITY_VERSION, CONF_ENABLE_PRODUCT_SENSORS
+from .const import (
+    DOMAIN,
+    ENTITY_VERSION,
+    CONF_ENABLE_METRICS_SENSOR,
+    CONF_ENABLE_PRODUCT_SENSORS,
+    CONF_ON_DEMAND_PRODUCT_SENSORS,
+    CONF_RECORDER_PROFILE,
+    DEFAULT_RECORDER_PROFILE,
+    OTHER_FIELDS,
+    RECORDER_PROFILE_COMPACT,
+    RECORDER_PROFILE_FULL,
+    RECORDER_PROFILE_MINIMAL,
+)
+from .entity_index import get_entity_index
+from .pinned_products import get_pinned_product_ids
+from .transform import is_interesting_product
 
 LOGGER = logging.getLogger(__name__)
 SCAN_INTERVAL = timedelta(seconds=60)
 
+# Attributes of product sensors that are bulky or rarely change; the compact
+# recorder profile keeps them out of the database.
+COMPACT_UNRECORDED_ATTRIBUTES = frozenset(
+    {
+        "product_image",
+        "entity_picture",
+        "userfields",
+        "qty_unit_purchase",
+        "qty_unit_stock",
+        "qu_factor_purchase_to_stock",
+        "location",
+        "consume_location",
+        "group",
+        *OTHER_FIELDS,
+    }
+)
+LIST_DETAIL_ATTRIBUTE = re.compile(r"list_\d+_(note|shop_list_id)$")
+
 
 class GrocyMultipleChoicesSensor(SensorEntity):
     """Sensor that tracks recent multiple choice events for voice assistants."""
@@ -98,57 +132,11 @@ class GrocyShoppingSuggestionsSensor(SensorEntity):
         self._attr_unique_id = "grocy_shopping_suggestions"
         self._state = None
         self._attributes = {}
-        self._reset_timer_cancel = None
         if DOMAIN not in hass.data:
             hass.data[DOMAIN] = {}
         if "suggestions" not in hass.data[DOMAIN]:
             hass.data[DOMAIN]["suggestions"] = {"products": [], "last_update": None}
 
-    async def async_added_to_hass(self):
-        """When entity is added to hass."""
-        await super().async_added_to_hass()
-        self._reset_timer_cancel = async_track_time_interval(
-            self.hass, self._check_auto_reset, timedelta(minutes=15)
-        )
-
-    async def async_will_remove_from_hass(self):
-        """When entity will be removed from hass."""
-        if self._reset_timer_cancel:
-            self._reset_timer_cancel()
-        await super().async_will_remove_from_hass()
-
-    async def _check_auto_reset(self, now):
-        """Check if suggestions should be auto-reset after 1 hour."""
-        if DOMAIN not in self.hass.data or "suggestions" not in self.hass.data[DOMAIN]:
-            return
-
-        suggestions_data = self.hass.data[DOMAIN]["suggestions"]
-        last_update_str = suggestions_data.get("last_update")
-
-        if not last_update_str:
-            return
-
-        try:
-            last_update = datetime.fromisoformat(last_update_str.replace("Z", "+00:00"))
-            if last_update.tzinfo is None:
-                last_update = (
-                    last_update.replace(tzinfo=now.tzinfo)
-                    if now.tzinfo
-                    else last_update
-                )
-
-            time_diff = now - last_update
-            if time_diff >= timedelta(hours=1):
-                self.hass.data[DOMAIN]["suggestions"] = {
-                    "products": [],
-                    "last_update": None,
-                }
-
-                self.async_write_ha_state()
-
-        except (ValueError, TypeError) as e:
-            LOGGER.warning("Error parsing last_update time for auto-reset: %s", e)
-
     @property
     def state(self) -> int:
         """Return the number of suggestions."""
@@ -161,12 +149,10 @@ class GrocyShoppingSuggestionsSensor(SensorEntity):
         """Return entity specific state attributes."""
         if DOMAIN in self.hass.data and "suggestions" in self.hass.data[DOMAIN]:
             return {
-                "suggestions": self.hass.data[DOMAIN]["suggestions"].get(
-                    "products", []
-                ),
                 "last_update": self.hass.data[DOMAIN]["suggestions"].get("last_update"),
+                "version": self.hass.data[DOMAIN]["suggestions"].get("version"),
             }
-        return {"suggestions": [], "last_update": None}
+        return {"last_update": None}
 
 
 class GrocyVoiceResponseHelperSensor(SensorEntity):
@@ -254,42 +240,66 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     # Check if product sensors are enabled (default to True for backward compatibility)
     enable_product_sensors = config_data.get(CONF_ENABLE_PRODUCT_SENSORS, True)
 
+    # In on-demand mode only "interesting" products get a sensor
+    on_demand = config_data.get(CONF_ON_DEMAND_PRODUCT_SENSORS, False)
+
+    recorder_profile = config_data.get(CONF_RECORDER_PROFILE, DEFAULT_RECORDER_PROFILE)
+    sensor_class = product_sensor_class(recorder_profile)
+
+    entity_index = get_entity_index(hass)
+
+    def remove_product_sensor(product_id):
+        entity_id = f"sensor.{DOMAIN}_product_v{ENTITY_VERSION}_{product_id}"
+        entity_registry = async_get(hass)
+        if entity_registry.async_is_registered(entity_id):
+            entity_registry.async_remove(entity_id)
+        if hass.states.get(entity_id):
+            hass.states.async_remove(entity_id)
+        entity_index.remove_product(product_id)
+
     existing_entities = []
     if enable_product_sensors:
-        for state in hass.states.async_all():
-            if state.entity_id.startswith(
-                f"sensor.shopping_list_with_grocy_product_v{ENTITY_VERSION}_"
+        for product_id, entity_id in list(entity_index.products.items()):
+            state = hass.states.get(entity_id)
+            if state is None:
+                continue
+
+            # Try to get the product from coordinator data first
+            product_data = None
+            if hasattr(coordinator, "_parsed_data") and coordinator._parsed_data:
+                product_data = coordinator._parsed_data.get(product_id)
+
+            if (
+                on_demand
+                and product_data
+                and not is_interesting_product(
+                    product_data, get_pinned_product_ids(hass)
+                )
             ):
-                product_id = state.entity_id.split("_")[-1]
-
-                # Try to get the product from coordinator data first
-                product_data = None
-                if hasattr(coordinator, "_parsed_data") and coordinator._parsed_data:
-                    product_data = coordinator._parsed_data.get(product_id)
-
-                if product_data:
-                    existing_sensor = DynamicProductSensor(coordinator, product_data)
-                else:
-                    existing_sensor = DynamicProductSensor(
-                        coordinator,
-                        {
-                            "product_id": product_id,
-                            # Fix Copilot #1: use `or` to handle empty string friendly_name
-                            "name": state.attributes.get("friendly_name") or state.name,
-                            "qty_in_shopping_lists": state.state,
-                        },
-                    )
-                existing_entities.append(existing_sensor)
+                remove_product_sensor(product_id)
+                continue
+
+            if product_data:
+                existing_sensor = sensor_class(coordinator, product_data)
+            else:
+                existing_sensor = sensor_class(
+                    coordinator,
+                    {
+                        "product_id": product_id,
+                        # Fix Copilot #1: use `or` to handle empty string friendly_name
+                        "name": state.attributes.get("friendly_name") or state.name,
+                        "qty_in_shopping_lists": state.state,
+                    },
+                )
+            existing_entities.append(existing_sensor)
     else:
         # If product sensors are disabled, remove any existing product sensors
         entity_registry = async_get(hass)
-        for state in hass.states.async_all():
-            if state.entity_id.startswith(
-                f"sensor.shopping_list_with_grocy_product_v{ENTITY_VERSION}_"
-            ):
-                if entity_registry.async_is_registered(state.entity_id):
-                    entity_registry.async_remove(state.entity_id)
-                hass.states.async_remove(state.entity_id)
+        for product_id, entity_id in list(entity_index.products.items()):
+            if entity_registry.async_is_registered(entity_id):
+                entity_registry.async_remove(entity_id)
+            hass.states.async_remove(entity_id)
+            entity_index.remove_product(product_id)
 
     sensors = [
         GrocyShoppingListSensor(
@@ -297,6 +307,8 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         ),
         GrocyShoppingListSensor(coordinator, "products", "Product Items", config_data),
     ]
+    if config_data.get(CONF_ENABLE_METRICS_SENSOR, False):
+        sensors.append(GrocyRefreshMetricsSensor(coordinator))
 
     for sensor in sensors:
         coordinator.entities.append(sensor)
@@ -326,19 +338,36 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         )
 
         if not current_enable_product_sensors:
-            product_id = str(product["product_id"])
-            entity_id = f"sensor.{DOMAIN}_product_v{ENTITY_VERSION}_{product_id}"
-            entity_registry = async_get(hass)
-            if entity_registry.async_is_registered(entity_id):
-                entity_registry.async_remove(entity_id)
-            if hass.states.get(entity_id):
-                hass.states.async_remove(entity_id)
+            remove_product_sensor(str(product["product_id"]))
             return
 
         # Original function continues below
         product_id = str(product["product_id"])
+
+        # Partial payloads (images, quantity changes) are completed with the
+        # last parsed data before deciding whether the product needs a sensor
+        known_product = coordinator._parsed_data.get(product_id) or {}
+        if current_config_data.get(CONF_ON_DEMAND_PRODUCT_SENSORS, False):
+            candidate = {
+                **known_product,
+                **product,
+                "attributes": {
+                    **known_product.get("attributes", {}),
+                    **product.get("attributes", {}),
+                },
+            }
+            if not is_interesting_product(candidate, get_pinned_product_ids(hass)):
+                remove_product_sensor(product_id)
+                return
         entity_id = f"sensor.{DOMAIN}_product_v{ENTITY_VERSION}_{product_id}"
 
+        if coordinator.has_product_listener(product_id):
+            # The sensor writes its state when notified, and only if it
+            # changed, so a refresh notifying it as well adds no second write.
+            coordinator.merge_product(product_id, product)
+            coordinator.async_update_product_listeners({product_id})
+            return
+
         existing_sensor = hass.states.get(entity_id)
 
         if existing_sensor:
@@ -391,8 +420,16 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
             if state_changed or attributes_changed or force_picture_update:
                 hass.states.async_set(
-                    entity_id, new_state, attributes=updated_attributes
+                    entity_id,
+                    new_state,
+                    attributes=updated_attributes,
+                    state_info={
+                        "unrecorded_attributes": product_unrecorded_attributes(
+                            recorder_profile, updated_attributes
+                        )
+                    },
                 )
+                coordinator.record_state_write()
 
                 await asyncio.sleep(1)
 
@@ -405,7 +442,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                         updated_attributes
                     )
         else:
-            sensor = DynamicProductSensor(coordinator, product)
+            sensor = sensor_class(coordinator, {**known_product, **product})
             async_add_entities([sensor])
 
     async def async_remove_grocy_sensor(product_id):
@@ -416,6 +453,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             entity_registry.async_remove(entity_id)
 
         hass.states.async_remove(entity_id)
+        entity_index.remove_product(product_id)
 
         await asyncio.sleep(0.1)
 
@@ -435,6 +473,14 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
 
 class DynamicProductSensor(CoordinatorEntity, SensorEntity):
+    """Sensor holding the quantity of a product on the shopping lists.
+
+    This class records every attribute; the subclasses below exclude more of
+    them from the recorder, see ``product_sensor_class``.
+    """
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
     def __init__(self, coordinator, product):
         super().__init__(coordinator)
         product_id = product.get("product_id", "unknown")
@@ -445,6 +491,8 @@ class DynamicProductSensor(CoordinatorEntity, SensorEntity):
         self._attr_name = product.get("name", "Unknown Product")
         self.entity_id = entity_id
         self._attr_unique_id = unique_id
+        self._last_available = None
+        self._last_written = None
 
         if coordinator.config_entry and coordinator.config_entry.entry_id:
             self._attr_config_entry_id = coordinator.config_entry.entry_id
@@ -452,11 +500,14 @@ class DynamicProductSensor(CoordinatorEntity, SensorEntity):
             self._attr_config_entry_id = None
 
     @property
-    def state(self):
+    def native_value(self):
         product = self.coordinator._parsed_data.get(self._product_id)
         if product:
-            qty = product.get("qty_in_shopping_lists", 0)
-            return qty
+            try:
+                qty = float(product.get("qty_in_shopping_lists", 0))
+            except (TypeError, ValueError):
+                return None
+            return int(qty) if qty.is_integer() else qty
         return None
 
     @property
@@ -472,14 +523,44 @@ class DynamicProductSensor(CoordinatorEntity, SensorEntity):
         if self.entity_id not in self.coordinator.entities:
             self.coordinator.entities.append(self)
 
+        get_entity_index(self.hass).add_product(self._product_id, self.entity_id)
+
+        self._last_available = self.available
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.coordinator.async_add_product_listener(
+                self._product_id, self._handle_product_update
+            )
         )
 
         async_dispatcher_connect(
             self.hass, "grocy_multiple_choices_force_update", self._force_update
         )
 
+    async def async_will_remove_from_hass(self):
+        get_entity_index(self.hass).remove_product(self._product_id, self.entity_id)
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write on availability changes; data changes come per product."""
+        if self.available != self._last_available:
+            self._handle_product_update()
+
+    @callback
+    def _handle_product_update(self) -> None:
+        """Write the state after this sensor's product changed, if it did."""
+        self._last_available = self.available
+        written = (
+            self.available,
+            self.native_value,
+            dict(self.extra_state_attributes),
+        )
+        if written == self._last_written:
+            return
+        self._last_written = written
+        self.coordinator.record_state_write()
+        self.async_write_ha_state()
+
     @property
     def icon(self):
         return "mdi:cart"
@@ -489,6 +570,63 @@ class DynamicProductSensor(CoordinatorEntity, SensorEntity):
         await self.async_update_ha_state(force_refresh=True)
 
 
+class CompactDynamicProductSensor(DynamicProductSensor):
+    _unrecorded_attributes = COMPACT_UNRECORDED_ATTRIBUTES
+
+    @property
+    def _state_info(self) -> StateInfo:
+        """Recorder information Home Assistant passes with every state write.
+
+        Per-list notes and item ids are named after the lists the product is
+        on, so they are worked out again on each write.
+        """
+        return {
+            "unrecorded_attributes": product_unrecorded_attributes(
+                RECORDER_PROFILE_COMPACT, self.extra_state_attributes
+            )
+        }
+
+    @_state_info.setter
+    def _state_info(self, value: StateInfo) -> None:
+        # Set once when the entity is added, from the static attributes only.
+        pass
+
+
+class MinimalDynamicProductSensor(DynamicProductSensor):
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+
+_PRODUCT_SENSOR_CLASSES = {
+    RECORDER_PROFILE_FULL: DynamicProductSensor,
+    RECORDER_PROFILE_COMPACT: CompactDynamicProductSensor,
+    RECORDER_PROFILE_MINIMAL: MinimalDynamicProductSensor,
+}
+
+
+def product_sensor_class(profile: str) -> type[DynamicProductSensor]:
+    """Return the product sensor class implementing a recorder profile.
+
+    Home Assistant combines ``_unrecorded_attributes`` per class, so each
+    profile is its own subclass.
+    """
+    return _PRODUCT_SENSOR_CLASSES.get(profile, CompactDynamicProductSensor)
+
+
+def product_unrecorded_attributes(profile: str, attributes) -> frozenset[str]:
+    """Return the attributes the recorder should skip for a product state.
+
+    Used by the entity and when the state is written directly, bypassing it.
+    Per-list notes and item ids have dynamic names, so the compact profile
+    adds them here.
+    """
+    unrecorded = product_sensor_class(profile)._unrecorded_attributes
+    if profile == RECORDER_PROFILE_COMPACT:
+        unrecorded = unrecorded | {
+            key for key in attributes if LIST_DETAIL_ATTRIBUTE.match(key)
+        }
+    return unrecorded
+
+
 class GrocyShoppingListSensor(CoordinatorEntity, SensorEntity):
     def __init__(self, coordinator, sensor_type, name, config):
         super().__init__(coordinator)
@@ -546,3 +684,48 @@ class GrocyShoppingListSensor(CoordinatorEntity, SensorEntity):
 
         if registry_entry:
             entity_registry.async_remove(registry_entry.entity_id)
+
+
+class GrocyRefreshMetricsSensor(CoordinatorEntity, SensorEntity):
+    """Duration of the last refresh, with percentiles of the recent ones."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_icon = "mdi:timer-outline"
+    _unrecorded_attributes = frozenset({"last_phases_ms"})
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_name = "Grocy Refresh Duration"
+        self._attr_unique_id = f"{DOMAIN}_refresh_metrics"
+        self.entity_id = f"sensor.{self._attr_unique_id}"
+
+    @property
+    def _metrics(self):
+        return getattr(self.coordinator.api, "metrics", None)
+
+    @property
+    def native_value(self):
+        last = self._metrics.last if self._metrics is not None else None
+        if last is None:
+            return None
+        return last["phases"].get("total")
+
+    @property
+    def extra_state_attributes(self):
+        if self._metrics is None:
+            return {}
+        summary = self._metrics.summary()
+        last = summary["last_refresh"] or {}
+        total = summary["phases_ms"].get("total", {})
+        return {
+            "p50_ms": total.get("p50"),
+            "p95_ms": total.get("p95"),
+            "max_ms": total.get("max"),
+            "refreshes": summary["refreshes"],
+            "last_phases_ms": last.get("phases", {}),
+            "last_requests": last.get("requests"),
+            "last_bytes": last.get("bytes"),
+            "last_changed_products": last.get("changed_products"),
+        }
@@ -1,37 +1,45 @@
 import asyncio
-import json
 import logging
-import os
 import time
-from datetime import datetime, timedelta
 
 import voluptuous as vol
-from homeassistant.components.recorder.history import get_significant_states
-from homeassistant.core import callback
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import ServiceResponse, SupportsResponse, callback
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.entity_registry import async_get
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.issue_registry import async_create_issue, async_delete_issue
 
-from .analysis_const import CONF_ANALYSIS_SETTINGS
 from .const import (
     DOMAIN,
-    ENTITY_VERSION,
     SERVICE_ADD,
+    SERVICE_CAPTURE,
     SERVICE_ATTR_NOTE,
     SERVICE_ATTR_PRODUCT_ID,
     SERVICE_ATTR_SHOPPING_LIST_ID,
     SERVICE_NOTE,
+    SERVICE_PIN,
+    SERVICE_PROFILE_REFRESH,
+    SERVICE_PROFILE_VOICE_ADD,
+    SERVICE_QUERY,
     SERVICE_REFRESH,
     SERVICE_REMOVE,
     SERVICE_SEARCH,
+    SERVICE_UNPIN,
     CONF_SELECTION_CRITERIA,
 )
+from .apis.traffic_capture import TrafficCapture
+from .entity_index import get_entity_index, product_entity_id
 from .frontend_translations import (
     async_load_frontend_translations,
     get_notification_strings,
     get_voice_response,
 )
-from .ml_engine import PurchasePredictionEngine
+from .pinned_products import get_pinned_product_ids
+from .profiling import DEFAULT_TOP, async_profile
+from .suggestions import get_suggestion_manager
+from .transform import is_interesting_product
+from .translation_service import get_loaded_translation_service
 
 LOGGER = logging.getLogger(__name__)
 
@@ -51,65 +59,25 @@ async def get_voice_translation(hass, voice_key: str, **kwargs) -> str:
 
 
 def get_translation(hass, key: str, language: str = "en", **kwargs) -> str:
-    """Get translated string - use frontend translations for voice_responses."""
-    try:
-        if key.startswith("voice_responses."):
-            return key
-
-        if not language or language == "en":
-            ha_language = hass.config.language or "en"
-        else:
-            ha_language = language
-
-        translation_file = os.path.join(
-            os.path.dirname(__file__), "translations", f"{ha_language}.json"
-        )
+    """Get a translated string from the in-memory backend and frontend bundles."""
+    if not language or language == "en":
+        language = hass.config.language or "en"
 
-        if not os.path.exists(translation_file):
-            translation_file = os.path.join(
-                os.path.dirname(__file__), "translations", "en.json"
-            )
-
-        with open(translation_file, "r", encoding="utf-8") as f:
-            translations = json.load(f)
-
-        keys = key.split(".")
-        value = translations
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return key
-
-        if isinstance(value, str) and kwargs:
-            for placeholder, replacement in kwargs.items():
-                value = value.replace(f"{{{placeholder}}}", str(replacement))
-
-        return value
-
-    except Exception:
+    service = get_loaded_translation_service(hass)
+    value = service.lookup(key, language) if service else None
+    if value is None:
         return key
 
+    for placeholder, replacement in kwargs.items():
+        value = value.replace(f"{{{placeholder}}}", str(replacement))
+    return value
+
 
 async def async_force_todo_entities_refresh(hass):
     """Force TODO entities to update their attributes after cleanup."""
-    from homeassistant.helpers import entity_registry
-
-    er = entity_registry.async_get(hass)
-    todo_entities = [
-        entry
-        for entry in er.entities.values()
-        if entry.domain == "todo" and entry.platform == DOMAIN
-    ]
-    for entity_entry in todo_entities:
-        entity = hass.states.get(entity_entry.entity_id)
-        if entity:
-            entity_obj = hass.data.get("entity_components", {}).get("todo")
-            if entity_obj:
-                for ent in entity_obj.entities:
-                    if ent.entity_id == entity_entry.entity_id:
-                        ent.async_write_ha_state()
-                        break
+    for entity in get_entity_index(hass).todo_entities():
+        if entity.hass is not None and hass.states.get(entity.entity_id):
+            entity.async_write_ha_state()
 
 
 async def async_create_restart_repair_issue(hass, context: str = "setup"):
@@ -174,161 +142,125 @@ NOTE_SCHEMA = vol.Schema(
 SUGGEST_GROCERY_SCHEMA = vol.Schema(
     {
         vol.Optional("disable_notification", default=False): cv.boolean,
+        vol.Optional("max_age"): cv.positive_time_period,
     }
 )
 
+PIN_SCHEMA = vol.Schema(
+    {
+        vol.Required(SERVICE_ATTR_PRODUCT_ID): cv.string,
+    }
+)
 
-async def async_suggest_grocery_list_service(call):
-    """Service to suggest grocery items based on ML analysis."""
-    hass = call.hass
-
-    config_entry = hass.config_entries.async_entries(DOMAIN)[0]
-    config = dict(config_entry.options)
-
-    user_language = config_entry.data.get("language", hass.config.language)
-
-    try:
-        translations = await async_load_frontend_translations(hass, user_language)
-        suggestion_strings = get_notification_strings(translations, "suggestions")
-    except Exception:
-        suggestion_strings = {
-            "title": "Grocy Shopping Suggestions",
-            "card_hint": "New shopping suggestions are available! View them in the Shopping Suggestions dashboard panel.",
-        }
+QUERY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("search", default=""): cv.string,
+        vol.Optional("interesting_only", default=False): cv.boolean,
+        vol.Optional("limit", default=50): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+    }
+)
 
-    analysis_settings = config.get(CONF_ANALYSIS_SETTINGS, {})
+CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("duration", default=60): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional("anonymize", default=True): cv.boolean,
+    }
+)
 
-    prediction_engine = PurchasePredictionEngine(hass, analysis_settings)
+PROFILE_TOP = vol.All(vol.Coerce(int), vol.Range(min=5, max=200))
 
-    ent_reg = async_get(hass)
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional("top", default=DEFAULT_TOP): PROFILE_TOP,
+    }
+)
 
-    product_entities = [
-        entry.entity_id
-        for entry in ent_reg.entities.values()
-        if entry.domain == "sensor"
-        and entry.platform == "shopping_list_with_grocy"
-        and entry.unique_id.startswith(f"{DOMAIN}_product_v{ENTITY_VERSION}_")
-    ]
+PROFILE_VOICE_ADD_SCHEMA = vol.Schema(
+    {
+        vol.Required("product_name"): cv.string,
+        vol.Optional(SERVICE_ATTR_SHOPPING_LIST_ID, default=1): vol.Coerce(int),
+        vol.Optional("top", default=DEFAULT_TOP): PROFILE_TOP,
+    }
+)
 
-    now = datetime.now()
-    all_products = []
 
-    for entity_id in product_entities:
-        state = hass.states.get(entity_id)
-        if not state:
+def _grocy_product_id(value: str) -> str:
+    """Accept either a Grocy product id or a product sensor entity id."""
+    value = str(value).strip()
+    if value.startswith("sensor."):
+        return value.split("_")[-1]
+    return value
+
+
+def query_products(
+    products: dict,
+    search: str = "",
+    interesting_only: bool = False,
+    pinned=(),
+    materialized=(),
+    limit: int = 50,
+) -> list[dict]:
+    """Return a summary of the parsed products matching the query."""
+    search = search.strip().lower()
+    results = []
+    for product_id, product in products.items():
+        name = product.get("name", "")
+        if search and search not in name.lower():
+            continue
+        interesting = product_id in pinned or is_interesting_product(product)
+        if interesting_only and not interesting:
             continue
 
-        try:
-            entity = ent_reg.entities.get(entity_id)
-            if entity:
-                friendly_name = entity.original_name
-            else:
-                friendly_name = None
-        except (KeyError, AttributeError):
-            friendly_name = None
-
-        if not friendly_name:
-            friendly_name = state.attributes.get("friendly_name", entity_id)
-
-        history = await hass.async_add_executor_job(
-            get_significant_states,
-            hass,
-            now - timedelta(days=60),
-            now,
-            [entity_id],
-            None,
-            None,
-        )
-
-        history_list = []
-        if entity_id in history:
-            for state_obj in history[entity_id]:
-                try:
-                    state_val = state_obj.state if hasattr(state_obj, "state") else "0"
-                    last_changed = (
-                        state_obj.last_changed
-                        if hasattr(state_obj, "last_changed")
-                        else None
-                    )
-
-                    if last_changed:
-                        history_list.append(
-                            {"state": state_val, "last_changed": last_changed}
-                        )
-                except Exception:
-                    continue
-
-        if not history_list:
-            history_list = []
-
-        analysis = await prediction_engine.analyze_purchase_patterns(
-            entity_id, history_list, friendly_name
+        attributes = product.get("attributes", {})
+        results.append(
+            {
+                "product_id": product_id,
+                "name": name,
+                "entity_id": product_entity_id(product_id),
+                "qty_in_shopping_lists": product.get("qty_in_shopping_lists", 0),
+                "qty_in_stock": attributes.get("qty_in_stock", 0),
+                "min_stock_amount": attributes.get("min_stock_amount"),
+                "interesting": interesting,
+                "pinned": product_id in pinned,
+                "materialized": product_id in materialized,
+            }
         )
+        if len(results) >= limit:
+            break
 
-        friendly_name = ent_reg.entities[entity_id].original_name
-        if not friendly_name:
-            friendly_name = state.attributes.get("friendly_name", entity_id)
-
-        product_info = {
-            "entity_id": entity_id,
-            "friendly_name": friendly_name,
-            "score": analysis["score"],
-            "confidence": analysis["confidence"],
-            "factors": analysis["factors"],
-        }
-
-        all_products.append(product_info)
-
-    all_products.sort(key=lambda x: x["score"], reverse=True)
+    return results
 
-    suggested = []
-    debug_info = []
 
-    for product in all_products:
-        analysis = {
-            "score": product["score"],
-            "confidence": product["confidence"],
-            "factors": product["factors"],
-        }
-        if prediction_engine.should_suggest_purchase(analysis):
-            suggested.append(product)
-
-    if len(suggested) < 10:
-        remaining_needed = 10 - len(suggested)
-        additional_products = [p for p in all_products if p not in suggested][
-            :remaining_needed
-        ]
-        suggested.extend(additional_products)
-
-    for product in all_products:
-        debug_info.append(
-            f"{product['friendly_name']}:\n"
-            f"  Score: {product['score']:.2f}\n"
-            f"  Confidence: {product['confidence']:.2f}\n"
-            f"  Factors: "
-            + "\n    ".join(
-                [f"{f['type']}: {f['description']}" for f in product["factors"]]
-            )
-        )
+async def async_suggest_grocery_list_service(call) -> ServiceResponse:
+    """Service returning the shopping suggestions, recomputed when too old."""
+    hass = call.hass
 
-    filtered_products = [
-        p for p in suggested if p["score"] >= prediction_engine.score_threshold
-    ]
-    filtered_products.sort(key=lambda x: x["score"], reverse=True)
+    config_entry = hass.config_entries.async_entries(DOMAIN)[0]
+    user_language = config_entry.data.get("language", hass.config.language)
 
-    notification_title = suggestion_strings["title"]
+    manager = get_suggestion_manager(hass)
+    previous_version = manager.data.get("version")
+    max_age = call.data.get("max_age")
+    suggestions = await manager.async_get(max_age)
 
-    product_entries = []
-    for i, product in enumerate(filtered_products):
-        name_text = product["friendly_name"]
-        score_text = (
-            f"Score: {product['score']:.2f} (Confidence: {product['confidence']:.2f})"
-        )
-        product_entries.append(f"{name_text}\n{score_text}")
+    if suggestions.get("version") == previous_version:
+        manager.async_write_state()
+    elif not call.data.get("disable_notification", False):
+        try:
+            translations = await async_load_frontend_translations(hass, user_language)
+            suggestion_strings = get_notification_strings(translations, "suggestions")
+        except Exception:
+            suggestion_strings = {
+                "title": "Grocy Shopping Suggestions",
+                "card_hint": "New shopping suggestions are available! View them in the Shopping Suggestions dashboard panel.",
+            }
 
-    if not call.data.get("disable_notification", False):
         notification_data = {
-            "title": notification_title,
+            "title": suggestion_strings["title"],
             "message": suggestion_strings["card_hint"].format(
                 url="/grocy-shopping-suggestions"
             ),
@@ -338,35 +270,12 @@ async def async_suggest_grocery_list_service(call):
             "persistent_notification", "create", notification_data
         )
 
-    if "suggestions" not in hass.data[DOMAIN]:
-        hass.data[DOMAIN]["suggestions"] = {}
-
-    suggestions_data = {
-        "last_update": datetime.now().isoformat(),
-        "products": [
-            {
-                "id": p["entity_id"],
-                "name": p["friendly_name"],
-                "score": p["score"],
-                "confidence": p["confidence"],
-            }
-            for p in filtered_products
-        ],
+    return {
+        "version": suggestions.get("version"),
+        "last_update": suggestions.get("last_update"),
+        "products": suggestions.get("products", []),
     }
 
-    hass.data[DOMAIN]["suggestions"].update(suggestions_data)
-
-    entity_id = "sensor.grocy_shopping_suggestions"
-    hass.states.async_set(
-        entity_id,
-        len(filtered_products),
-        {
-            "suggestions": suggestions_data["products"],
-            "last_update": suggestions_data["last_update"],
-            "friendly_name": "Grocy Shopping Suggestions",
-        },
-    )
-
 
 @callback
 def async_setup_services(hass) -> None:
@@ -474,24 +383,12 @@ def async_setup_services(hass) -> None:
         "suggest_grocery_list",
         async_suggest_grocery_list_service,
         schema=SUGGEST_GROCERY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
     )
 
     async def async_reset_suggestions_service(service_call) -> None:
         """Reset shopping suggestions to analysis in progress state."""
-        if DOMAIN not in hass.data:
-            hass.data[DOMAIN] = {}
-        hass.data[DOMAIN]["suggestions"] = {"products": [], "last_update": None}
-
-        entity_id = "sensor.grocy_shopping_suggestions"
-        hass.states.async_set(
-            entity_id,
-            0,
-            {
-                "suggestions": [],
-                "last_update": None,
-                "friendly_name": "Grocy Shopping Suggestions",
-            },
-        )
+        await get_suggestion_manager(hass).async_reset()
 
     hass.services.async_register(
         DOMAIN,
@@ -595,6 +492,158 @@ def async_setup_services(hass) -> None:
         schema=SEARCH_SCHEMA,
     )
 
+    async def async_pin_product_service(service_call) -> None:
+        """Pin or unpin a product so it keeps its sensor in on-demand mode."""
+        pinned = hass.data.get(DOMAIN, {}).get("pinned_products")
+        if pinned is None:
+            LOGGER.error("Pinned products are not loaded")
+            return
+
+        product_id = _grocy_product_id(service_call.data[SERVICE_ATTR_PRODUCT_ID])
+        if service_call.service == SERVICE_PIN:
+            changed = await pinned.async_pin(product_id)
+        else:
+            changed = await pinned.async_unpin(product_id)
+
+        coordinator = hass.data[DOMAIN].get("instances", {}).get("coordinator")
+        product = coordinator._parsed_data.get(product_id) if coordinator else None
+        if changed and product:
+            async_dispatcher_send(hass, f"{DOMAIN}_add_or_update_sensor", product)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PIN,
+        async_pin_product_service,
+        schema=PIN_SCHEMA,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_UNPIN,
+        async_pin_product_service,
+        schema=PIN_SCHEMA,
+    )
+
+    async def async_query_products_service(service_call) -> ServiceResponse:
+        """Return products, including those without a sensor."""
+        coordinator = hass.data.get(DOMAIN, {}).get("instances", {}).get("coordinator")
+        products = coordinator._parsed_data if coordinator else {}
+
+        results = query_products(
+            products,
+            search=service_call.data["search"],
+            interesting_only=service_call.data["interesting_only"],
+            pinned=get_pinned_product_ids(hass),
+            materialized=get_entity_index(hass).products,
+            limit=service_call.data["limit"],
+        )
+        return {"count": len(results), "products": results}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY,
+        async_query_products_service,
+        schema=QUERY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_capture_traffic_service(service_call) -> ServiceResponse:
+        """Record the Grocy traffic for a while into a capture file."""
+        api = hass.data.get(DOMAIN, {}).get("instances", {}).get("api")
+        if api is None:
+            LOGGER.error("Grocy API is not set up")
+            return {"path": None}
+        if api.capture is not None:
+            LOGGER.error("A traffic capture is already running")
+            return {"path": None}
+
+        capture = api.capture = TrafficCapture(service_call.data["anonymize"])
+        path = hass.config.path(
+            f"{DOMAIN}_capture_{capture.started.strftime('%Y%m%d_%H%M%S')}.jsonl.gz"
+        )
+
+        async def async_stop_capture(*_) -> None:
+            """Save the capture at the end, on unload or when HA stops."""
+            if api.capture is not capture:
+                return
+            api.capture = None
+            hass.data.get(DOMAIN, {}).pop("stop_capture", None)
+            cancel_timer()
+            remove_stop_listener()
+            await hass.async_add_executor_job(capture.save, path)
+            LOGGER.info(
+                "📼 Saved %d captured Grocy request(s) to %s",
+                len(capture.entries),
+                path,
+            )
+
+        cancel_timer = async_call_later(
+            hass, service_call.data["duration"], async_stop_capture
+        )
+        remove_stop_listener = hass.bus.async_listen(
+            EVENT_HOMEASSISTANT_STOP, async_stop_capture
+        )
+        hass.data[DOMAIN]["stop_capture"] = async_stop_capture
+        LOGGER.info(
+            "📼 Capturing Grocy traffic for %d s", service_call.data["duration"]
+        )
+        return {"path": path, "duration": service_call.data["duration"]}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAPTURE,
+        async_capture_traffic_service,
+        schema=CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_profile_refresh_service(service_call) -> ServiceResponse:
+        """Run one full refresh under the profiler."""
+        coordinator = hass.data[DOMAIN]["instances"]["coordinator"]
+        result = await async_profile(
+            hass, "refresh", coordinator.request_update, service_call.data["top"]
+        )
+        if "error" not in result:
+            result["refresh"] = coordinator.api.metrics.last
+        return result
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        async_profile_refresh_service,
+        schema=PROFILE_REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_profile_voice_add_service(service_call) -> ServiceResponse:
+        """Run one voice add under the profiler; the product is really added."""
+
+        async def voice_add() -> None:
+            await hass.services.async_call(
+                DOMAIN,
+                "voice_add_product",
+                {
+                    "product_name": service_call.data["product_name"],
+                    "shopping_list_id": service_call.data[
+                        SERVICE_ATTR_SHOPPING_LIST_ID
+                    ],
+                    "silent": True,
+                },
+                blocking=True,
+            )
+
+        return await async_profile(
+            hass, "voice_add", voice_add, service_call.data["top"]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_VOICE_ADD,
+        async_profile_voice_add_service,
+        schema=PROFILE_VOICE_ADD_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
     async def async_test_bidirectional_sync_service(service_call) -> None:
         """Test bidirectional sync functionality without enabling it."""
         test_product_name = service_call.data.get("product_name", "Test Product")
@@ -1297,10 +1346,9 @@ def async_setup_services(hass) -> None:
                     return
             else:
                 todo_entities = [
-                    entity_id
-                    for entity_id in hass.states.async_entity_ids()
-                    if entity_id.startswith("todo.")
-                    and "shopping_list_with_grocy" in entity_id
+                    entity.entity_id
+                    for entity in get_entity_index(hass).todo_entities()
+                    if hass.states.get(entity.entity_id) is not None
                 ]
 
                 if not todo_entities:
@@ -1998,6 +2046,13 @@ def async_setup_services(hass) -> None:
     )
 
 
+async def async_stop_traffic_capture(hass) -> None:
+    """Save the running traffic capture, if any, before unloading."""
+    stop_capture = hass.data.get(DOMAIN, {}).get("stop_capture")
+    if stop_capture is not None:
+        await stop_capture()
+
+
 @callback
 def async_unload_services(hass) -> None:
     """Unload shopping list with grocy services."""
@@ -2017,3 +2072,9 @@ def async_unload_services(hass) -> None:
     hass.services.async_remove(DOMAIN, "voice_add_product_with_response")
     hass.services.async_remove(DOMAIN, "list_product_choices")
     hass.services.async_remove(DOMAIN, "force_cleanup")
+    hass.services.async_remove(DOMAIN, SERVICE_PIN)
+    hass.services.async_remove(DOMAIN, SERVICE_UNPIN)
+    hass.services.async_remove(DOMAIN, SERVICE_QUERY)
+    hass.services.async_remove(DOMAIN, SERVICE_CAPTURE)
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE_REFRESH)
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE_VOICE_ADD)
@@ -0,0 +1,373 @@
+"""Background generation and caching of shopping suggestions.
+
+Suggestions are computed from the recorder off the request path: once a day at
+a configurable hour and after a number of shopping list changes. Every result
+is stored with a version number in Home Assistant storage, so the service and
+the panel can return the last result immediately, including after a restart.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.history import get_significant_states
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.entity_registry import async_get
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt
+
+from .analysis_const import (
+    CONF_REFRESH_AFTER_CHANGES,
+    CONF_REFRESH_HOUR,
+    DEFAULT_REFRESH_AFTER_CHANGES,
+    DEFAULT_REFRESH_HOUR,
+    SUGGESTION_HISTORY_DAYS,
+    SUGGESTION_RAW_HISTORY_DAYS,
+)
+from .const import DOMAIN
+from .entity_index import get_entity_index, product_entity_id
+from .ml_engine import PurchasePredictionEngine, merge_history, statistics_to_history
+
+LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.suggestions"
+STORAGE_VERSION = 1
+
+SUGGESTIONS_ENTITY_ID = "sensor.grocy_shopping_suggestions"
+SIGNAL_SUGGESTIONS_UPDATED = f"{DOMAIN}_suggestions_updated"
+
+
+def suggestion_candidates(hass: HomeAssistant) -> dict[str, str | None]:
+    """Return the sensor entity id and name of every product to score.
+
+    Every parsed Grocy product is a candidate, not only those with a sensor:
+    with on-demand product sensors, being suggested is what gives a product
+    its sensor back, and its past statistics remain in the recorder.
+    """
+    sensors = get_entity_index(hass).products
+    coordinator = hass.data.get(DOMAIN, {}).get("instances", {}).get("coordinator")
+    products = getattr(coordinator, "_parsed_data", None) or {}
+
+    candidates = {entity_id: None for entity_id in sensors.values()}
+    for product_id, product in products.items():
+        entity_id = sensors.get(str(product_id)) or product_entity_id(product_id)
+        candidates[entity_id] = product.get("name")
+    return candidates
+
+
+async def async_compute_suggestions(hass: HomeAssistant, analysis_settings) -> list:
+    """Score every product and return the suggested products."""
+    prediction_engine = PurchasePredictionEngine(hass, analysis_settings)
+
+    ent_reg = async_get(hass)
+
+    candidates = suggestion_candidates(hass)
+    product_entities = list(candidates)
+
+    now = dt.utcnow()
+    recent_start = now - timedelta(days=SUGGESTION_RAW_HISTORY_DAYS)
+    statistics = {}
+    recent_states = {}
+    recorder = get_instance(hass)
+    if product_entities:
+        statistics = await recorder.async_add_executor_job(
+            statistics_during_period,
+            hass,
+            now - timedelta(days=SUGGESTION_HISTORY_DAYS),
+            recent_start,
+            set(product_entities),
+            "day",
+            None,
+            {"max"},
+        )
+        recent_states = await recorder.async_add_executor_job(
+            get_significant_states,
+            hass,
+            recent_start,
+            now,
+            product_entities,
+            None,
+            True,
+            True,
+            False,
+            True,
+        )
+    LOGGER.debug(
+        "📊 Loaded statistics for %d and recent states for %d product(s)",
+        len(statistics),
+        len(recent_states),
+    )
+
+    all_products = []
+
+    for entity_id in product_entities:
+        state = hass.states.get(entity_id)
+        if not state and entity_id not in statistics and entity_id not in recent_states:
+            continue
+
+        history_list = merge_history(
+            statistics_to_history(statistics.get(entity_id, [])),
+            [
+                {"state": state_obj.state, "last_changed": state_obj.last_changed}
+                for state_obj in recent_states.get(entity_id, [])
+                if getattr(state_obj, "last_changed", None)
+            ],
+            recent_start,
+        )
+
+        registry_entry = ent_reg.async_get(entity_id)
+        friendly_name = registry_entry.original_name if registry_entry else None
+        if not friendly_name and state:
+            friendly_name = state.attributes.get("friendly_name")
+        if not friendly_name:
+            friendly_name = candidates[entity_id] or entity_id
+
+        analysis = await prediction_engine.analyze_purchase_patterns(
+            entity_id, history_list, friendly_name
+        )
+
+        all_products.append(
+            {
+                "entity_id": entity_id,
+                "friendly_name": friendly_name,
+                "score": analysis["score"],
+                "confidence": analysis["confidence"],
+                "factors": analysis["factors"],
+            }
+        )
+
+    all_products.sort(key=lambda x: x["score"], reverse=True)
+
+    suggested = [
+        product
+        for product in all_products
+        if prediction_engine.should_suggest_purchase(product)
+    ]
+
+    if len(suggested) < 10:
+        remaining_needed = 10 - len(suggested)
+        additional_products = [p for p in all_products if p not in suggested][
+            :remaining_needed
+        ]
+        suggested.extend(additional_products)
+
+    for product in all_products:
+        LOGGER.debug(
+            "%s: score %.2f, confidence %.2f, factors %s",
+            product["friendly_name"],
+            product["score"],
+            product["confidence"],
+            ", ".join(f["type"] for f in product["factors"]),
+        )
+
+    filtered_products = [
+        p for p in suggested if p["score"] >= prediction_engine.score_threshold
+    ]
+    filtered_products.sort(key=lambda x: x["score"], reverse=True)
+
+    return [
+        {
+            "id": p["entity_id"],
+            "name": p["friendly_name"],
+            "score": p["score"],
+            "confidence": p["confidence"],
+        }
+        for p in filtered_products
+    ]
+
+
+def suggestions_delta(previous: list, current: list) -> dict:
+    """Return the suggestions added, updated and removed between two results."""
+    before = {product["id"]: product for product in previous}
+    after = {product["id"]: product for product in current}
+    return {
+        "added": [product for pid, product in after.items() if pid not in before],
+        "updated": [
+            product
+            for pid, product in after.items()
+            if pid in before and before[pid] != product
+        ],
+        "removed": [pid for pid in before if pid not in after],
+    }
+
+
+def suggestions_age(suggestions: dict, now: datetime | None = None):
+    """Return how old a suggestions result is, or None if there is none."""
+    last_update = suggestions.get("last_update")
+    if not last_update:
+        return None
+    try:
+        updated = datetime.fromisoformat(last_update)
+    except (TypeError, ValueError):
+        return None
+    if updated.tzinfo is None:
+        updated = updated.replace(tzinfo=dt.get_default_time_zone())
+    return (now or dt.utcnow()) - updated
+
+
+class SuggestionManager:
+    """Keeps the latest suggestions and recomputes them in the background."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._lock = asyncio.Lock()
+        self._unsub = []
+        self._changes = 0
+        self._seen_list_versions = None
+        self.analysis_settings = {}
+
+    @property
+    def data(self) -> dict:
+        """Return the suggestions shown by the sensor and the panel."""
+        return self.hass.data[DOMAIN].setdefault(
+            "suggestions", {"products": [], "last_update": None}
+        )
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if stored:
+            self.data.update(stored)
+            LOGGER.debug(
+                "Loaded %d cached suggestion(s), version %s",
+                len(stored.get("products", [])),
+                stored.get("version"),
+            )
+
+    @callback
+    def async_start(self, coordinator, analysis_settings) -> None:
+        """Schedule the daily recompute and watch the shopping lists."""
+        self.analysis_settings = analysis_settings or {}
+        self._seen_list_versions = dict(coordinator.todo_list_versions)
+
+        refresh_hour = self.analysis_settings.get(
+            CONF_REFRESH_HOUR, DEFAULT_REFRESH_HOUR
+        )
+        self._unsub.append(
+            async_track_time_change(
+                self.hass,
+                self._async_scheduled_refresh,
+                hour=refresh_hour,
+                minute=0,
+                second=0,
+            )
+        )
+        self._unsub.append(
+            coordinator.async_add_listener(
+                lambda: self._handle_lists_update(coordinator)
+            )
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        while self._unsub:
+            self._unsub.pop()()
+
+    @callback
+    def _handle_lists_update(self, coordinator) -> None:
+        versions = coordinator.todo_list_versions
+        previous = self._seen_list_versions or {}
+        self._changes += sum(
+            max(0, version - previous.get(list_id, 0))
+            for list_id, version in versions.items()
+        )
+        self._seen_list_versions = dict(versions)
+
+        threshold = self.analysis_settings.get(
+            CONF_REFRESH_AFTER_CHANGES, DEFAULT_REFRESH_AFTER_CHANGES
+        )
+        if threshold and self._changes >= threshold and not self._lock.locked():
+            LOGGER.debug(
+                "🔄 %d shopping list change(s), recomputing suggestions",
+                self._changes,
+            )
+            self.hass.async_create_background_task(
+                self.async_refresh(), f"{DOMAIN}_suggestions_refresh"
+            )
+
+    async def _async_scheduled_refresh(self, now) -> None:
+        await self.async_refresh()
+
+    async def async_get(self, max_age: timedelta | None = None) -> dict:
+        """Return cached suggestions, recomputing them if missing or too old."""
+        age = suggestions_age(self.data)
+        if age is None or (max_age is not None and age > max_age):
+            return await self.async_refresh()
+        return self.data
+
+    async def async_refresh(self) -> dict:
+        """Recompute the suggestions, or wait for a recompute in progress."""
+        if self._lock.locked():
+            async with self._lock:
+                return self.data
+
+        async with self._lock:
+            self._changes = 0
+            products = await async_compute_suggestions(
+                self.hass, self.analysis_settings
+            )
+            await self._async_publish(products, dt.now().isoformat())
+            LOGGER.info(
+                "🛒 Computed %d shopping suggestion(s), version %d",
+                len(products),
+                self.data["version"],
+            )
+            return self.data
+
+    async def async_remove(self, suggestion_id: str) -> bool:
+        """Drop one suggestion after it was accepted or dismissed."""
+        products = self.data.get("products", [])
+        remaining = [product for product in products if product["id"] != suggestion_id]
+        if len(remaining) == len(products):
+            return False
+        await self._async_publish(remaining, self.data.get("last_update"))
+        return True
+
+    async def async_reset(self) -> None:
+        await self._async_publish([], None)
+
+    async def _async_publish(self, products: list, last_update) -> None:
+        """Store a new version of the suggestions and announce what changed."""
+        previous = self.data.get("products", [])
+        result = {
+            "version": self.data.get("version", 0) + 1,
+            "last_update": last_update,
+            "products": products,
+        }
+        self.data.update(result)
+        await self._store.async_save(result)
+        self.async_write_state()
+        async_dispatcher_send(
+            self.hass,
+            SIGNAL_SUGGESTIONS_UPDATED,
+            {
+                "version": result["version"],
+                "last_update": last_update,
+                **suggestions_delta(previous, products),
+            },
+        )
+
+    @callback
+    def async_write_state(self) -> None:
+        self.hass.states.async_set(
+            SUGGESTIONS_ENTITY_ID,
+            len(self.data.get("products", [])),
+            {
+                "last_update": self.data.get("last_update"),
+                "version": self.data.get("version"),
+                "friendly_name": "Grocy Shopping Suggestions",
+            },
+        )
+
+
+def get_suggestion_manager(hass: HomeAssistant) -> SuggestionManager:
+    """Return the suggestion manager, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    manager = domain_data.get("suggestion_manager")
+    if manager is None:
+        manager = domain_data["suggestion_manager"] = SuggestionManager(hass)
+    return manager
@@ -20,6 +20,7 @@ from homeassistant.helpers.update_coordinator import (
 
 from .const import DOMAIN, CONF_SELECTION_CRITERIA
 from .coordinator import ShoppingListWithGrocyCoordinator
+from .entity_index import get_entity_index
 from .frontend_translations import async_load_frontend_translations, get_todo_strings
 
 LOGGER = logging.getLogger(__name__)
@@ -53,8 +54,26 @@ class ShoppingListWithGrocyTodoListEntity(
         self.entity_id = f"todo.{DOMAIN}_list_{self._list_id}"
         self.hass.data[DOMAIN]["shopping_lists"].append(self._list_id)
 
+        # Version of the coordinator's list last written to the state machine;
+        # reset on optimistic local edits so the next refresh always lands.
+        self._seen_version: int | None = None
+        self._seen_available: bool | None = None
+
+        # uid -> product dict of the current list, and the TodoItem list built
+        # from it; both are rebuilt lazily after the list changes.
+        self._items_by_uid: dict[str, dict] | None = None
+        self._todo_items_cache: list[TodoItem] | None = None
+
         self._update_supported_features()
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        get_entity_index(self.hass).add_todo_list(self._list_id, self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        get_entity_index(self.hass).remove_todo_list(self._list_id, self)
+        await super().async_will_remove_from_hass()
+
     @property
     def available(self) -> bool:
         """Return if entity is available."""
@@ -70,25 +89,42 @@ class ShoppingListWithGrocyTodoListEntity(
             )
             return
 
-        shopping_lists_data = self.coordinator.data.get("shopping_lists_data", [])
-        if shopping_lists_data:
-            for list_data in shopping_lists_data:
-                if str(list_data.get("id")) == str(self._list_id):
-                    self._data = list_data
-                    break
-        else:
-            shopping_lists = self.coordinator.api.build_item_list(self.coordinator.data)
-            shopping_list = next(
-                (lst for lst in shopping_lists if lst["id"] == self._list_id), None
-            )
-            if shopping_list:
-                self._data = shopping_list
-                new_name = f"{self._list_prefix} {shopping_list['name'] or f'List #{shopping_list["id"]}'}".strip()
-                if self._attr_name != new_name:
-                    self._attr_name = new_name
-
+        list_data, version = self.coordinator.get_todo_list(self._list_id)
+        available = self.available
+        if version is not None and version == self._seen_version:
+            if available == self._seen_available:
+                return
+        elif list_data is not None:
+            self._data = list_data
+            self._invalidate_items()
+            new_name = f"{self._list_prefix} {list_data['name'] or f'List #{list_data["id"]}'}".strip()
+            if self._attr_name != new_name:
+                self._attr_name = new_name
+
+        self._seen_version = version
+        self._seen_available = available
         super()._handle_coordinator_update()
 
+    def _invalidate_items(self) -> None:
+        """Drop the uid index and cached TodoItems after the list changed."""
+        self._items_by_uid = None
+        self._todo_items_cache = None
+
+    def _item_index(self) -> dict[str, dict]:
+        """Return the products of this list keyed by todo item uid."""
+        if self._items_by_uid is None:
+            self._items_by_uid = {
+                str(product["shop_list_id"]): product
+                for product in self._data.get("products", [])
+            }
+        return self._items_by_uid
+
+    def _set_item_status(self, uid: str, status: TodoItemStatus) -> None:
+        product = self._item_index().get(str(uid))
+        if product is not None:
+            product["status"] = status
+            self._todo_items_cache = None
+
     def _update_supported_features(self):
         config_entry = None
         for entry in self.hass.config_entries.async_entries(DOMAIN):
@@ -121,24 +157,27 @@ class ShoppingListWithGrocyTodoListEntity(
     @property
     def todo_items(self) -> list[TodoItem]:
         """Return the current todo items."""
-        return [
-            TodoItem(
-                summary=product["name"],
-                uid=str(product["shop_list_id"]),
-                status=product["status"],
-            )
-            for product in self._data.get("products", [])
-        ]
+        if self._todo_items_cache is None:
+            self._todo_items_cache = [
+                TodoItem(
+                    summary=product["name"],
+                    uid=uid,
+                    status=product["status"],
+                )
+                for uid, product in self._item_index().items()
+            ]
+        return self._todo_items_cache
 
     async def async_delete_todo_items(self, uids: list[str]) -> None:
         """Delete todo items from Grocy and update local state."""
         LOGGER.debug("Deleting %d items from list %s", len(uids), self._list_id)
 
-        self._data["products"] = [
-            product
-            for product in self._data.get("products", [])
-            if str(product["shop_list_id"]) not in uids
-        ]
+        items = self._item_index()
+        for uid in uids:
+            items.pop(str(uid), None)
+        self._data["products"] = list(items.values())
+        self._todo_items_cache = None
+        self._seen_version = None
         self.async_write_ha_state()
 
         tasks = [
@@ -202,6 +241,8 @@ class ShoppingListWithGrocyTodoListEntity(
                 if "products" not in self._data:
                     self._data["products"] = []
                 self._data["products"].append(new_product)
+                self._invalidate_items()
+                self._seen_version = None
                 self.async_write_ha_state()
                 await self.coordinator.async_refresh()
 
@@ -330,15 +371,12 @@ class ShoppingListWithGrocyTodoListEntity(
         try:
             checked = item.status == TodoItemStatus.COMPLETED
 
-            for product in self._data.get("products", []):
-                if str(product["shop_list_id"]) == str(item.uid):
-                    product["status"] = (
-                        TodoItemStatus.COMPLETED
-                        if checked
-                        else TodoItemStatus.NEEDS_ACTION
-                    )
-                    break
+            self._set_item_status(
+                item.uid,
+                TodoItemStatus.COMPLETED if checked else TodoItemStatus.NEEDS_ACTION,
+            )
 
+            self._seen_version = None
             self.async_write_ha_state()
 
             try:
@@ -347,14 +385,12 @@ class ShoppingListWithGrocyTodoListEntity(
             except Exception as e:
                 LOGGER.error("Failed to update item %s in Grocy: %s", item.uid, e)
 
-                for product in self._data.get("products", []):
-                    if str(product["shop_list_id"]) == str(item.uid):
-                        product["status"] = (
-                            TodoItemStatus.NEEDS_ACTION
-                            if checked
-                            else TodoItemStatus.COMPLETED
-                        )
-                        break
+                self._set_item_status(
+                    item.uid,
+                    TodoItemStatus.NEEDS_ACTION
+                    if checked
+                    else TodoItemStatus.COMPLETED,
+                )
                 self.async_write_ha_state()
                 raise
 
@@ -0,0 +1,205 @@
+"""Transformation of raw Grocy tables into the integration's data model.
+
+Everything in this module is CPU-bound and free of event-loop access, so a
+refresh can run it in the executor and only hand the result back to the loop
+for dispatching and state writes.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+
+from homeassistant.components.todo import TodoItemStatus
+
+from .const import OTHER_FIELDS
+
+
+def group_by_product(rows: list) -> dict[str, list]:
+    """Index shopping list or stock rows by their (stringified) product id.
+
+    Rows without a product (free-text shopping list notes) are skipped.
+    """
+    grouped = defaultdict(list)
+    for row in rows:
+        raw_pid = row.get("product_id")
+        if raw_pid is None:
+            continue
+        grouped[str(int(raw_pid))].append(row)
+    return grouped
+
+
+def purchase_to_stock_factor(product: dict) -> float:
+    """Return the purchase-to-stock quantity factor of a product."""
+    if product.get("qu_id_purchase") != product.get("qu_id_stock"):
+        return float(product.get("qu_factor_purchase_to_stock", 1.0))
+    return 1.0
+
+
+def fingerprint(value) -> str:
+    """Return a short, stable hash of a JSON-serializable value."""
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def is_interesting_product(product: dict, pinned=()) -> bool:
+    """Return True if a parsed product deserves its own sensor.
+
+    Interesting products are on a shopping list, below their minimum stock
+    amount, or pinned by the user.
+    """
+    if str(product.get("product_id")) in pinned:
+        return True
+
+    try:
+        if float(product.get("qty_in_shopping_lists") or 0) > 0:
+            return True
+        attributes = product.get("attributes", {})
+        min_stock = float(attributes.get("min_stock_amount") or 0)
+        return min_stock > 0 and float(attributes.get("qty_in_stock") or 0) < min_stock
+    except (TypeError, ValueError):
+        return False
+
+
+def parse_products(data: dict, shopping_list_index=None, stock_index=None) -> dict:
+    """Build the per-product sensor payloads, keyed by product id."""
+    if shopping_list_index is None:
+        shopping_list_index = group_by_product(data["shopping_list"])
+    if stock_index is None:
+        stock_index = group_by_product(data["stock"])
+
+    quantity_units = {q["id"]: q["name"] for q in data["quantity_units"]}
+    locations = {loc["id"]: loc["name"] for loc in data["locations"]}
+    product_groups = {g["id"]: g["name"] for g in data["product_groups"]}
+
+    parsed_products = {}
+    for product in data["products"]:
+        product_id = int(product["id"])
+        key = str(product_id)
+
+        qty_factor = purchase_to_stock_factor(product)
+
+        shopping_lists = {}
+        qty_in_shopping_lists = 0
+
+        for in_shopping_list in shopping_list_index.get(key, ()):
+            shopping_list_id = int(in_shopping_list["shopping_list_id"])
+            in_shop_list = round(int(in_shopping_list["amount"]) / qty_factor)
+            shopping_lists[f"list_{shopping_list_id}"] = {
+                "shop_list_id": in_shopping_list["id"],
+                "qty": in_shop_list,
+                "note": in_shopping_list.get("note", ""),
+            }
+            qty_in_shopping_lists += in_shop_list
+
+        stock_rows = stock_index.get(key, ())
+        stock_qty = sum(float(stock["amount"]) for stock in stock_rows)
+        opened_qty = sum(
+            float(stock["amount"]) * int(stock["open"]) for stock in stock_rows
+        )
+        unopened_qty = max(0, stock_qty - opened_qty)
+
+        prod_dict = {
+            "product_id": product_id,
+            "parent_product_id": product.get("parent_product_id"),
+            "qty_in_stock": round(stock_qty, 2),
+            "qty_opened": round(opened_qty, 2),
+            "qty_unopened": round(unopened_qty, 2),
+            "qty_unit_purchase": quantity_units.get(product.get("qu_id_purchase"), ""),
+            "qty_unit_stock": quantity_units.get(product.get("qu_id_stock"), ""),
+            "qu_factor_purchase_to_stock": float(qty_factor),
+            "location": locations.get(product.get("location_id"), ""),
+            "consume_location": locations.get(
+                product.get("default_consume_location_id"), ""
+            ),
+            "group": product_groups.get(product.get("product_group_id"), ""),
+            "userfields": product.get("userfields", {}),
+            "list_count": len(shopping_lists),
+        }
+
+        for shop_list, details in shopping_lists.items():
+            prod_dict.update(
+                {
+                    f"{shop_list}_qty": details["qty"],
+                    f"{shop_list}_shop_list_id": int(details["shop_list_id"]),
+                    f"{shop_list}_note": details["note"],
+                }
+            )
+
+        for field in OTHER_FIELDS:
+            if field in product:
+                prod_dict[field] = product[field]
+
+        parsed_products[key] = {
+            "name": product["name"],
+            "product_id": product_id,
+            "qty_in_shopping_lists": qty_in_shopping_lists,
+            "attributes": prod_dict,
+        }
+
+    return parsed_products
+
+
+def build_item_list(data, shopping_list_index=None) -> list:
+    """Build the todo items of every shopping list."""
+    if data is None or "shopping_lists" not in data:
+        return []
+
+    if shopping_list_index is None:
+        shopping_list_index = group_by_product(data["shopping_list"])
+
+    shopping_list_map = {}
+
+    for shopping_list in data["shopping_lists"]:
+        shopping_list_id = shopping_list["id"]
+        shopping_list_map[shopping_list_id] = {
+            "id": shopping_list_id,
+            "name": shopping_list["name"],
+            "products": [],
+        }
+
+    for product in data["products"]:
+        qty_factor = purchase_to_stock_factor(product)
+
+        for in_shopping_list in shopping_list_index.get(str(int(product["id"])), ()):
+            shopping_list_id = in_shopping_list["shopping_list_id"]
+
+            if shopping_list_id in shopping_list_map:
+                in_shop_list = str(round(int(in_shopping_list["amount"]) / qty_factor))
+                shopping_list_map[shopping_list_id]["products"].append(
+                    {
+                        "name": f"{product['name']} (x{in_shop_list})",
+                        "shop_list_id": in_shopping_list["id"],
+                        "status": (
+                            TodoItemStatus.NEEDS_ACTION
+                            if int(in_shopping_list["done"]) == 0
+                            else TodoItemStatus.COMPLETED
+                        ),
+                    }
+                )
+
+    return list(shopping_list_map.values())
+
+
+def transform_grocy_data(data: dict) -> dict:
+    """Turn the raw Grocy tables of a refresh into integration data.
+
+    Returns the parsed products, the todo lists and a fingerprint of each
+    product and list so callers can tell what changed since the last refresh.
+    """
+    shopping_list_index = group_by_product(data["shopping_list"])
+    stock_index = group_by_product(data["stock"])
+
+    products = parse_products(data, shopping_list_index, stock_index)
+    shopping_lists_data = build_item_list(data, shopping_list_index)
+
+    return {
+        "homeassistant_products": products,
+        "shopping_lists_data": shopping_lists_data,
+        "product_hashes": {
+            product_id: fingerprint(product) for product_id, product in products.items()
+        },
+        "shopping_list_hashes": {
+            str(shopping_list["id"]): fingerprint(shopping_list)
+            for shopping_list in shopping_lists_data
+        },
+    }
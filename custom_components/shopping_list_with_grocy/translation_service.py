@@ -0,0 +1,159 @@
+"""In-memory translations shared by every backend lookup.
+
+The backend (``translations/``) and frontend (``frontend/www/translations/``)
+bundles of a language are read once, in the executor, and kept as one
+flattened dotted-key map. Lookups never touch the disk; a periodic check
+reloads a language when one of its files changes.
+"""
+
+import logging
+import os
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util.json import load_json_object
+
+from .const import DOMAIN
+
+LOGGER = logging.getLogger(__name__)
+
+DATA_TRANSLATIONS = f"{DOMAIN}_translations"
+
+BACKEND_TRANSLATIONS_PATH = os.path.join(os.path.dirname(__file__), "translations")
+FRONTEND_TRANSLATIONS_PATH = os.path.join(
+    os.path.dirname(__file__), "frontend", "www", "translations"
+)
+
+RELOAD_CHECK_INTERVAL = timedelta(seconds=30)
+
+
+def flatten_translations(tree: dict[str, Any], prefix: str = "") -> dict[str, str]:
+    """Return ``{"a.b.c": value}`` for every string leaf of *tree*."""
+    flat = {}
+    for key, value in tree.items():
+        dotted = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_translations(value, f"{dotted}."))
+        elif isinstance(value, str):
+            flat[dotted] = value
+    return flat
+
+
+class TranslationService:
+    """Backend and frontend translations per language, kept in memory."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        backend_path: str = BACKEND_TRANSLATIONS_PATH,
+        frontend_path: str = FRONTEND_TRANSLATIONS_PATH,
+    ) -> None:
+        self.hass = hass
+        self._backend_path = backend_path
+        self._frontend_path = frontend_path
+        self._flat: dict[str, dict[str, str]] = {}
+        self._frontend: dict[str, dict[str, Any]] = {}
+        self._mtimes: dict[str, tuple] = {}
+        self._unsub_reload = None
+
+    def _files(self, language: str) -> tuple:
+        return (
+            os.path.join(self._backend_path, f"{language}.json"),
+            os.path.join(self._frontend_path, f"{language}.json"),
+        )
+
+    def _file_mtimes(self, language: str) -> tuple:
+        return tuple(
+            os.path.getmtime(path) if os.path.exists(path) else None
+            for path in self._files(language)
+        )
+
+    def _read_language(self, language: str) -> tuple:
+        """Read both bundles of *language*; runs in the executor."""
+        backend_file, frontend_file = self._files(language)
+        backend = {}
+        frontend = {}
+        try:
+            if os.path.exists(backend_file):
+                backend = load_json_object(backend_file)
+            if os.path.exists(frontend_file):
+                frontend = load_json_object(frontend_file).get(DOMAIN, {})
+        except (HomeAssistantError, OSError, ValueError) as err:
+            # load_json_object reports unreadable and malformed files as
+            # HomeAssistantError.
+            LOGGER.warning("Failed to load translations for %s: %s", language, err)
+        return backend, frontend, self._file_mtimes(language)
+
+    async def async_load(self, language: str, force: bool = False) -> None:
+        """Load *language* into memory unless it already is."""
+        if not language or (language in self._flat and not force):
+            return
+        backend, frontend, mtimes = await self.hass.async_add_executor_job(
+            self._read_language, language
+        )
+        self._flat[language] = {
+            **flatten_translations(backend),
+            **flatten_translations(frontend),
+        }
+        self._frontend[language] = frontend
+        self._mtimes[language] = mtimes
+        LOGGER.debug(
+            "Loaded %d translation string(s) for %s",
+            len(self._flat[language]),
+            language,
+        )
+
+    def lookup(self, key: str, language: str | None = None) -> str | None:
+        """Return the string for a dotted *key*, falling back to English."""
+        for lang in (language, "en"):
+            value = self._flat.get(lang, {}).get(key) if lang else None
+            if value is not None:
+                return value
+        return None
+
+    def frontend_bundle(self, language: str) -> dict[str, Any]:
+        """Return the nested frontend translations, falling back to English."""
+        return self._frontend.get(language) or self._frontend.get("en", {})
+
+    @callback
+    def async_start_reload_checks(self) -> None:
+        """Check the translation files for changes every RELOAD_CHECK_INTERVAL."""
+        if self._unsub_reload is None:
+            self._unsub_reload = async_track_time_interval(
+                self.hass,
+                self._async_reload_changed,
+                RELOAD_CHECK_INTERVAL,
+                cancel_on_shutdown=True,
+            )
+
+    async def _async_reload_changed(self, now=None) -> None:
+        """Reload every language whose files changed on disk."""
+        languages = list(self._flat)
+        current = await self.hass.async_add_executor_job(
+            lambda: {lang: self._file_mtimes(lang) for lang in languages}
+        )
+        for language, mtimes in current.items():
+            if mtimes != self._mtimes.get(language):
+                LOGGER.info("🔄 Reloading %s translations", language)
+                await self.async_load(language, force=True)
+
+
+async def async_get_translation_service(
+    hass: HomeAssistant, language: str | None = None
+) -> TranslationService:
+    """Return the translation service with English and *language* loaded."""
+    service = hass.data.get(DATA_TRANSLATIONS)
+    if service is None:
+        service = hass.data[DATA_TRANSLATIONS] = TranslationService(hass)
+        service.async_start_reload_checks()
+    await service.async_load("en")
+    await service.async_load(language or hass.config.language or "en")
+    return service
+
+
+def get_loaded_translation_service(hass: HomeAssistant) -> TranslationService | None:
+    """Return the translation service if it was already set up."""
+    return hass.data.get(DATA_TRANSLATIONS)
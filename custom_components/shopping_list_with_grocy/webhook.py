@@ -0,0 +1,75 @@
+"""Push-style change notifications for the Shopping List with Grocy integration.
+
+Grocy (or a small relay next to it) can call the webhook registered here
+whenever its database changes. The call only asks the coordinator for a
+refresh: the usual db-changed-time check still decides whether anything is
+actually downloaded, so spurious or repeated calls stay cheap.
+"""
+
+import logging
+
+from aiohttp import web
+from homeassistant.components import webhook
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ENABLE_WEBHOOK, CONF_WEBHOOK_ID, DOMAIN
+
+LOGGER = logging.getLogger(__name__)
+
+
+def is_webhook_enabled(entry: ConfigEntry) -> bool:
+    """Return True if push notifications are enabled for this entry."""
+    config = {**entry.data, **(entry.options or {})}
+    return bool(config.get(CONF_ENABLE_WEBHOOK, False))
+
+
+async def async_register_refresh_webhook(hass: HomeAssistant, entry: ConfigEntry):
+    """Register the refresh webhook, generating its id on first use."""
+    if not is_webhook_enabled(entry):
+        return None
+
+    webhook_id = entry.data.get(CONF_WEBHOOK_ID)
+    if not webhook_id:
+        webhook_id = webhook.async_generate_id()
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_WEBHOOK_ID: webhook_id}
+        )
+
+    webhook.async_register(
+        hass,
+        DOMAIN,
+        "Shopping List with Grocy refresh",
+        webhook_id,
+        _async_handle_refresh_webhook,
+        local_only=True,
+        allowed_methods=["POST", "PUT"],
+    )
+
+    LOGGER.info(
+        "📡 Grocy change webhook registered at %s",
+        webhook.async_generate_path(webhook_id),
+    )
+
+    return webhook_id
+
+
+def async_unregister_refresh_webhook(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Unregister the refresh webhook if it was registered."""
+    webhook_id = entry.data.get(CONF_WEBHOOK_ID)
+    if webhook_id:
+        webhook.async_unregister(hass, webhook_id)
+
+
+async def _async_handle_refresh_webhook(
+    hass: HomeAssistant, webhook_id: str, request: web.Request
+) -> web.Response:
+    """Handle a change notification coming from Grocy."""
+    coordinator = hass.data.get(DOMAIN, {}).get("instances", {}).get("coordinator")
+    if coordinator is None:
+        return web.Response(status=503)
+
+    LOGGER.debug("Grocy change notification received, requesting refresh")
+    await coordinator.async_request_refresh()
+
+    return web.Response(status=202)
@@ -0,0 +1,157 @@
+"""Websocket commands used by the shopping suggestions panel.
+
+The panel pages through the cached suggestions and follows their changes as
+deltas instead of reading the whole list from the suggestions sensor.
+"""
+
+import logging
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN
+from .suggestions import SIGNAL_SUGGESTIONS_UPDATED, get_suggestion_manager
+
+LOGGER = logging.getLogger(__name__)
+
+SORT_KEYS = ["score", "confidence", "name"]
+MAX_PAGE_SIZE = 100
+
+
+def page_suggestions(
+    products: list,
+    offset: int = 0,
+    limit: int = 20,
+    sort_by: str = "score",
+    descending: bool = True,
+) -> dict:
+    """Return one sorted page of *products* and the total count."""
+    ordered = sorted(
+        products,
+        key=lambda product: (
+            str(product.get(sort_by, "")).casefold()
+            if sort_by == "name"
+            else product.get(sort_by) or 0
+        ),
+        reverse=descending,
+    )
+    return {"total": len(ordered), "items": ordered[offset : offset + limit]}
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the suggestions websocket commands."""
+    websocket_api.async_register_command(hass, websocket_list_suggestions)
+    websocket_api.async_register_command(hass, websocket_subscribe_suggestions)
+    websocket_api.async_register_command(hass, websocket_accept_suggestion)
+    websocket_api.async_register_command(hass, websocket_dismiss_suggestion)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/suggestions/list",
+        vol.Optional("offset", default=0): vol.All(int, vol.Range(min=0)),
+        vol.Optional("limit", default=20): vol.All(
+            int, vol.Range(min=1, max=MAX_PAGE_SIZE)
+        ),
+        vol.Optional("sort_by", default="score"): vol.In(SORT_KEYS),
+        vol.Optional("descending", default=True): bool,
+    }
+)
+@callback
+def websocket_list_suggestions(hass: HomeAssistant, connection, msg: dict) -> None:
+    """Send one page of the cached suggestions."""
+    suggestions = get_suggestion_manager(hass).data
+    page = page_suggestions(
+        suggestions.get("products", []),
+        msg["offset"],
+        msg["limit"],
+        msg["sort_by"],
+        msg["descending"],
+    )
+    connection.send_result(
+        msg["id"],
+        {
+            "version": suggestions.get("version"),
+            "last_update": suggestions.get("last_update"),
+            "offset": msg["offset"],
+            **page,
+        },
+    )
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): f"{DOMAIN}/suggestions/subscribe"}
+)
+@callback
+def websocket_subscribe_suggestions(hass: HomeAssistant, connection, msg: dict) -> None:
+    """Send the changes of the suggestions as they happen."""
+
+    @callback
+    def forward_delta(delta: dict) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], delta))
+
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(
+        hass, SIGNAL_SUGGESTIONS_UPDATED, forward_delta
+    )
+    connection.send_result(msg["id"])
+
+    suggestions = get_suggestion_manager(hass).data
+    connection.send_message(
+        websocket_api.event_message(
+            msg["id"],
+            {
+                "version": suggestions.get("version"),
+                "last_update": suggestions.get("last_update"),
+            },
+        )
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/suggestions/accept",
+        vol.Required("suggestion_id"): str,
+        vol.Optional("quantity", default=1): vol.All(int, vol.Range(min=1)),
+        vol.Optional("shopping_list_id", default=1): vol.All(int, vol.Range(min=1)),
+    }
+)
+@websocket_api.async_response
+async def websocket_accept_suggestion(
+    hass: HomeAssistant, connection, msg: dict
+) -> None:
+    """Add a suggested product to a shopping list and drop the suggestion."""
+    manager = get_suggestion_manager(hass)
+    suggestion_id = msg["suggestion_id"]
+    if not any(
+        product["id"] == suggestion_id for product in manager.data.get("products", [])
+    ):
+        connection.send_error(msg["id"], "not_found", "Unknown suggestion")
+        return
+
+    coordinator = hass.data[DOMAIN]["instances"]["coordinator"]
+    await coordinator.add_product(
+        suggestion_id, msg["shopping_list_id"], "", msg["quantity"]
+    )
+    await manager.async_remove(suggestion_id)
+    connection.send_result(msg["id"], {"version": manager.data.get("version")})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/suggestions/dismiss",
+        vol.Required("suggestion_id"): str,
+    }
+)
+@websocket_api.async_response
+async def websocket_dismiss_suggestion(
+    hass: HomeAssistant, connection, msg: dict
+) -> None:
+    """Drop a suggestion without adding the product."""
+    manager = get_suggestion_manager(hass)
+    if not await manager.async_remove(msg["suggestion_id"]):
+        connection.send_error(msg["id"], "not_found", "Unknown suggestion")
+        return
+    connection.send_result(msg["id"], {"version": manager.data.get("version")})
@@ -0,0 +1,78 @@
+"""Local fake Grocy server, synthetic datasets and an API client wired to them.
+
+Used by tests that exercise ``ShoppingListWithGrocyApi`` end to end over HTTP
+with realistic data volumes::
+
+    async with (
+        FakeGrocyServer(generate_dataset(10_000)) as grocy,
+        aiohttp.ClientSession() as session,
+    ):
+        api = make_api(grocy, session)
+        data = await api.retrieve_data(force=True)
+"""
+
+import asyncio
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+from .dataset import TABLES, generate_dataset
+from .server import API_KEY, FakeGrocyServer
+
+__all__ = [
+    "API_KEY",
+    "TABLES",
+    "FakeGrocyServer",
+    "generate_dataset",
+    "make_api",
+    "make_hass",
+]
+
+
+def make_hass(config_dir: str | None = None):
+    """Return a stub hass that runs tasks and executor jobs on the running loop.
+
+    Files go to *config_dir*, or to a temporary directory removed along with
+    the stub.
+    """
+    from custom_components.shopping_list_with_grocy.const import DOMAIN
+
+    loop = asyncio.get_running_loop()
+    hass = MagicMock()
+    if config_dir is None:
+        hass.temporary_config_dir = tempfile.TemporaryDirectory()
+        config_dir = hass.temporary_config_dir.name
+    hass.config.config_dir = config_dir
+    hass.config.path = lambda *parts: os.path.join(config_dir, *parts)
+    hass.config.language = "en"
+    hass.data = {DOMAIN: {"entities": {}}}
+    hass.loop = loop
+    hass.async_create_task = lambda coro, *args, **kwargs: loop.create_task(coro)
+    hass.async_add_executor_job = lambda target, *args: loop.run_in_executor(
+        None, target, *args
+    )
+    return hass
+
+
+def make_api(server: FakeGrocyServer, session, hass=None, **config):
+    """Return a ShoppingListWithGrocyApi talking to *server* through *session*."""
+    from custom_components.shopping_list_with_grocy.apis.shopping_list_with_grocy import (
+        ShoppingListWithGrocyApi,
+    )
+
+    api = ShoppingListWithGrocyApi(
+        session,
+        hass or make_hass(),
+        {
+            "api_url": server.url,
+            "api_key": server.api_key,
+            "image_download_size": 0,
+            "disable_timeout": False,
+            # Tests and benchmarks measure the integration, not the limiter.
+            "max_requests_per_second": 0,
+            **config,
+        },
+    )
+    # Retries of injected failures should not slow the tests down.
+    api.retry_backoff = 0.001
+    return api
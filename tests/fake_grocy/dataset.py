@@ -0,0 +1,202 @@
+"""Synthetic Grocy datasets of any size.
+
+The tables have the shape returned by ``api/objects/<table>`` and hold the
+fields the integration reads. Generation is seeded, so a given scale always
+yields the same data.
+"""
+
+import random
+from datetime import date, timedelta
+
+TABLES = (
+    "products",
+    "shopping_lists",
+    "shopping_list",
+    "locations",
+    "stock",
+    "product_groups",
+    "quantity_units",
+)
+
+QUANTITY_UNITS = ["Piece", "Pack", "Bottle", "Can", "Gram", "Kilogram", "Liter"]
+LOCATIONS = ["Fridge", "Freezer", "Pantry", "Cellar", "Bathroom", "Garage"]
+PRODUCT_GROUPS = [
+    "Fruits",
+    "Vegetables",
+    "Dairy",
+    "Meat",
+    "Bakery",
+    "Beverages",
+    "Snacks",
+    "Frozen",
+    "Household",
+    "Hygiene",
+]
+ADJECTIVES = ["Organic", "Fresh", "Smoked", "Light", "Whole", "Dried", "Spicy"]
+NOUNS = [
+    "Apples",
+    "Milk",
+    "Bread",
+    "Coffee",
+    "Rice",
+    "Pasta",
+    "Cheese",
+    "Butter",
+    "Tomatoes",
+    "Yogurt",
+    "Chicken",
+    "Tea",
+    "Soap",
+    "Beans",
+]
+CREATED = "2024-01-01 08:00:00"
+
+
+def product_name(index: int) -> str:
+    """Return a readable, unique product name for *index*."""
+    adjective = ADJECTIVES[index % len(ADJECTIVES)]
+    noun = NOUNS[(index // len(ADJECTIVES)) % len(NOUNS)]
+    batch = index // (len(ADJECTIVES) * len(NOUNS))
+    return f"{adjective} {noun}" + (f" {batch + 1}" if batch else "")
+
+
+def generate_dataset(
+    products: int = 1000,
+    *,
+    shopping_lists: int = 2,
+    stock_ratio: float = 0.6,
+    shopping_list_ratio: float = 0.05,
+    below_min_ratio: float = 0.1,
+    picture_ratio: float = 0.3,
+    seed: int = 0,
+) -> dict[str, list]:
+    """Return the Grocy tables of a household with *products* products.
+
+    *stock_ratio* of the products are in stock, *shopping_list_ratio* are on a
+    shopping list, *below_min_ratio* have a minimum stock amount above what is
+    in stock and *picture_ratio* have a picture.
+    """
+    rng = random.Random(seed)
+    today = date(2024, 6, 1)
+
+    data = {
+        "quantity_units": [
+            {"id": index, "name": name, "name_plural": f"{name}s"}
+            for index, name in enumerate(QUANTITY_UNITS, start=1)
+        ],
+        "locations": [
+            {"id": index, "name": name, "is_freezer": int(name == "Freezer")}
+            for index, name in enumerate(LOCATIONS, start=1)
+        ],
+        "product_groups": [
+            {"id": index, "name": name}
+            for index, name in enumerate(PRODUCT_GROUPS, start=1)
+        ],
+        "shopping_lists": [
+            {
+                "id": index,
+                "name": "Shopping list" if index == 1 else f"Shopping list {index}",
+                "description": None,
+                "row_created_timestamp": CREATED,
+            }
+            for index in range(1, shopping_lists + 1)
+        ],
+        "products": [],
+        "stock": [],
+        "shopping_list": [],
+    }
+
+    for product_id in range(1, products + 1):
+        qu_stock = rng.randint(1, len(QUANTITY_UNITS))
+        qu_purchase = qu_stock if rng.random() < 0.8 else rng.randint(1, 4)
+        factor = 1.0 if qu_purchase == qu_stock else float(rng.choice([6, 10, 12]))
+        in_stock = rng.random() < stock_ratio
+        stock_amount = rng.randint(1, 8) if in_stock else 0
+        below_min = rng.random() < below_min_ratio
+        location_id = rng.randint(1, len(LOCATIONS))
+
+        data["products"].append(
+            {
+                "id": product_id,
+                "name": product_name(product_id - 1),
+                "description": None,
+                "product_group_id": rng.randint(1, len(PRODUCT_GROUPS)),
+                "active": 1,
+                "location_id": location_id,
+                "default_consume_location_id": None,
+                "qu_id_purchase": qu_purchase,
+                "qu_id_stock": qu_stock,
+                "qu_factor_purchase_to_stock": factor,
+                "min_stock_amount": stock_amount + rng.randint(1, 3)
+                if below_min
+                else 0,
+                "default_best_before_days": rng.choice([0, 3, 7, 30, 365]),
+                "default_best_before_days_after_open": 0,
+                "default_best_before_days_after_freezing": 0,
+                "default_best_before_days_after_thawing": 0,
+                "picture_file_name": f"product_{product_id}.jpg"
+                if rng.random() < picture_ratio
+                else None,
+                "parent_product_id": None,
+                "calories": rng.randint(0, 900),
+                "cumulate_min_stock_amount_of_sub_products": 0,
+                "due_type": 1,
+                "quick_consume_amount": 1,
+                "hide_on_stock_overview": 0,
+                "row_created_timestamp": CREATED,
+                "userfields": None,
+            }
+        )
+
+        remaining = stock_amount
+        while remaining > 0:
+            amount = rng.randint(1, remaining)
+            remaining -= amount
+            purchased = today - timedelta(days=rng.randint(0, 60))
+            data["stock"].append(
+                {
+                    "id": len(data["stock"]) + 1,
+                    "product_id": product_id,
+                    "amount": amount,
+                    "best_before_date": str(purchased + timedelta(days=30)),
+                    "purchased_date": str(purchased),
+                    "stock_id": f"{product_id:x}{len(data['stock']):x}",
+                    "price": round(rng.uniform(0.5, 20), 2),
+                    "open": int(rng.random() < 0.2),
+                    "opened_date": None,
+                    "location_id": location_id,
+                    "shopping_location_id": None,
+                    "row_created_timestamp": CREATED,
+                }
+            )
+
+        if rng.random() < shopping_list_ratio:
+            data["shopping_list"].append(
+                {
+                    "id": len(data["shopping_list"]) + 1,
+                    "product_id": product_id,
+                    "note": rng.choice(["", "", "", "Brand X", "On sale"]),
+                    "amount": rng.randint(1, 4) * int(factor),
+                    "shopping_list_id": rng.randint(1, shopping_lists),
+                    "done": int(rng.random() < 0.1),
+                    "qu_id": qu_purchase,
+                    "row_created_timestamp": CREATED,
+                }
+            )
+
+    # Grocy also keeps free-text entries without a product on its lists.
+    for _ in range(max(1, len(data["shopping_list"]) // 20)):
+        data["shopping_list"].append(
+            {
+                "id": len(data["shopping_list"]) + 1,
+                "product_id": None,
+                "note": "Something for the party",
+                "amount": 1,
+                "shopping_list_id": rng.randint(1, shopping_lists),
+                "done": 0,
+                "qu_id": None,
+                "row_created_timestamp": CREATED,
+            }
+        )
+
+    return data
@@ -0,0 +1,279 @@
+"""A local aiohttp stand-in for the Grocy endpoints the integration uses.
+
+Serves a dataset from :mod:`.dataset` on 127.0.0.1 with optional latency,
+random failures and per-path error injection, and counts every request so
+tests can assert how much traffic a refresh caused.
+"""
+
+import asyncio
+import base64
+import binascii
+import io
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Self
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from PIL import Image
+
+from .dataset import generate_dataset
+
+API_KEY = "fake-grocy-key"
+START_TIME = datetime(2024, 6, 1, 8, 0, 0)
+
+
+class FakeGrocyServer:
+    """In-memory Grocy server; use as ``async with FakeGrocyServer() as grocy``."""
+
+    def __init__(
+        self,
+        data: dict[str, list] | None = None,
+        *,
+        api_key: str = API_KEY,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        image_bytes: int = 2048,
+        seed: int = 0,
+    ) -> None:
+        self.data = data if data is not None else generate_dataset()
+        self.api_key = api_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.image_bytes = image_bytes
+        self.requests: Counter = Counter()
+        self.changed_time = START_TIME
+        self._rng = random.Random(seed)
+        self._failures: list[list] = []
+        self._sorted: dict[str, list] = {}
+        self._pictures: dict[int, bytes] = {}
+        self._server: TestServer | None = None
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+
+    async def start(self) -> Self:
+        self._server = TestServer(self.make_app(), host="127.0.0.1")
+        await self._server.start_server()
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            await self._server.close()
+            self._server = None
+
+    async def __aenter__(self) -> Self:
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def url(self) -> str:
+        return str(self._server.make_url("/"))
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/api/system/db-changed-time", self.db_changed_time)
+        app.router.add_get("/api/objects/{entity}", self.list_objects)
+        app.router.add_post("/api/objects/{entity}", self.create_object)
+        app.router.add_put("/api/objects/{entity}/{object_id}", self.update_object)
+        app.router.add_delete("/api/objects/{entity}/{object_id}", self.delete_object)
+        app.router.add_post(
+            "/api/stock/shoppinglist/{action}", self.shopping_list_action
+        )
+        app.router.add_get("/api/files/productpictures/{name}", self.product_picture)
+        return app
+
+    # ── fault injection ──────────────────────────────────────────────────────
+
+    def fail(self, path_prefix: str, status: int = 500, times: int | None = 1):
+        """Answer *times* requests under *path_prefix* with *status*.
+
+        ``times=None`` keeps failing until :meth:`clear_failures`.
+        """
+        self._failures.append([path_prefix.lstrip("/"), status, times])
+
+    def clear_failures(self) -> None:
+        self._failures.clear()
+
+    def _injected_status(self, path: str) -> int | None:
+        for failure in self._failures:
+            prefix, status, times = failure
+            if path.startswith(prefix):
+                if times is not None:
+                    failure[2] -= 1
+                    if failure[2] <= 0:
+                        self._failures.remove(failure)
+                return status
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return 500
+        return None
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        path = request.path.lstrip("/")
+        self.requests[(request.method, path)] += 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._rng.uniform(0, self.jitter))
+
+        if request.headers.get("GROCY-API-KEY") != self.api_key:
+            return web.json_response({"error_message": "Unauthorized"}, status=401)
+
+        status = self._injected_status(path)
+        if status is not None:
+            return web.json_response(
+                {"error_message": f"Injected error {status}"}, status=status
+            )
+        return await handler(request)
+
+    def request_count(self, path_prefix: str = "") -> int:
+        """Return how many requests were made under *path_prefix*."""
+        prefix = path_prefix.lstrip("/")
+        return sum(
+            count
+            for (_, path), count in self.requests.items()
+            if path.startswith(prefix)
+        )
+
+    # ── data changes ─────────────────────────────────────────────────────────
+
+    def touch(self) -> None:
+        """Record a database change, as Grocy does on every write."""
+        # The integration compares whole seconds, so every change moves the
+        # clock forward by at least one.
+        self.changed_time += timedelta(seconds=1)
+        self._sorted.clear()
+
+    def _table(self, entity: str) -> list:
+        if entity not in self.data:
+            raise web.HTTPBadRequest(
+                text=f'{{"error_message": "Entity {entity} does not exist"}}',
+                content_type="application/json",
+            )
+        return self.data[entity]
+
+    def _find(self, entity: str, object_id) -> dict:
+        for row in self._table(entity):
+            if str(row["id"]) == str(object_id):
+                return row
+        raise web.HTTPNotFound()
+
+    # ── handlers ─────────────────────────────────────────────────────────────
+
+    async def db_changed_time(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"changed_time": self.changed_time.strftime("%Y-%m-%d %H:%M:%S")}
+        )
+
+    async def list_objects(self, request: web.Request) -> web.Response:
+        entity = request.match_info["entity"]
+        rows = self._table(entity)
+
+        order = request.query.get("order")
+        if order:
+            rows = self._sorted.get(f"{entity}:{order}")
+            if rows is None:
+                field, _, direction = order.partition(":")
+                rows = self._sorted[f"{entity}:{order}"] = sorted(
+                    self.data[entity],
+                    key=lambda row: str(row.get(field) or ""),
+                    reverse=direction == "desc",
+                )
+
+        offset = int(request.query.get("offset", 0))
+        limit = request.query.get("limit")
+        rows = rows[offset : offset + int(limit)] if limit else rows[offset:]
+        return web.json_response(rows)
+
+    async def create_object(self, request: web.Request) -> web.Response:
+        entity = request.match_info["entity"]
+        table = self._table(entity)
+        row = await request.json()
+        row["id"] = max((existing["id"] for existing in table), default=0) + 1
+        table.append(row)
+        self.touch()
+        return web.json_response({"created_object_id": row["id"]})
+
+    async def update_object(self, request: web.Request) -> web.Response:
+        row = self._find(request.match_info["entity"], request.match_info["object_id"])
+        row.update(await request.json())
+        self.touch()
+        return web.Response(status=204)
+
+    async def delete_object(self, request: web.Request) -> web.Response:
+        entity = request.match_info["entity"]
+        self._table(entity).remove(self._find(entity, request.match_info["object_id"]))
+        self.touch()
+        return web.Response(status=204)
+
+    async def shopping_list_action(self, request: web.Request) -> web.Response:
+        action = request.match_info["action"]
+        if action not in ("add-product", "remove-product"):
+            raise web.HTTPNotFound()
+
+        payload = await request.json()
+        product_id = int(payload["product_id"])
+        list_id = int(payload.get("list_id") or 1)
+        amount = float(payload.get("product_amount") or 1)
+        rows = self.data["shopping_list"]
+        row = next(
+            (
+                row
+                for row in rows
+                if row["product_id"] == product_id
+                and row["shopping_list_id"] == list_id
+            ),
+            None,
+        )
+
+        if action == "add-product":
+            if row is None:
+                rows.append(
+                    {
+                        "id": max((r["id"] for r in rows), default=0) + 1,
+                        "product_id": product_id,
+                        "note": payload.get("note", ""),
+                        "amount": int(amount),
+                        "shopping_list_id": list_id,
+                        "done": 0,
+                        "qu_id": None,
+                        "row_created_timestamp": START_TIME.isoformat(" "),
+                    }
+                )
+            else:
+                row["amount"] = int(row["amount"] + amount)
+        elif row is not None:
+            row["amount"] = int(row["amount"] - amount)
+            if row["amount"] <= 0:
+                rows.remove(row)
+
+        self.touch()
+        return web.Response(status=204)
+
+    async def product_picture(self, request: web.Request) -> web.Response:
+        try:
+            name = base64.b64decode(request.match_info["name"]).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            raise web.HTTPBadRequest()
+        if not any(
+            product.get("picture_file_name") == name
+            for product in self.data["products"]
+        ):
+            raise web.HTTPNotFound()
+        width = int(request.query.get("best_fit_width") or 0) or 800
+        return web.Response(body=self._picture(width), content_type="image/jpeg")
+
+    def _picture(self, width: int) -> bytes:
+        """A 4:3 JPEG *width* pixels wide, padded to at least ``image_bytes``."""
+        if width not in self._pictures:
+            buffer = io.BytesIO()
+            Image.new("RGB", (width, width * 3 // 4), (200, 120, 40)).save(
+                buffer, "JPEG"
+            )
+            # Decoders ignore data after the end of image marker.
+            self._pictures[width] = buffer.getvalue().ljust(self.image_bytes, b"\0")
+        return self._pictures[width]
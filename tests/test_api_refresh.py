@@ -0,0 +1,131 @@
+"""Tests for ShoppingListWithGrocyApi refresh orchestration.
+
+The network-facing parts of the refresh are replaced by small async fakes so
+these tests only exercise how concurrent retrieve_data() calls are scheduled.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def make_api():
+    """Return an API instance whose hass schedules tasks on the running loop."""
+    from custom_components.shopping_list_with_grocy.apis.shopping_list_with_grocy import (
+        ShoppingListWithGrocyApi,
+    )
+
+    hass = MagicMock()
+    hass.config.language = "en"
+    hass.data = {}
+    hass.async_create_task = lambda coro, *args, **kwargs: asyncio.ensure_future(coro)
+
+    config = {
+        "api_url": "http://grocy.local",
+        "api_key": "test-key",
+        "image_download_size": 0,
+        "disable_timeout": False,
+    }
+    return ShoppingListWithGrocyApi(MagicMock(), hass, config)
+
+
+def install_fake_fetch(api, release: asyncio.Event):
+    """Replace _retrieve_data with a fake that blocks until *release* is set."""
+    calls = []
+
+    async def fake_retrieve(force=False):
+        calls.append(force)
+        await release.wait()
+        return {"fetch": len(calls)}
+
+    api._retrieve_data = fake_retrieve
+    return calls
+
+
+# ── retrieve_data — single-flight ─────────────────────────────────────────────
+
+
+class TestRetrieveDataSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_fetch(self):
+        api = make_api()
+        release = asyncio.Event()
+        calls = install_fake_fetch(api, release)
+
+        waiters = [asyncio.ensure_future(api.retrieve_data()) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert calls == [False]
+        assert all(result == {"fetch": 1} for result in results)
+
+    @pytest.mark.asyncio
+    async def test_force_during_fetch_runs_one_followup(self):
+        api = make_api()
+        release = asyncio.Event()
+        calls = install_fake_fetch(api, release)
+
+        first = asyncio.ensure_future(api.retrieve_data())
+        await asyncio.sleep(0)
+        forced = [asyncio.ensure_future(api.retrieve_data(True)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await first == {"fetch": 1}
+        assert all(result == {"fetch": 2} for result in await asyncio.gather(*forced))
+        assert calls == [False, True]
+
+    @pytest.mark.asyncio
+    async def test_write_during_fetch_makes_late_callers_wait_for_fresh_data(self):
+        api = make_api()
+        release = asyncio.Event()
+        calls = install_fake_fetch(api, release)
+
+        first = asyncio.ensure_future(api.retrieve_data())
+        await asyncio.sleep(0)
+        api._write_seq += 1  # a todo toggle was sent to Grocy mid-fetch
+        late = asyncio.ensure_future(api.retrieve_data())
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await first == {"fetch": 1}
+        assert await late == {"fetch": 2}
+        assert calls == [False, True]
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_each_fetch(self):
+        api = make_api()
+        release = asyncio.Event()
+        release.set()
+        calls = install_fake_fetch(api, release)
+
+        await api.retrieve_data()
+        await api.retrieve_data()
+
+        assert calls == [False, False]
+
+    @pytest.mark.asyncio
+    async def test_failure_is_shared_and_next_call_starts_fresh(self):
+        api = make_api()
+        attempts = []
+
+        async def failing_retrieve(force=False):
+            attempts.append(force)
+            await asyncio.sleep(0)
+            raise RuntimeError("grocy down")
+
+        api._retrieve_data = failing_retrieve
+
+        waiters = [asyncio.ensure_future(api.retrieve_data()) for _ in range(2)]
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert attempts == [False]
+
+        with pytest.raises(RuntimeError):
+            await api.retrieve_data()
+        assert attempts == [False, False]
@@ -0,0 +1,56 @@
+"""Tests for the benchmark harness and the baseline comparison."""
+
+import time
+
+import pytest
+
+from benchmarks.harness import LoopMonitor, measure
+from benchmarks.run import compare_results
+
+
+def results(**metrics) -> dict:
+    return {"results": {"retrieve_data[1000]": metrics}}
+
+
+# ── compare_results ──────────────────────────────────────────────────────────
+
+
+class TestCompareResults:
+    def test_within_tolerance_is_not_a_regression(self):
+        baseline = results(wall_ms=100.0, peak_kib=1000.0, requests=70)
+        current = results(wall_ms=120.0, peak_kib=1100.0, requests=70)
+        assert compare_results(current, baseline) == []
+
+    def test_slower_run_is_a_regression(self):
+        regressions = compare_results(results(wall_ms=200.0), results(wall_ms=100.0))
+        assert len(regressions) == 1
+        assert "wall_ms" in regressions[0]
+
+    def test_any_extra_request_is_a_regression(self):
+        assert compare_results(results(requests=71), results(requests=70))
+
+    def test_absolute_floor_absorbs_noise_on_fast_cases(self):
+        assert compare_results(results(wall_ms=4.0), results(wall_ms=1.0)) == []
+
+    def test_cases_missing_from_the_run_are_ignored(self):
+        assert compare_results({"results": {}}, results(wall_ms=1.0)) == []
+
+
+# ── harness ──────────────────────────────────────────────────────────────────
+
+
+class TestHarness:
+    @pytest.mark.asyncio
+    async def test_loop_monitor_sees_a_blocking_call(self):
+        async with LoopMonitor() as monitor:
+            time.sleep(0.05)  # the block being measured
+        assert monitor.max_block >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_measure_merges_the_case_result(self):
+        async def run():
+            return {"requests": 3}
+
+        result = await measure(run, repeat=1)
+        assert result["requests"] == 3
+        assert {"wall_ms", "loop_blocked_ms", "max_block_ms", "peak_kib"} <= set(result)
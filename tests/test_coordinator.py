@@ -0,0 +1,189 @@
+"""Tests for ShoppingListWithGrocyCoordinator bookkeeping.
+
+The coordinator is built around a MagicMock hass and API; only the indexes and
+listener bookkeeping it derives from already-fetched data are exercised here.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.components.todo import TodoItemStatus
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def make_coordinator():
+    """Return a coordinator with no data and a stub API."""
+    from custom_components.shopping_list_with_grocy.const import DOMAIN
+    from custom_components.shopping_list_with_grocy.coordinator import (
+        ShoppingListWithGrocyCoordinator,
+    )
+
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"entities": {}}}
+    entry = MagicMock()
+    entry.data = {}
+    entry.options = {}
+    api = MagicMock()
+    api.shopping_list_hashes = {}
+    return ShoppingListWithGrocyCoordinator(hass, None, entry, api)
+
+
+def make_list(list_id, *names):
+    return {
+        "id": list_id,
+        "name": f"List {list_id}",
+        "products": [
+            {
+                "name": name,
+                "shop_list_id": index,
+                "status": TodoItemStatus.NEEDS_ACTION,
+            }
+            for index, name in enumerate(names)
+        ],
+    }
+
+
+# ── Todo list index ──────────────────────────────────────────────────────────
+
+
+class TestTodoIndex:
+    def test_lookup_by_id_of_any_type(self):
+        coordinator = make_coordinator()
+        coordinator.data = {"shopping_lists_data": [make_list(1, "Lait")]}
+        coordinator._update_todo_index()
+
+        list_data, version = coordinator.get_todo_list(1)
+        assert list_data["name"] == "List 1"
+        assert version == 1
+        assert coordinator.get_todo_list("1") == (list_data, 1)
+
+    def test_version_only_bumps_for_changed_list(self):
+        coordinator = make_coordinator()
+        coordinator.data = {
+            "shopping_lists_data": [make_list(1, "Lait"), make_list(2, "Pain")]
+        }
+        coordinator._update_todo_index()
+
+        coordinator.data = {
+            "shopping_lists_data": [make_list(1, "Lait"), make_list(2, "Pain", "Sel")]
+        }
+        coordinator._update_todo_index()
+
+        assert coordinator.get_todo_list(1)[1] == 1
+        assert coordinator.get_todo_list(2)[1] == 2
+
+    def test_uses_api_hashes_when_available(self):
+        coordinator = make_coordinator()
+        coordinator.api.shopping_list_hashes = {"1": "abc"}
+        coordinator.data = {"shopping_lists_data": [make_list(1, "Lait")]}
+        coordinator._update_todo_index()
+
+        coordinator.data = {"shopping_lists_data": [make_list(1, "Lait", "Sel")]}
+        coordinator._update_todo_index()
+
+        assert coordinator.get_todo_list(1)[1] == 1
+
+    def test_removed_list_is_dropped(self):
+        coordinator = make_coordinator()
+        coordinator.data = {"shopping_lists_data": [make_list(1, "Lait")]}
+        coordinator._update_todo_index()
+
+        coordinator.data = {"shopping_lists_data": []}
+        coordinator._update_todo_index()
+
+        assert coordinator.get_todo_list(1) == (None, None)
+
+
+# ── Product listeners ────────────────────────────────────────────────────────
+
+
+def make_product(product_id, qty=0):
+    return {
+        "name": f"Product {product_id}",
+        "product_id": int(product_id),
+        "qty_in_shopping_lists": qty,
+        "attributes": {"product_id": int(product_id)},
+    }
+
+
+def install_refresh(coordinator, generation, changed, products):
+    """Make the stub API return *products* as refresh number *generation*."""
+
+    async def retrieve_data(force=False):
+        coordinator.api.refresh_generation = generation
+        coordinator.api.changed_product_ids = set(changed)
+        return {"homeassistant_products": products}
+
+    coordinator.api.retrieve_data = retrieve_data
+
+
+class TestProductListeners:
+    def test_listener_can_be_removed(self):
+        coordinator = make_coordinator()
+        calls = []
+        remove = coordinator.async_add_product_listener(1, lambda: calls.append(1))
+
+        coordinator.async_update_product_listeners({"1"})
+        remove()
+        coordinator.async_update_product_listeners({"1"})
+
+        assert calls == [1]
+        assert coordinator._product_listeners == {}
+
+    @pytest.mark.asyncio
+    async def test_only_changed_products_are_notified(self):
+        coordinator = make_coordinator()
+        calls = []
+        for product_id in ("1", "2", "3"):
+            coordinator.async_add_product_listener(
+                product_id, lambda product_id=product_id: calls.append(product_id)
+            )
+
+        products = {pid: make_product(pid) for pid in ("1", "2", "3")}
+        install_refresh(coordinator, 1, {"2"}, products)
+        await coordinator.retrieve_data()
+
+        assert calls == ["2"]
+        assert coordinator.changed_product_ids == {"2"}
+
+    @pytest.mark.asyncio
+    async def test_same_refresh_generation_notifies_nobody(self):
+        coordinator = make_coordinator()
+        calls = []
+        coordinator.async_add_product_listener("1", lambda: calls.append("1"))
+
+        install_refresh(coordinator, 1, {"1"}, {"1": make_product("1")})
+        await coordinator.retrieve_data()
+        await coordinator.retrieve_data()
+
+        assert calls == ["1"]
+        assert coordinator.changed_product_ids == set()
+
+    @pytest.mark.asyncio
+    async def test_state_writes_are_counted_per_refresh(self):
+        coordinator = make_coordinator()
+        coordinator.async_add_product_listener("1", coordinator.record_state_write)
+
+        install_refresh(coordinator, 1, {"1"}, {"1": make_product("1")})
+        await coordinator.retrieve_data()
+        install_refresh(coordinator, 2, set(), {"1": make_product("1")})
+        await coordinator.retrieve_data()
+
+        assert coordinator.last_refresh_state_writes == 1
+        assert coordinator.product_state_writes == 0
+
+    def test_picture_payload_keeps_quantity_and_list_attributes(self):
+        coordinator = make_coordinator()
+        product = make_product("1", qty=2)
+        product["attributes"]["list_1_qty"] = 2
+        coordinator._parsed_data["1"] = product
+
+        coordinator.merge_product(
+            "1", {"product_id": 1, "attributes": {"entity_picture": "/pic"}}
+        )
+
+        assert product["qty_in_shopping_lists"] == 2
+        assert product["attributes"]["list_1_qty"] == 2
+        assert product["attributes"]["entity_picture"] == "/pic"
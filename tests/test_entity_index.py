@@ -0,0 +1,95 @@
+"""Tests for the integration-owned entity index."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.shopping_list_with_grocy.const import DOMAIN
+from custom_components.shopping_list_with_grocy.entity_index import (
+    EntityIndex,
+    get_entity_index,
+    product_entity_id,
+)
+
+# ── Products ─────────────────────────────────────────────────────────────────
+
+
+class TestProducts:
+    def test_default_entity_id(self):
+        index = EntityIndex()
+        index.add_product(42)
+        assert index.products == {"42": product_entity_id(42)}
+        assert product_entity_id(42) == f"sensor.{DOMAIN}_product_v2_42"
+
+    def test_remove_returns_entity_id(self):
+        index = EntityIndex()
+        index.add_product("7", "sensor.custom")
+        assert index.remove_product(7) == "sensor.custom"
+        assert index.remove_product(7) is None
+        assert index.product_entity_ids() == []
+
+    def test_remove_ignores_replaced_entity_id(self):
+        index = EntityIndex()
+        index.add_product(7, "sensor.new")
+        assert index.remove_product(7, "sensor.old") is None
+        assert index.remove_product(7, "sensor.new") == "sensor.new"
+
+
+# ── Todo lists ───────────────────────────────────────────────────────────────
+
+
+class TestTodoLists:
+    def test_remove_ignores_replaced_entity(self):
+        index = EntityIndex()
+        old, new = object(), object()
+        index.add_todo_list(1, old)
+        index.add_todo_list("1", new)
+
+        index.remove_todo_list(1, old)
+        assert index.todo_entities() == [new]
+
+        index.remove_todo_list(1, new)
+        assert index.todo_entities() == []
+
+
+# ── get_entity_index ─────────────────────────────────────────────────────────
+
+
+class TestGetEntityIndex:
+    def test_one_index_per_hass(self):
+        hass = MagicMock()
+        hass.data = {}
+        assert get_entity_index(hass) is get_entity_index(hass)
+        assert isinstance(hass.data[DOMAIN]["entity_index"], EntityIndex)
+
+
+# ── Restored entities ────────────────────────────────────────────────────────
+
+
+class TestRemoveRestoredEntities:
+    @pytest.mark.asyncio
+    async def test_v1_states_without_registry_entry_are_found(self, monkeypatch):
+        from custom_components import shopping_list_with_grocy as integration
+
+        restored = MagicMock(attributes={"restored": True})
+        hass = MagicMock()
+        hass.states.async_entity_ids.return_value = [
+            f"{integration.V1_PRODUCT_PREFIX}12",
+            "sensor.kitchen_temperature",
+        ]
+        hass.states.get.side_effect = lambda entity_id: (
+            restored if entity_id.startswith(integration.V1_PRODUCT_PREFIX) else None
+        )
+        registry = MagicMock()
+        registry.async_get.return_value = None
+        monkeypatch.setattr(
+            integration, "async_get_entity_registry", lambda hass: registry
+        )
+        monkeypatch.setattr(
+            integration, "async_entries_for_config_entry", lambda registry, entry: []
+        )
+        monkeypatch.setattr(integration.asyncio, "sleep", AsyncMock())
+
+        assert await integration.remove_restored_entities(hass, MagicMock())
+        hass.states.async_entity_ids.assert_called_once_with("sensor")
+        registry.async_get.assert_called_once_with(f"{integration.V1_PRODUCT_PREFIX}12")
@@ -0,0 +1,249 @@
+"""End-to-end refresh tests against the local fake Grocy server."""
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from tests.fake_grocy import (
+    TABLES,
+    FakeGrocyServer,
+    generate_dataset,
+    make_api,
+)
+
+# ── dataset ──────────────────────────────────────────────────────────────────
+
+
+class TestGenerateDataset:
+    def test_has_every_table_the_refresh_fetches(self):
+        data = generate_dataset(50)
+        assert set(TABLES) <= set(data)
+        assert len(data["products"]) == 50
+
+    def test_is_deterministic_per_seed(self):
+        assert generate_dataset(200, seed=3) == generate_dataset(200, seed=3)
+        assert generate_dataset(200, seed=3) != generate_dataset(200, seed=4)
+
+    def test_product_names_are_unique(self):
+        names = [product["name"] for product in generate_dataset(5000)["products"]]
+        assert len(set(names)) == len(names)
+
+    def test_ratios_are_respected(self):
+        data = generate_dataset(5000, stock_ratio=0.5, shopping_list_ratio=0.1)
+        in_stock = {row["product_id"] for row in data["stock"]}
+        on_list = {
+            row["product_id"] for row in data["shopping_list"] if row["product_id"]
+        }
+        assert 0.45 < len(in_stock) / 5000 < 0.55
+        assert 0.08 < len(on_list) / 5000 < 0.12
+        assert any(row["product_id"] is None for row in data["shopping_list"])
+
+
+# ── server ───────────────────────────────────────────────────────────────────
+
+
+class TestFakeGrocyServer:
+    @pytest.mark.asyncio
+    async def test_paginates_and_orders_objects(self):
+        async with (
+            FakeGrocyServer(generate_dataset(30)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            response = await session.get(
+                f"{grocy.url}api/objects/products?limit=10&offset=10&order=name:asc",
+                headers={"GROCY-API-KEY": grocy.api_key},
+            )
+            page = await response.json()
+
+        names = sorted(product["name"] for product in grocy.data["products"])
+        assert [product["name"] for product in page] == names[10:20]
+
+    @pytest.mark.asyncio
+    async def test_rejects_a_wrong_api_key(self):
+        async with FakeGrocyServer() as grocy, aiohttp.ClientSession() as session:
+            response = await session.get(
+                f"{grocy.url}api/system/db-changed-time",
+                headers={"GROCY-API-KEY": "wrong"},
+            )
+        assert response.status == 401
+
+    @pytest.mark.asyncio
+    async def test_latency_is_applied(self):
+        async with (
+            FakeGrocyServer(generate_dataset(5), latency=0.05) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            started = time.perf_counter()
+            await api.fetch_last_db_changed_time()
+        assert time.perf_counter() - started >= 0.05
+
+
+# ── refresh against the fake server ──────────────────────────────────────────
+
+
+class TestRefreshAgainstFakeGrocy:
+    @pytest.mark.asyncio
+    async def test_full_refresh_parses_every_product(self):
+        data = generate_dataset(1000)
+        async with FakeGrocyServer(data) as grocy, aiohttp.ClientSession() as session:
+            api = make_api(grocy, session)
+            result = await api.retrieve_data(force=True)
+
+            assert len(result["homeassistant_products"]) == 1000
+            assert len(result["shopping_lists_data"]) == 2
+            # 1000 products at 40 per page, plus the empty closing page.
+            assert grocy.request_count("api/objects/products") == 26
+            assert api.metrics.last["changed_products"] == 1000
+
+    @pytest.mark.asyncio
+    async def test_unchanged_database_skips_the_table_fetches(self):
+        async with (
+            FakeGrocyServer(generate_dataset(100)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            await api.retrieve_data()
+            fetched = grocy.request_count("api/objects")
+
+            await api.retrieve_data()
+
+            assert grocy.request_count("api/objects") == fetched
+            assert grocy.request_count("api/system/db-changed-time") == 2
+
+    @pytest.mark.asyncio
+    async def test_write_triggers_a_new_fetch(self):
+        async with (
+            FakeGrocyServer(generate_dataset(100)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            await api.retrieve_data()
+            product = next(
+                product
+                for product in grocy.data["products"]
+                if not any(
+                    row["product_id"] == product["id"]
+                    for row in grocy.data["shopping_list"]
+                )
+            )
+
+            await api.update_grocy_product(product["id"], 1, 1, "")
+            result = await api.retrieve_data()
+
+            parsed = result["homeassistant_products"][str(product["id"])]
+            assert parsed["qty_in_shopping_lists"] == 1
+            assert api.metrics.last["changed_products"] == 1
+
+    @pytest.mark.asyncio
+    async def test_injected_error_surfaces_as_client_error(self):
+        async with (
+            FakeGrocyServer(generate_dataset(10)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            grocy.fail("api/system/db-changed-time", status=503, times=3)
+            with pytest.raises(aiohttp.ClientError):
+                await api.fetch_last_db_changed_time()
+
+            # A single failure is absorbed by the GET retry.
+            grocy.fail("api/system/db-changed-time", status=503)
+            assert await api.fetch_last_db_changed_time()
+            assert api.retried_requests == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_share_one_fetch(self):
+        async with (
+            FakeGrocyServer(generate_dataset(200), latency=0.01) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            await asyncio.gather(*(api.retrieve_data() for _ in range(5)))
+
+            assert grocy.request_count("api/system/db-changed-time") == 1
+
+
+# ── partial failures ─────────────────────────────────────────────────────────
+
+
+class TestPartialFailure:
+    @pytest.mark.asyncio
+    async def test_failed_table_falls_back_to_its_last_good_version(self):
+        data = generate_dataset(50)
+        async with FakeGrocyServer(data) as grocy, aiohttp.ClientSession() as session:
+            api = make_api(grocy, session)
+            first = await api.retrieve_data(force=True)
+
+            grocy.fail("api/objects/stock", times=None)
+            grocy.touch()
+            result = await api.retrieve_data()
+
+            assert api.stale_tables == {"stock"}
+            assert result["stock"] == first["stock"]
+            assert len(result["homeassistant_products"]) == 50
+
+    @pytest.mark.asyncio
+    async def test_hung_table_falls_back_to_its_last_good_version(self):
+        data = generate_dataset(50)
+        async with FakeGrocyServer(data) as grocy, aiohttp.ClientSession() as session:
+            api = make_api(grocy, session)
+            first = await api.retrieve_data(force=True)
+
+            send = session.request
+
+            async def hanging_request(method, url, *args, **kwargs):
+                if "objects/stock" in url:
+                    await asyncio.sleep(10)
+                return await send(method, url, *args, **kwargs)
+
+            session.request = hanging_request
+            api.fetch_timeout = lambda: 0.2
+            grocy.touch()
+            result = await api.retrieve_data()
+
+            assert api.stale_tables == {"stock"}
+            assert result["stock"] == first["stock"]
+            assert len(result["homeassistant_products"]) == 50
+
+    @pytest.mark.asyncio
+    async def test_only_the_stale_table_is_fetched_on_the_next_tick(self):
+        async with (
+            FakeGrocyServer(generate_dataset(50)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            await api.retrieve_data(force=True)
+            grocy.fail("api/objects/stock", times=None)
+            grocy.touch()
+            await api.retrieve_data()
+
+            grocy.clear_failures()
+            products = grocy.request_count("api/objects/products")
+            stock = grocy.request_count("api/objects/stock")
+            await api.retrieve_data()
+
+            assert api.stale_tables == set()
+            assert grocy.request_count("api/objects/products") == products
+            assert grocy.request_count("api/objects/stock") > stock
+
+    @pytest.mark.asyncio
+    async def test_required_table_without_good_version_keeps_previous_data(self):
+        async with (
+            FakeGrocyServer(generate_dataset(20)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            grocy.fail("api/objects/products", times=None)
+            grocy.fail("api/objects/locations", times=None)
+
+            assert await api.retrieve_data(force=True) == {}
+            assert api.stale_tables == {"products", "locations"}
+
+            # Locations are optional: the refresh completes without them.
+            grocy.clear_failures()
+            grocy.fail("api/objects/locations", times=None)
+            result = await api.retrieve_data()
+            assert len(result["homeassistant_products"]) == 20
+            assert result["locations"] == []
@@ -0,0 +1,39 @@
+"""Tests for the content-hashed frontend assets."""
+
+import gzip
+
+from custom_components.shopping_list_with_grocy.frontend import fingerprint_assets
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def make_frontend(tmp_path, module=b"export default 1;"):
+    tmp_path.mkdir(exist_ok=True)
+    (tmp_path / "suggestion-card.js").write_bytes(module)
+    translations = tmp_path / "translations"
+    translations.mkdir()
+    (translations / "en.json").write_text('{"a": "b"}')
+    return tmp_path
+
+
+# ── fingerprint_assets ───────────────────────────────────────────────────────
+
+
+class TestFingerprintAssets:
+    def test_names_carry_content_hash(self, tmp_path):
+        assets = fingerprint_assets(str(make_frontend(tmp_path)))
+
+        name, path = assets["suggestion-card.js"]
+        assert name.startswith("suggestion-card.") and name.endswith(".js")
+        assert path == str(tmp_path / "suggestion-card.js")
+        assert assets["translations/en.json"][0].startswith("translations/en.")
+
+    def test_hash_follows_content(self, tmp_path):
+        first = fingerprint_assets(str(make_frontend(tmp_path / "a", b"one")))
+        second = fingerprint_assets(str(make_frontend(tmp_path / "b", b"two")))
+        assert first["suggestion-card.js"][0] != second["suggestion-card.js"][0]
+
+    def test_gzip_variant_is_written(self, tmp_path):
+        fingerprint_assets(str(make_frontend(tmp_path)))
+        compressed = (tmp_path / "suggestion-card.js.gz").read_bytes()
+        assert gzip.decompress(compressed) == b"export default 1;"
@@ -0,0 +1,223 @@
+"""Tests for the on-disk picture cache and its thumbnail view."""
+
+import asyncio
+import io
+import os
+import threading
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+from PIL import Image
+
+from custom_components.shopping_list_with_grocy.image_cache import (
+    SOURCE_WIDTH,
+    GrocyImageView,
+    ImageCache,
+    thumbnail_width,
+)
+from tests.fake_grocy import FakeGrocyServer, generate_dataset, make_api, make_hass
+
+
+def jpeg(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (10, 200, 30)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+async def settle(api) -> None:
+    """Wait for the picture work started by the last refresh, pruning included."""
+    await api._image_kickoff
+    for _ in range(400):
+        summary = api.image_scheduler.summary()
+        if not summary["queued"] and not summary["in_flight"]:
+            break
+        await asyncio.sleep(0.005)
+    else:
+        raise AssertionError("image queue did not drain")
+    if api._image_writes:
+        await asyncio.wait(set(api._image_writes))
+
+
+# ── cache ────────────────────────────────────────────────────────────────────
+
+
+class TestImageCache:
+    def test_thumbnails_are_resized_and_encoded(self, tmp_path):
+        cache = ImageCache(str(tmp_path))
+        key = cache.key("milk.jpg")
+        cache.store_source(key, jpeg(400, 300))
+
+        data = cache.thumbnail(key, 50)
+
+        with Image.open(io.BytesIO(data)) as image:
+            assert image.size == (50, 38)
+            assert image.format == ("WEBP" if cache.webp else "JPEG")
+        assert os.path.exists(tmp_path / f"{key}_50.{cache.extension}")
+
+    def test_small_pictures_are_not_enlarged(self, tmp_path):
+        cache = ImageCache(str(tmp_path))
+        key = cache.key("small.jpg")
+        cache.store_source(key, jpeg(80, 60))
+
+        with Image.open(io.BytesIO(cache.thumbnail(key, 150))) as image:
+            assert image.size == (80, 60)
+
+    def test_keys_are_stable_but_secret(self, tmp_path):
+        key = ImageCache(str(tmp_path)).key("milk.jpg")
+        assert ImageCache(str(tmp_path)).key("milk.jpg") == key
+        assert ImageCache(str(tmp_path / "other")).key("milk.jpg") != key
+
+    def test_unreadable_source_is_discarded(self, tmp_path):
+        cache = ImageCache(str(tmp_path))
+        key = cache.key("broken.jpg")
+        cache.store_source(key, b"<html>not a picture</html>")
+
+        assert cache.thumbnail(key, 50) is None
+        assert not cache.has_source(key)
+
+    def test_prune_keeps_wanted_pictures(self, tmp_path):
+        cache = ImageCache(str(tmp_path))
+        for name in ("a.jpg", "b.jpg"):
+            key = cache.key(name)
+            cache.store_source(key, jpeg(100, 100))
+            cache.thumbnail(key, 50)
+
+        assert cache.prune({"a.jpg"}) == 1
+        assert cache.has_source(cache.key("a.jpg"))
+        assert not cache.has_source(cache.key("b.jpg"))
+        assert len(os.listdir(tmp_path)) == 3
+
+    def test_served_sizes(self):
+        assert thumbnail_width("icon") == 50
+        assert thumbnail_width("full") == SOURCE_WIDTH
+        assert thumbnail_width("100") == 100
+        assert thumbnail_width("123") is None
+        assert thumbnail_width("huge") is None
+
+
+# ── view ─────────────────────────────────────────────────────────────────────
+
+
+class TestImageView:
+    @pytest.mark.asyncio
+    async def test_serves_thumbnails_with_their_content_type(self, tmp_path):
+        cache = ImageCache(str(tmp_path))
+        key = cache.key("milk.jpg")
+        cache.store_source(key, jpeg(400, 300))
+        request = MagicMock()
+        request.app = {"hass": make_hass()}
+        view = GrocyImageView(cache)
+
+        response = await view.get(request, key, "card")
+
+        assert response.status == 200
+        assert response.content_type == cache.content_type
+        assert "immutable" in response.headers["Cache-Control"]
+        with Image.open(io.BytesIO(response.body)) as image:
+            assert image.width == 150
+
+    @pytest.mark.asyncio
+    async def test_unknown_pictures_and_sizes_are_not_found(self, tmp_path):
+        cache = ImageCache(str(tmp_path))
+        key = cache.key("milk.jpg")
+        cache.store_source(key, jpeg(400, 300))
+        request = MagicMock()
+        request.app = {"hass": make_hass()}
+        view = GrocyImageView(cache)
+
+        assert (await view.get(request, key, "1000")).status == 404
+        assert (await view.get(request, "../secret", "card")).status == 404
+        assert (await view.get(request, cache.key("tea.jpg"), "card")).status == 404
+
+
+# ── API integration ──────────────────────────────────────────────────────────
+
+
+class TestApiImageCache:
+    @pytest.mark.asyncio
+    async def test_changing_the_image_size_does_not_download_again(self, tmp_path):
+        data = generate_dataset(20, picture_ratio=0.5)
+        pictures = sum(1 for p in data["products"] if p["picture_file_name"])
+        async with FakeGrocyServer(data) as grocy, aiohttp.ClientSession() as session:
+            api = make_api(
+                grocy, session, make_hass(str(tmp_path)), image_download_size=50
+            )
+            await api.retrieve_data(force=True)
+            await settle(api)
+            assert grocy.request_count("api/files/productpictures") == pictures
+
+            api = make_api(
+                grocy, session, make_hass(str(tmp_path)), image_download_size=200
+            )
+            result = await api.retrieve_data(force=True)
+            await settle(api)
+
+            assert grocy.request_count("api/files/productpictures") == pictures
+            assert api.image_scheduler.summary()["fetched"] == pictures
+            product = next(p for p in data["products"] if p["picture_file_name"])
+            attributes = result["homeassistant_products"][str(product["id"])][
+                "attributes"
+            ]
+            assert attributes["entity_picture"].endswith("/200")
+
+    @pytest.mark.asyncio
+    async def test_pictures_of_removed_products_are_pruned(self, tmp_path):
+        data = generate_dataset(10, picture_ratio=1.0)
+        async with FakeGrocyServer(data) as grocy, aiohttp.ClientSession() as session:
+            hass = make_hass(str(tmp_path))
+            api = make_api(grocy, session, hass, image_download_size=50)
+            await api.retrieve_data(force=True)
+            await settle(api)
+
+            removed = data["products"].pop()
+            grocy.touch()
+            await api.retrieve_data()
+            await settle(api)
+
+            key = api.image_cache.key(removed["picture_file_name"])
+            assert not api.image_cache.has_source(key)
+            assert api.image_cache.has_source(
+                api.image_cache.key(data["products"][0]["picture_file_name"])
+            )
+
+    @pytest.mark.asyncio
+    async def test_pruning_waits_for_cancelled_downloads_to_finish_writing(
+        self, tmp_path
+    ):
+        data = generate_dataset(3, picture_ratio=1.0)
+        async with (
+            FakeGrocyServer(data) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(
+                grocy, session, make_hass(str(tmp_path)), image_download_size=50
+            )
+            writing, release = threading.Event(), threading.Event()
+            store_source = api.image_cache.store_source
+
+            def slow_store_source(key, data):
+                writing.set()
+                release.wait(5)
+                store_source(key, data)
+
+            api.image_cache.store_source = slow_store_source
+            await api.retrieve_data(force=True)
+            await api._image_kickoff
+            for _ in range(400):
+                if writing.is_set():
+                    break
+                await asyncio.sleep(0.005)
+
+            removed = data["products"].pop()
+            grocy.touch()
+            await api.retrieve_data()
+            await asyncio.sleep(0.05)
+            # The removed product's download was cancelled, its write was not.
+            assert not api._image_kickoff.done()
+
+            release.set()
+            await settle(api)
+            assert not api.image_cache.has_source(
+                api.image_cache.key(removed["picture_file_name"])
+            )
@@ -0,0 +1,163 @@
+"""Tests for the prioritized product picture downloads."""
+
+import asyncio
+
+import aiohttp
+import pytest
+
+from custom_components.shopping_list_with_grocy.apis.image_scheduler import (
+    PRIORITY_CATALOG,
+    PRIORITY_FEATURED,
+    PRIORITY_SHOPPING_LIST,
+    ImageScheduler,
+)
+from tests.fake_grocy import FakeGrocyServer, generate_dataset, make_api, make_hass
+
+
+class RecordingFetch:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.started: list[str] = []
+        self.finished: list[str] = []
+
+    async def __call__(self, product_id: str, picture: str) -> bool:
+        self.started.append(product_id)
+        await asyncio.sleep(self.delay)
+        self.finished.append(product_id)
+        return True
+
+
+async def drain(scheduler: ImageScheduler) -> None:
+    for _ in range(200):
+        summary = scheduler.summary()
+        if not summary["queued"] and not summary["in_flight"]:
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("image queue did not drain")
+
+
+# ── ordering ─────────────────────────────────────────────────────────────────
+
+
+class TestImageScheduler:
+    @pytest.mark.asyncio
+    async def test_downloads_by_priority(self):
+        fetch = RecordingFetch()
+        scheduler = ImageScheduler(make_hass(), fetch, concurrency=1)
+        scheduler.schedule(
+            {
+                "1": (PRIORITY_CATALOG, "a.jpg"),
+                "2": (PRIORITY_SHOPPING_LIST, "b.jpg"),
+                "3": (PRIORITY_FEATURED, "c.jpg"),
+                "4": (PRIORITY_SHOPPING_LIST, "d.jpg"),
+            }
+        )
+        await drain(scheduler)
+
+        assert fetch.started == ["2", "4", "3", "1"]
+        assert scheduler.summary()["fetched"] == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        fetch = RecordingFetch(delay=0.01)
+        scheduler = ImageScheduler(make_hass(), fetch, concurrency=2)
+        scheduler.schedule({str(i): (PRIORITY_CATALOG, "p.jpg") for i in range(6)})
+        await asyncio.sleep(0.001)
+
+        assert scheduler.summary()["in_flight"] == 2
+        await drain(scheduler)
+        assert len(fetch.finished) == 6
+
+    @pytest.mark.asyncio
+    async def test_products_no_longer_wanted_are_cancelled(self):
+        fetch = RecordingFetch(delay=0.05)
+        scheduler = ImageScheduler(make_hass(), fetch, concurrency=1)
+        scheduler.schedule(
+            {
+                "1": (PRIORITY_SHOPPING_LIST, "a.jpg"),
+                "2": (PRIORITY_CATALOG, "b.jpg"),
+            }
+        )
+        await asyncio.sleep(0.01)
+
+        scheduler.schedule({"3": (PRIORITY_CATALOG, "c.jpg")})
+        await drain(scheduler)
+
+        assert fetch.started == ["1", "3"]
+        assert fetch.finished == ["3"]
+        assert scheduler.summary()["cancelled"] == 2
+
+    @pytest.mark.asyncio
+    async def test_rescheduling_raises_the_priority(self):
+        fetch = RecordingFetch(delay=0.01)
+        scheduler = ImageScheduler(make_hass(), fetch, concurrency=1)
+        scheduler.schedule(
+            {
+                "1": (PRIORITY_CATALOG, "a.jpg"),
+                "2": (PRIORITY_CATALOG, "b.jpg"),
+                "3": (PRIORITY_CATALOG, "c.jpg"),
+            }
+        )
+        await asyncio.sleep(0.001)
+        scheduler.schedule(
+            {
+                "1": (PRIORITY_CATALOG, "a.jpg"),
+                "2": (PRIORITY_CATALOG, "b.jpg"),
+                "3": (PRIORITY_SHOPPING_LIST, "c.jpg"),
+            }
+        )
+        await drain(scheduler)
+
+        assert fetch.started == ["1", "3", "2"]
+
+
+# ── API integration ──────────────────────────────────────────────────────────
+
+
+class TestApiImages:
+    @pytest.mark.asyncio
+    async def test_pictures_are_downloaded_once_and_reused(self):
+        data = generate_dataset(40, picture_ratio=0.5)
+        pictures = sum(1 for p in data["products"] if p["picture_file_name"])
+        async with FakeGrocyServer(data) as grocy, aiohttp.ClientSession() as session:
+            api = make_api(grocy, session, image_download_size=50)
+            await api.retrieve_data(force=True)
+            await asyncio.sleep(0)
+            await drain(api.image_scheduler)
+            assert grocy.request_count("api/files/productpictures") == pictures
+
+            grocy.touch()
+            result = await api.retrieve_data()
+            await asyncio.sleep(0)
+            await drain(api.image_scheduler)
+
+            assert grocy.request_count("api/files/productpictures") == pictures
+            with_picture = next(p for p in data["products"] if p["picture_file_name"])
+            attributes = result["homeassistant_products"][str(with_picture["id"])][
+                "attributes"
+            ]
+            assert attributes["entity_picture"].startswith(
+                "/api/shopping_list_with_grocy/images/"
+            )
+            assert attributes["product_image"]
+
+    @pytest.mark.asyncio
+    async def test_on_demand_mode_skips_the_rest_of_the_catalog(self):
+        data = generate_dataset(40, picture_ratio=1.0, shopping_list_ratio=0.1)
+        on_lists = {
+            item["product_id"]
+            for item in data["shopping_list"]
+            if item["product_id"] is not None
+        }
+        async with FakeGrocyServer(data) as grocy, aiohttp.ClientSession() as session:
+            api = make_api(
+                grocy,
+                session,
+                image_download_size=50,
+                on_demand_product_sensors=True,
+            )
+            await api.retrieve_data(force=True)
+            await asyncio.sleep(0)
+            await drain(api.image_scheduler)
+
+            assert grocy.request_count("api/files/productpictures") == len(on_lists)
@@ -0,0 +1,68 @@
+"""Tests for the event-loop blocking watchdog."""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from custom_components.shopping_list_with_grocy.loop_watchdog import LoopWatchdog
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def watch(root: str, run) -> LoopWatchdog:
+    watchdog = LoopWatchdog(
+        asyncio.get_running_loop(), threshold=0.05, interval=0.005, root=root
+    )
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.02)
+        run()
+        await asyncio.sleep(0.03)
+    finally:
+        watchdog.stop()
+    return watchdog
+
+
+# ── attribution ──────────────────────────────────────────────────────────────
+
+
+class TestLoopWatchdog:
+    @pytest.mark.asyncio
+    async def test_blocking_function_is_attributed_and_logged(self, caplog):
+        watchdog = await watch(TESTS_DIR, lambda: block_loop(0.2))
+
+        summary = watchdog.summary()
+        # Scheduler hiccups on a busy test machine may add stalls of their own.
+        assert summary["stalls"] >= 1
+        stats = summary["functions"]["test_loop_watchdog.py:block_loop"]
+        assert stats["count"] == 1
+        assert stats["max_ms"] >= 150
+        assert "time.sleep" in stats["last_stack"]
+        assert "blocked the event loop" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_stall_outside_the_root_is_only_counted(self, tmp_path):
+        watchdog = await watch(str(tmp_path), lambda: block_loop(0.2))
+
+        summary = watchdog.summary()
+        assert summary["stalls"] >= 1
+        assert summary["unattributed_stalls"] == summary["stalls"]
+        assert summary["functions"] == {}
+
+    @pytest.mark.asyncio
+    async def test_short_slices_are_ignored(self):
+        watchdog = await watch(TESTS_DIR, lambda: block_loop(0.01))
+        # Scheduler hiccups may count as stalls, but block_loop is not blamed.
+        assert watchdog.summary()["functions"] == {}
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_the_timer(self):
+        watchdog = await watch(TESTS_DIR, lambda: None)
+        assert not watchdog.running
+        assert watchdog._timer is None
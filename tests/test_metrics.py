@@ -0,0 +1,187 @@
+"""Tests for the refresh metrics and the diagnostics built from them."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.shopping_list_with_grocy.metrics import (
+    RefreshMetrics,
+    percentile,
+)
+
+# ── percentile ───────────────────────────────────────────────────────────────
+
+
+class TestPercentile:
+    def test_empty_values_have_no_percentile(self):
+        assert percentile([], 50) is None
+
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 100) == 100
+
+    def test_single_value(self):
+        assert percentile([7], 95) == 7
+
+
+# ── RefreshMetrics ───────────────────────────────────────────────────────────
+
+
+class TestRefreshMetrics:
+    def test_records_phases_requests_and_pages(self):
+        metrics = RefreshMetrics()
+        metrics.start_refresh()
+        with metrics.phase("fetch_products"):
+            metrics.record_request()
+            metrics.record_page("products", 120)
+            metrics.record_page("products", 2)
+        record = metrics.finish_refresh(products=3, changed_products=1)
+
+        assert record["requests"] == 1
+        assert record["bytes"] == 122
+        assert record["pages"] == {"products": 2}
+        assert record["changed_products"] == 1
+        assert set(record["phases"]) == {"fetch_products", "total"}
+        assert metrics.last is record
+
+    def test_late_phase_is_added_to_the_last_refresh(self):
+        metrics = RefreshMetrics()
+        metrics.start_refresh()
+        metrics.finish_refresh()
+        metrics.add_phase("coordinator_merge", 4.5)
+
+        assert metrics.last["phases"]["coordinator_merge"] == 4.5
+
+    def test_counters_are_ignored_outside_a_refresh(self):
+        metrics = RefreshMetrics()
+        metrics.record_request()
+        metrics.record_page("stock", 10)
+        metrics.add_phase("fetch", 1)
+
+        assert metrics.summary()["refreshes"] == 0
+
+    def test_window_is_rolling(self):
+        metrics = RefreshMetrics(window=3)
+        for requests in range(5):
+            metrics.start_refresh()
+            for _ in range(requests):
+                metrics.record_request()
+            metrics.finish_refresh()
+
+        summary = metrics.summary()
+        assert summary["refreshes"] == 3
+        assert summary["requests"]["max"] == 4
+        assert summary["requests"]["p50"] == 3
+
+    def test_summary_reports_phase_percentiles(self):
+        metrics = RefreshMetrics()
+        for duration in (10, 20, 30):
+            metrics.start_refresh()
+            metrics.add_phase("transform", duration)
+            metrics.finish_refresh()
+
+        transform = metrics.summary()["phases_ms"]["transform"]
+        assert transform == {"count": 3, "p50": 20, "p95": 30, "max": 30}
+
+    def test_images_are_summarised_separately(self):
+        metrics = RefreshMetrics()
+        metrics.record_image(12.0, 1000)
+        metrics.record_image(8.0, 500)
+
+        summary = metrics.summary()
+        assert summary["images_ms"]["max"] == 12.0
+        assert summary["image_bytes"] == 1500
+
+
+# ── API instrumentation ──────────────────────────────────────────────────────
+
+
+def make_api():
+    from custom_components.shopping_list_with_grocy.apis.shopping_list_with_grocy import (
+        ShoppingListWithGrocyApi,
+    )
+
+    hass = MagicMock()
+    hass.config.language = "en"
+    hass.data = {}
+    hass.async_create_task = lambda coro, *args, **kwargs: asyncio.ensure_future(coro)
+    config = {
+        "api_url": "http://grocy.local",
+        "api_key": "test-key",
+        "image_download_size": 0,
+        "disable_timeout": True,
+    }
+    return ShoppingListWithGrocyApi(MagicMock(), hass, config)
+
+
+def make_response(payload, body=b"[]"):
+    response = MagicMock()
+    response.status = 200
+    response.read = AsyncMock(return_value=body)
+    response.json = AsyncMock(return_value=payload)
+    return response
+
+
+class TestApiInstrumentation:
+    @pytest.mark.asyncio
+    async def test_fetch_list_counts_requests_pages_and_bytes(self):
+        api = make_api()
+        api.pagination_limit = 2
+        api.web_session.request = AsyncMock(
+            side_effect=[
+                make_response([{"id": 1}, {"id": 2}], b"x" * 40),
+                make_response([{"id": 3}], b"x" * 20),
+                make_response([], b"[]"),
+            ]
+        )
+
+        api.metrics.start_refresh()
+        data = await api.fetch_list("stock")
+        record = api.metrics.finish_refresh()
+
+        assert len(data) == 3
+        assert record["requests"] == 3
+        assert record["pages"] == {"stock": 3}
+        assert record["bytes"] == 62
+        assert "fetch_stock" in record["phases"]
+
+
+# ── diagnostics ──────────────────────────────────────────────────────────────
+
+
+class TestDiagnostics:
+    @pytest.mark.asyncio
+    async def test_redacts_secrets_and_includes_metrics(self):
+        from custom_components.shopping_list_with_grocy.const import DOMAIN
+        from custom_components.shopping_list_with_grocy.diagnostics import (
+            async_get_config_entry_diagnostics,
+        )
+
+        api = make_api()
+        api.metrics.start_refresh()
+        api.metrics.finish_refresh(products=2, changed_products=1)
+
+        coordinator = MagicMock()
+        coordinator.api = api
+        coordinator.data = {"homeassistant_products": {"1": {}, "2": {}}}
+        coordinator.last_refresh_state_writes = 1
+
+        entry = MagicMock()
+        entry.entry_id = "entry"
+        entry.data = {"api_url": "http://grocy.local", "api_key": "secret"}
+        entry.options = {"api_key": "secret", "webhook_id": "hook"}
+
+        hass = MagicMock()
+        hass.data = {DOMAIN: {"entry": coordinator}}
+
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+        assert diagnostics["entry"]["data"]["api_key"] == "**REDACTED**"
+        assert diagnostics["entry"]["options"]["webhook_id"] == "**REDACTED**"
+        assert diagnostics["entry"]["data"]["api_url"] == "http://grocy.local"
+        assert diagnostics["coordinator"]["products"] == 2
+        assert diagnostics["refresh"]["refreshes"] == 1
+        assert diagnostics["refresh"]["last_refresh"]["changed_products"] == 1
@@ -10,6 +10,8 @@ from unittest.mock import MagicMock
 
 from custom_components.shopping_list_with_grocy.ml_engine import (
     PurchasePredictionEngine,
+    merge_history,
+    statistics_to_history,
 )
 from custom_components.shopping_list_with_grocy.analysis_const import (
     DEFAULT_SCORE_THRESHOLD,
@@ -178,3 +180,41 @@ class TestShouldSuggest:
     def test_zero_score_never_suggests(self):
         engine = make_engine()
         assert engine.should_suggest_purchase({"score": 0.0}) is False
+
+
+# ── Long-term statistics ──────────────────────────────────────────────────────
+
+
+def stat_row(days_ago: int, period_max) -> dict:
+    return {"start": utc(days_ago).timestamp(), "max": period_max}
+
+
+class TestStatisticsToHistory:
+    def test_days_on_list_count_once(self):
+        rows = [stat_row(5, 0), stat_row(4, 2), stat_row(3, 2), stat_row(2, 0)]
+        history = statistics_to_history(rows)
+        assert [entry["state"] for entry in history] == ["2.0", "0.0"]
+        assert history[0]["last_changed"].tzinfo is not None
+
+    def test_missing_max_is_skipped(self):
+        rows = [{"start": utc(3).timestamp(), "max": None}, stat_row(2, 1)]
+        assert [entry["state"] for entry in statistics_to_history(rows)] == ["1.0"]
+
+    def test_covers_a_full_year(self):
+        rows = []
+        for days_ago in range(360, 0, -30):
+            rows += [stat_row(days_ago, 1), stat_row(days_ago - 1, 0)]
+        history = statistics_to_history(rows)
+
+        assert len(history) == 24
+        months = {entry["last_changed"].month for entry in history}
+        assert len(months) >= 11
+
+    def test_recent_raw_states_replace_statistics(self):
+        recent_start = utc(10)
+        merged = merge_history(
+            statistics_to_history([stat_row(20, 1), stat_row(5, 3)]),
+            make_history((2, 3)),
+            recent_start,
+        )
+        assert [entry["state"] for entry in merged] == ["1.0", "2"]
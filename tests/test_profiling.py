@@ -0,0 +1,80 @@
+"""Tests for the profiling services helpers."""
+
+import asyncio
+import cProfile
+import os
+import pstats
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.shopping_list_with_grocy.profiling import (
+    async_profile,
+    profile_summary,
+)
+
+
+def make_hass(tmp_path):
+    loop = asyncio.get_running_loop()
+    hass = MagicMock()
+    hass.config.path = lambda name: str(tmp_path / name)
+    hass.async_add_executor_job = lambda target, *args: loop.run_in_executor(
+        None, target, *args
+    )
+    return hass
+
+
+def busy(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+# ── summary ──────────────────────────────────────────────────────────────────
+
+
+class TestProfileSummary:
+    def test_sorted_by_own_time_and_limited(self):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        busy(20000)
+        profiler.disable()
+
+        rows = profile_summary(pstats.Stats(profiler), 3)
+        assert len(rows) == 3
+        own = [row["own_ms"] for row in rows]
+        assert own == sorted(own, reverse=True)
+        assert set(rows[0]) == {"function", "calls", "own_ms", "cumulative_ms"}
+
+
+# ── async_profile ────────────────────────────────────────────────────────────
+
+
+class TestAsyncProfile:
+    @pytest.mark.asyncio
+    async def test_writes_profile_and_returns_summary(self, tmp_path):
+        async def target():
+            await asyncio.sleep(0)
+            busy(20000)
+
+        result = await async_profile(make_hass(tmp_path), "refresh", target, 10)
+
+        assert os.path.exists(result["pstats_file"])
+        assert os.path.exists(result["summary_file"])
+        assert os.path.basename(result["pstats_file"]).startswith(
+            "shopping_list_with_grocy_profile_refresh_"
+        )
+        assert 0 < len(result["top"]) <= 10
+        profiled = pstats.Stats(result["pstats_file"]).stats
+        assert any(name == "busy" for _, _, name in profiled)
+
+    @pytest.mark.asyncio
+    async def test_profiler_is_disabled_when_target_fails(self, tmp_path):
+        async def target():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await async_profile(make_hass(tmp_path), "voice_add", target, 10)
+
+        # A new profiler can start, so the failed one was disabled.
+        profiler = cProfile.Profile()
+        profiler.enable()
+        profiler.disable()
@@ -0,0 +1,287 @@
+"""Tests for the Grocy request limiter, circuit breaker, timeouts and retries."""
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from custom_components.shopping_list_with_grocy.apis.resilience import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    AdaptiveTimeout,
+    CircuitBreaker,
+    CircuitOpenError,
+    RequestLimiter,
+    TokenBucket,
+    backoff_delay,
+    endpoint_class,
+    retry_deadline,
+)
+from tests.fake_grocy import TABLES, FakeGrocyServer, generate_dataset, make_api
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.before_request()
+        breaker.record_failure("timeout")
+
+
+# ── limiter ──────────────────────────────────────────────────────────────────
+
+
+class TestRequestLimiter:
+    @pytest.mark.asyncio
+    async def test_token_bucket_spaces_requests_after_the_burst(self):
+        bucket = TokenBucket(rate=50, burst=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        # Two tokens up front, two more at 50 per second.
+        assert time.monotonic() - started >= 0.035
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        limiter = RequestLimiter(concurrency=2)
+        peak = 0
+
+        async def run():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(run() for _ in range(6)))
+        assert peak == 2
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_throttling_is_counted(self):
+        limiter = RequestLimiter(concurrency=4, rate=100, burst=1)
+        for _ in range(3):
+            async with limiter.slot():
+                pass
+        assert limiter.summary()["throttled_requests"] == 2
+
+
+# ── circuit breaker ──────────────────────────────────────────────────────────
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+        open_breaker(breaker)
+        assert breaker.state == STATE_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        assert breaker.summary()["rejected_requests"] == 1
+
+    def test_success_resets_the_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+        breaker.record_failure("timeout")
+        breaker.record_failure("timeout")
+        breaker.record_success()
+        breaker.record_failure("timeout")
+        assert breaker.state == STATE_CLOSED
+
+    def test_half_open_allows_a_single_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        open_breaker(breaker)
+
+        breaker.before_request()
+        assert breaker.state == STATE_HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+        breaker.record_success()
+        assert breaker.state == STATE_CLOSED
+        breaker.before_request()
+
+    def test_failed_probe_doubles_the_open_period(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        open_breaker(breaker)
+        breaker._opened_at -= 10
+
+        breaker.before_request()
+        breaker.record_failure("timeout")
+        assert breaker.state == STATE_OPEN
+        assert breaker.reset_timeout == 20
+
+    def test_cancelled_probe_lets_another_one_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        open_breaker(breaker)
+        breaker.before_request()
+        breaker.abandon()
+        breaker.before_request()
+
+
+# ── timeouts and retries ─────────────────────────────────────────────────────
+
+
+class TestAdaptiveTimeout:
+    def test_ceiling_until_enough_samples(self):
+        adaptive = AdaptiveTimeout(floor=5, ceiling=60, min_samples=3)
+        adaptive.observe(0.1)
+        adaptive.observe(0.1)
+        assert adaptive.current == 60
+
+    def test_follows_latency_within_bounds(self):
+        adaptive = AdaptiveTimeout(floor=1, ceiling=60, factor=3)
+        for _ in range(20):
+            adaptive.observe(2.0)
+        assert adaptive.current == pytest.approx(6.0, rel=0.2)
+
+        fast = AdaptiveTimeout(floor=5, ceiling=60)
+        for _ in range(20):
+            fast.observe(0.01)
+        assert fast.current == 5
+
+    def test_timeouts_raise_the_estimate(self):
+        adaptive = AdaptiveTimeout(floor=1, ceiling=60, min_samples=1)
+        for _ in range(10):
+            adaptive.observe(0.5)
+        before = adaptive.current
+        adaptive.observe_timeout()
+        assert adaptive.current > before
+        assert adaptive.summary()["timeouts"] == 1
+
+
+class TestRetryHelpers:
+    def test_backoff_grows_with_jitter_and_is_capped(self):
+        for attempt in range(6):
+            delay = min(8.0, 0.5 * 2**attempt)
+            assert delay / 2 <= backoff_delay(attempt) <= delay
+        assert len({backoff_delay(3) for _ in range(10)}) > 1
+
+    def test_retry_deadline_covers_every_attempt_and_pause(self):
+        assert retry_deadline(10, 2, base=0.5) == 30 + 0.5 + 1
+        assert retry_deadline(10, 0) == 10
+        assert retry_deadline(1, 6, base=4) == 7 + 4 + 8 * 5
+
+    def test_endpoint_classes(self):
+        assert endpoint_class("api/system/db-changed-time") == "system"
+        assert endpoint_class("api/objects/products?limit=40") == "page"
+        assert endpoint_class("api/files/productpictures/eA==") == "image"
+
+
+# ── API integration ──────────────────────────────────────────────────────────
+
+
+class TestApiResilience:
+    @pytest.mark.asyncio
+    async def test_server_errors_open_the_breaker_and_fail_fast(self):
+        async with (
+            FakeGrocyServer(generate_dataset(10)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            grocy.fail("api/system", status=500, times=None)
+
+            for _ in range(api.breaker.failure_threshold):
+                with pytest.raises(aiohttp.ClientError):
+                    await api.fetch_last_db_changed_time()
+            sent = grocy.request_count()
+
+            with pytest.raises(CircuitOpenError):
+                await api.fetch_last_db_changed_time()
+            assert grocy.request_count() == sent
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_open_the_breaker(self):
+        async with (
+            FakeGrocyServer(generate_dataset(10)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            grocy.fail("api/system", status=404, times=None)
+
+            for _ in range(api.breaker.failure_threshold + 1):
+                with pytest.raises(aiohttp.ClientError):
+                    await api.fetch_last_db_changed_time()
+            assert api.breaker.state == STATE_CLOSED
+
+    @pytest.mark.asyncio
+    async def test_bodies_are_read_within_the_concurrency_limit(self):
+        async with (
+            FakeGrocyServer(generate_dataset(10)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session, max_concurrent_requests=2)
+            reading = 0
+            peak = 0
+            send = session.request
+
+            async def counting_request(*args, **kwargs):
+                response = await send(*args, **kwargs)
+                read = response.read
+
+                async def counted_read():
+                    nonlocal reading, peak
+                    if response._body is not None:
+                        return await read()
+                    reading += 1
+                    peak = max(peak, reading)
+                    try:
+                        await asyncio.sleep(0.01)
+                        return await read()
+                    finally:
+                        reading -= 1
+
+                response.read = counted_read
+                return response
+
+            session.request = counting_request
+            await asyncio.gather(*(api.fetch_list(table) for table in TABLES))
+
+            assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_timed_out_page_is_retried(self):
+        async with (
+            FakeGrocyServer(generate_dataset(10)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            timeouts = iter([TimeoutError(), None])
+            send = session.request
+
+            async def flaky_request(*args, **kwargs):
+                error = next(timeouts, None)
+                if error is not None:
+                    raise error
+                return await send(*args, **kwargs)
+
+            session.request = flaky_request
+            products = await api.fetch_list("products")
+
+            assert len(products) == 10
+            assert api.retried_requests == 1
+            assert api.timeouts["page"].timeouts == 1
+
+    @pytest.mark.asyncio
+    async def test_hung_page_is_retried_on_a_cold_refresh(self):
+        async with (
+            FakeGrocyServer(generate_dataset(10)) as grocy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = make_api(grocy, session)
+            # No latency observed yet: pages get the whole fixed timeout.
+            api.compute_timeout = lambda: 0.3
+            api.timeouts["page"] = AdaptiveTimeout(0.1, api.compute_timeout())
+            hung = []
+            send = session.request
+
+            async def hanging_request(method, url, *args, **kwargs):
+                if "objects/stock" in url and not hung:
+                    hung.append(url)
+                    await asyncio.sleep(10)
+                return await send(method, url, *args, **kwargs)
+
+            session.request = hanging_request
+            await api.retrieve_data(force=True)
+
+            assert hung
+            assert api.retried_requests == 1
+            assert api.timeouts["page"].timeouts == 1
+            assert not api.stale_tables
@@ -0,0 +1,122 @@
+"""Tests for product sensor helpers in the sensor platform."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.const import MATCH_ALL
+
+from custom_components.shopping_list_with_grocy.entity_index import get_entity_index
+from custom_components.shopping_list_with_grocy.sensor import (
+    COMPACT_UNRECORDED_ATTRIBUTES,
+    CompactDynamicProductSensor,
+    DynamicProductSensor,
+    MinimalDynamicProductSensor,
+    product_sensor_class,
+    product_unrecorded_attributes,
+)
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def make_sensor(qty):
+    coordinator = MagicMock()
+    coordinator._parsed_data = {
+        "1": {"product_id": 1, "name": "Lait", "qty_in_shopping_lists": qty}
+    }
+    return DynamicProductSensor(coordinator, coordinator._parsed_data["1"])
+
+
+# ── native_value ─────────────────────────────────────────────────────────────
+
+
+class TestNativeValue:
+    def test_integer_quantity(self):
+        assert make_sensor(3).native_value == 3
+
+    def test_restored_string_quantity(self):
+        assert make_sensor("2").native_value == 2
+        assert make_sensor("1.5").native_value == 1.5
+
+    def test_invalid_quantity(self):
+        assert make_sensor("unknown").native_value is None
+
+
+# ── State writes ─────────────────────────────────────────────────────────────
+
+
+class TestStateWrites:
+    def test_unchanged_product_is_written_once(self):
+        sensor = make_sensor(1)
+        sensor.async_write_ha_state = MagicMock()
+
+        sensor._handle_product_update()
+        sensor._handle_product_update()
+        sensor.coordinator._parsed_data["1"]["qty_in_shopping_lists"] = 2
+        sensor._handle_product_update()
+
+        assert sensor.async_write_ha_state.call_count == 2
+        assert sensor.coordinator.record_state_write.call_count == 2
+
+
+# ── Entity index ─────────────────────────────────────────────────────────────
+
+
+class TestEntityIndex:
+    @pytest.mark.asyncio
+    async def test_removed_sensor_leaves_the_index(self):
+        sensor = make_sensor(1)
+        sensor.hass = MagicMock(data={})
+        index = get_entity_index(sensor.hass)
+        index.add_product(1, sensor.entity_id)
+
+        await sensor.async_will_remove_from_hass()
+
+        assert index.product_entity_ids() == []
+
+
+# ── Recorder profiles ────────────────────────────────────────────────────────
+
+
+class TestRecorderProfiles:
+    def test_profile_classes(self):
+        assert product_sensor_class("full") is DynamicProductSensor
+        assert product_sensor_class("compact") is CompactDynamicProductSensor
+        assert product_sensor_class("minimal") is MinimalDynamicProductSensor
+        assert product_sensor_class("bogus") is CompactDynamicProductSensor
+
+    def test_compact_skips_bulky_and_list_details(self):
+        attributes = {
+            "userfields": {},
+            "product_image": "...",
+            "list_1_qty": 2,
+            "list_1_note": "bio",
+            "list_1_shop_list_id": 10,
+        }
+        unrecorded = product_unrecorded_attributes("compact", attributes)
+
+        assert {"userfields", "product_image", "list_1_note"} <= unrecorded
+        assert "list_1_shop_list_id" in unrecorded
+        assert "list_1_qty" not in unrecorded
+
+    def test_full_and_minimal(self):
+        assert product_unrecorded_attributes("full", {"list_1_note": ""}) == set()
+        assert product_unrecorded_attributes("minimal", {}) == {MATCH_ALL}
+
+    def test_compact_entity_writes_skip_list_details(self):
+        coordinator = MagicMock()
+        product = {"product_id": 1, "name": "Lait", "qty_in_shopping_lists": 1}
+        coordinator._parsed_data = {"1": product}
+        sensor = CompactDynamicProductSensor(coordinator, product)
+        sensor.hass = MagicMock(loop_thread_id=threading.get_ident())
+        sensor.platform = MagicMock()
+        # What Home Assistant sets when the entity is added.
+        sensor._state_info = {"unrecorded_attributes": COMPACT_UNRECORDED_ATTRIBUTES}
+
+        product["attributes"] = {"list_2_qty": 1, "list_2_note": "bio"}
+        sensor._handle_product_update()
+
+        state_info = sensor.hass.states.async_set_internal.call_args.args[5]
+        assert "list_2_note" in state_info["unrecorded_attributes"]
+        assert "list_2_qty" not in state_info["unrecorded_attributes"]
+        assert "userfields" in state_info["unrecorded_attributes"]
@@ -0,0 +1,106 @@
+"""Tests for helpers and services of the services module."""
+
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.shopping_list_with_grocy import services
+from custom_components.shopping_list_with_grocy.const import DOMAIN, SERVICE_CAPTURE
+from custom_components.shopping_list_with_grocy.services import (
+    _grocy_product_id,
+    async_setup_services,
+    async_stop_traffic_capture,
+    query_products,
+)
+from tests.fake_grocy import make_hass
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def make_products():
+    return {
+        "1": {
+            "name": "Lait",
+            "qty_in_shopping_lists": 2,
+            "attributes": {"qty_in_stock": 0, "min_stock_amount": 0},
+        },
+        "2": {
+            "name": "Pain de mie",
+            "qty_in_shopping_lists": 0,
+            "attributes": {"qty_in_stock": 4, "min_stock_amount": 1},
+        },
+        "3": {
+            "name": "Pain complet",
+            "qty_in_shopping_lists": 0,
+            "attributes": {"qty_in_stock": 0, "min_stock_amount": 1},
+        },
+    }
+
+
+# ── _grocy_product_id ────────────────────────────────────────────────────────
+
+
+class TestGrocyProductId:
+    def test_plain_id(self):
+        assert _grocy_product_id(" 42 ") == "42"
+
+    def test_entity_id(self):
+        assert (
+            _grocy_product_id("sensor.shopping_list_with_grocy_product_v2_42") == "42"
+        )
+
+
+# ── query_products ───────────────────────────────────────────────────────────
+
+
+class TestQueryProducts:
+    def test_search_is_case_insensitive(self):
+        results = query_products(make_products(), search="PAIN")
+        assert [r["product_id"] for r in results] == ["2", "3"]
+
+    def test_interesting_only(self):
+        results = query_products(make_products(), interesting_only=True)
+        assert [r["product_id"] for r in results] == ["1", "3"]
+
+    def test_flags_and_limit(self):
+        results = query_products(
+            make_products(), pinned={"2"}, materialized={"1": "sensor.x"}, limit=2
+        )
+        assert len(results) == 2
+        assert results[0]["materialized"] and not results[0]["pinned"]
+        assert results[1]["pinned"] and results[1]["interesting"]
+        assert results[1]["entity_id"].endswith("_product_v2_2")
+
+
+# ── capture_traffic ──────────────────────────────────────────────────────────
+
+
+class TestCaptureTraffic:
+    @pytest.mark.asyncio
+    async def test_running_capture_is_saved_on_unload(self, tmp_path, monkeypatch):
+        hass = make_hass(str(tmp_path))
+        api = MagicMock(capture=None)
+        hass.data[DOMAIN]["instances"] = {"api": api}
+        cancel_timer = MagicMock()
+        monkeypatch.setattr(
+            services, "async_call_later", MagicMock(return_value=cancel_timer)
+        )
+        async_setup_services(hass)
+        capture_traffic = next(
+            call.args[2]
+            for call in hass.services.async_register.call_args_list
+            if call.args[1] == SERVICE_CAPTURE
+        )
+
+        result = await capture_traffic(
+            MagicMock(data={"anonymize": True, "duration": 60})
+        )
+        api.capture.record_error("GET", "api/objects/products", None, "timeout", 0)
+        await async_stop_traffic_capture(hass)
+
+        assert api.capture is None
+        assert os.path.exists(result["path"])
+        cancel_timer.assert_called_once()
+        hass.bus.async_listen.return_value.assert_called_once()
+        assert "stop_capture" not in hass.data[DOMAIN]
@@ -0,0 +1,176 @@
+"""Tests for the cached, background-refreshed shopping suggestions."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.util import dt
+
+from custom_components.shopping_list_with_grocy.const import DOMAIN
+from custom_components.shopping_list_with_grocy.suggestions import (
+    SuggestionManager,
+    suggestion_candidates,
+    suggestions_age,
+    suggestions_delta,
+)
+
+COMPUTE = (
+    "custom_components.shopping_list_with_grocy.suggestions.async_compute_suggestions"
+)
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def make_manager(**suggestions):
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"suggestions": suggestions}}
+    with patch("custom_components.shopping_list_with_grocy.suggestions.Store"):
+        manager = SuggestionManager(hass)
+    manager._store.async_save = AsyncMock()
+    return manager
+
+
+def make_coordinator(**versions):
+    coordinator = MagicMock()
+    coordinator.todo_list_versions = versions
+    return coordinator
+
+
+# ── Candidates ───────────────────────────────────────────────────────────────
+
+
+class TestCandidates:
+    def test_products_without_a_sensor_are_candidates(self):
+        from custom_components.shopping_list_with_grocy.entity_index import (
+            get_entity_index,
+            product_entity_id,
+        )
+
+        hass = MagicMock()
+        coordinator = MagicMock()
+        coordinator._parsed_data = {"1": {"name": "Lait"}, "2": {"name": "Pain"}}
+        hass.data = {DOMAIN: {"instances": {"coordinator": coordinator}}}
+        get_entity_index(hass).add_product("1", "sensor.milk")
+
+        assert suggestion_candidates(hass) == {
+            "sensor.milk": "Lait",
+            product_entity_id("2"): "Pain",
+        }
+
+
+# ── suggestions_age ──────────────────────────────────────────────────────────
+
+
+class TestSuggestionsAge:
+    def test_no_result(self):
+        assert suggestions_age({"last_update": None}) is None
+
+    def test_aware_and_naive_timestamps(self):
+        now = dt.utcnow()
+        aware = (now - timedelta(minutes=5)).isoformat()
+        assert suggestions_age({"last_update": aware}, now) == timedelta(minutes=5)
+
+        naive = dt.as_local(now - timedelta(hours=2)).replace(tzinfo=None)
+        age = suggestions_age({"last_update": naive.isoformat()}, now)
+        assert abs(age - timedelta(hours=2)) < timedelta(seconds=1)
+
+
+# ── Cached results ───────────────────────────────────────────────────────────
+
+
+class TestCachedResults:
+    @pytest.mark.asyncio
+    async def test_cached_result_is_returned(self):
+        manager = make_manager(
+            products=[{"id": "sensor.a"}], last_update=dt.now().isoformat(), version=4
+        )
+        with patch(COMPUTE, AsyncMock()) as compute:
+            result = await manager.async_get(timedelta(hours=1))
+
+        compute.assert_not_awaited()
+        assert result["version"] == 4
+
+    @pytest.mark.asyncio
+    async def test_old_result_is_recomputed_and_saved(self):
+        old = (dt.now() - timedelta(hours=3)).isoformat()
+        manager = make_manager(products=[], last_update=old, version=4)
+        with patch(COMPUTE, AsyncMock(return_value=[{"id": "sensor.b"}])):
+            result = await manager.async_get(timedelta(hours=1))
+
+        assert result["version"] == 5
+        assert result["products"] == [{"id": "sensor.b"}]
+        manager._store.async_save.assert_awaited_once()
+        manager.hass.states.async_set.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_missing_result_is_computed(self):
+        manager = make_manager(products=[], last_update=None)
+        with patch(COMPUTE, AsyncMock(return_value=[])):
+            result = await manager.async_get()
+
+        assert result["version"] == 1
+        assert result["last_update"]
+
+
+# ── Change-triggered refresh ─────────────────────────────────────────────────
+
+
+class TestChangeTrigger:
+    def test_refresh_after_enough_changes(self):
+        manager = make_manager()
+        manager.analysis_settings = {"refresh_after_changes": 3}
+        manager._seen_list_versions = {"1": 1, "2": 1}
+        manager.async_refresh = MagicMock()
+
+        manager._handle_lists_update(make_coordinator(**{"1": 2, "2": 1}))
+        manager.hass.async_create_background_task.assert_not_called()
+
+        manager._handle_lists_update(make_coordinator(**{"1": 3, "2": 2}))
+        manager.hass.async_create_background_task.assert_called_once()
+
+    def test_zero_disables_change_trigger(self):
+        manager = make_manager()
+        manager.analysis_settings = {"refresh_after_changes": 0}
+        manager._seen_list_versions = {"1": 1}
+
+        manager._handle_lists_update(make_coordinator(**{"1": 50}))
+        manager.hass.async_create_background_task.assert_not_called()
+
+
+# ── Deltas ───────────────────────────────────────────────────────────────────
+
+
+class TestDeltas:
+    def test_delta_between_results(self):
+        previous = [{"id": "a", "score": 0.5}, {"id": "b", "score": 0.4}]
+        current = [{"id": "a", "score": 0.6}, {"id": "c", "score": 0.9}]
+        assert suggestions_delta(previous, current) == {
+            "added": [{"id": "c", "score": 0.9}],
+            "updated": [{"id": "a", "score": 0.6}],
+            "removed": ["b"],
+        }
+
+    @pytest.mark.asyncio
+    async def test_remove_publishes_new_version(self):
+        manager = make_manager(
+            products=[{"id": "a"}, {"id": "b"}], last_update="x", version=2
+        )
+        sent = []
+        with patch(
+            "custom_components.shopping_list_with_grocy.suggestions.async_dispatcher_send",
+            lambda hass, signal, delta: sent.append(delta),
+        ):
+            assert await manager.async_remove("a") is True
+            assert await manager.async_remove("missing") is False
+
+        assert manager.data["products"] == [{"id": "b"}]
+        assert sent == [
+            {
+                "version": 3,
+                "last_update": "x",
+                "added": [],
+                "updated": [],
+                "removed": ["a"],
+            }
+        ]
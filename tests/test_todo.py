@@ -0,0 +1,96 @@
+"""Tests for ShoppingListWithGrocyTodoListEntity local item handling.
+
+The entity is built on a MagicMock hass and coordinator; state writes are
+recorded instead of reaching a state machine.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.components.todo import TodoItem, TodoItemStatus
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def make_entity(*names):
+    """Return a todo entity for list 1 holding one product per name."""
+    from custom_components.shopping_list_with_grocy.const import DOMAIN
+    from custom_components.shopping_list_with_grocy.todo import (
+        ShoppingListWithGrocyTodoListEntity,
+    )
+
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"shopping_lists": []}}
+    hass.config_entries.async_entries.return_value = []
+    hass.async_create_task = lambda coro, *args, **kwargs: coro.close()
+
+    coordinator = MagicMock()
+    coordinator.api.update_grocy_shoppinglist_product = AsyncMock()
+    coordinator.api.remove_product_from_shopping_list = AsyncMock()
+    coordinator.async_refresh = AsyncMock()
+
+    data = {
+        "id": 1,
+        "name": "Courses",
+        "products": [
+            {
+                "name": name,
+                "shop_list_id": index + 10,
+                "status": TodoItemStatus.NEEDS_ACTION,
+            }
+            for index, name in enumerate(names)
+        ],
+    }
+    entity = ShoppingListWithGrocyTodoListEntity(hass, coordinator, data)
+    entity.async_write_ha_state = MagicMock()
+    return entity
+
+
+# ── todo_items cache ─────────────────────────────────────────────────────────
+
+
+class TestTodoItemsCache:
+    def test_items_are_cached_between_reads(self):
+        entity = make_entity("Lait", "Pain")
+        first = entity.todo_items
+        assert [item.uid for item in first] == ["10", "11"]
+        assert entity.todo_items is first
+
+    @pytest.mark.asyncio
+    async def test_update_changes_only_target_item(self):
+        entity = make_entity("Lait", "Pain")
+        before = entity.todo_items
+
+        await entity.async_update_todo_item(
+            TodoItem(summary="Pain", uid="11", status=TodoItemStatus.COMPLETED)
+        )
+
+        after = entity.todo_items
+        assert after is not before
+        assert [item.status for item in after] == [
+            TodoItemStatus.NEEDS_ACTION,
+            TodoItemStatus.COMPLETED,
+        ]
+        entity.api.update_grocy_shoppinglist_product.assert_awaited_once_with(11, True)
+
+    @pytest.mark.asyncio
+    async def test_failed_update_is_rolled_back(self):
+        entity = make_entity("Lait")
+        entity.api.update_grocy_shoppinglist_product.side_effect = RuntimeError
+
+        with pytest.raises(RuntimeError):
+            await entity.async_update_todo_item(
+                TodoItem(summary="Lait", uid="10", status=TodoItemStatus.COMPLETED)
+            )
+
+        assert entity.todo_items[0].status == TodoItemStatus.NEEDS_ACTION
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_items(self):
+        entity = make_entity("Lait", "Pain", "Sel")
+        assert len(entity.todo_items) == 3
+
+        await entity.async_delete_todo_items(["10", "12"])
+
+        assert [item.summary for item in entity.todo_items] == ["Pain"]
+        assert [product["name"] for product in entity._data["products"]] == ["Pain"]
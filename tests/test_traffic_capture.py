@@ -0,0 +1,156 @@
+"""Tests for the Grocy traffic capture and its replay."""
+
+import asyncio
+import base64
+
+import aiohttp
+import pytest
+
+from custom_components.shopping_list_with_grocy.apis.traffic_capture import (
+    REPLAY_ORIGIN,
+    Anonymizer,
+    ReplaySession,
+    TrafficCapture,
+    load_capture,
+)
+from tests.fake_grocy import FakeGrocyServer, generate_dataset, make_api, make_hass
+
+
+def make_replay_api(session):
+    from custom_components.shopping_list_with_grocy.apis.shopping_list_with_grocy import (
+        ShoppingListWithGrocyApi,
+    )
+
+    api = ShoppingListWithGrocyApi(
+        session,
+        make_hass(),
+        {
+            "api_url": REPLAY_ORIGIN,
+            "api_key": "replay",
+            "max_requests_per_second": 0,
+        },
+    )
+    api.retry_backoff = 0.001
+    return api
+
+
+async def capture_refresh(data, anonymize=True) -> TrafficCapture:
+    async with FakeGrocyServer(data) as grocy, aiohttp.ClientSession() as session:
+        api = make_api(grocy, session)
+        api.capture = TrafficCapture(anonymize)
+        await api.retrieve_data(force=True)
+        assert len(api.capture.entries) == grocy.request_count()
+        return api.capture
+
+
+# ── Anonymizer ───────────────────────────────────────────────────────────────
+
+
+class TestAnonymizer:
+    def test_pseudonyms_are_stable_within_a_capture(self):
+        anonymizer = Anonymizer()
+        assert anonymizer.pseudonym("Milk", "name") == anonymizer.pseudonym(
+            "Milk", "name"
+        )
+        assert anonymizer.pseudonym("Milk", "name") != Anonymizer().pseudonym(
+            "Milk", "name"
+        )
+
+    def test_replaces_personal_fields_only(self):
+        data = Anonymizer().data(
+            [{"id": 3, "name": "Milk", "note": "", "userfields": {"brand": "X"}}]
+        )
+        assert data[0]["id"] == 3
+        assert data[0]["name"].startswith("name-")
+        assert data[0]["note"] == ""
+        assert data[0]["userfields"]["brand"].startswith("userfields-")
+
+    def test_picture_url_matches_the_anonymized_file_name(self):
+        anonymizer = Anonymizer()
+        encoded = base64.b64encode(b"milk.jpg").decode()
+        url = anonymizer.url(f"api/files/productpictures/{encoded}?best_fit_width=100")
+
+        name = anonymizer.pseudonym("milk.jpg", "picture_file_name")
+        assert name.endswith(".jpg")
+        assert base64.b64encode(name.encode()).decode() in url
+        assert url.endswith("?best_fit_width=100")
+
+
+# ── capture ──────────────────────────────────────────────────────────────────
+
+
+class TestCapture:
+    @pytest.mark.asyncio
+    async def test_records_anonymized_responses(self):
+        data = generate_dataset(50)
+        capture = await capture_refresh(data)
+
+        products = next(
+            entry
+            for entry in capture.entries
+            if entry["url"].startswith("api/objects/products")
+        )
+        names = {product["name"] for product in data["products"]}
+        assert products["status"] == 200
+        assert products["response"]["json"]
+        assert not names & {p["name"] for p in products["response"]["json"]}
+
+    @pytest.mark.asyncio
+    async def test_save_and_load_round_trip(self, tmp_path):
+        capture = await capture_refresh(generate_dataset(20))
+        path = str(tmp_path / "capture.jsonl.gz")
+        capture.save(path)
+
+        meta, entries = load_capture(path)
+        assert meta["anonymized"] is True
+        assert meta["entries"] == len(entries) == len(capture.entries)
+
+    def test_entries_beyond_the_limit_are_dropped(self):
+        capture = TrafficCapture(max_entries=1)
+        capture.record_error("GET", "a", None, "timeout", 0)
+        capture.record_error("GET", "b", None, "timeout", 0)
+        assert len(capture.entries) == 1
+        assert capture.dropped == 1
+
+
+# ── replay ───────────────────────────────────────────────────────────────────
+
+
+class TestReplay:
+    @pytest.mark.asyncio
+    async def test_replayed_refresh_matches_the_captured_one(self):
+        data = generate_dataset(100)
+        capture = await capture_refresh(data)
+
+        session = ReplaySession(capture.entries)
+        api = make_replay_api(session)
+        result = await api.retrieve_data(force=True)
+
+        assert set(result["homeassistant_products"]) == {
+            str(product["id"]) for product in data["products"]
+        }
+        assert session.unmatched == []
+        assert session.requests == len(capture.entries)
+
+    @pytest.mark.asyncio
+    async def test_polling_repeats_the_last_response(self):
+        capture = await capture_refresh(generate_dataset(10))
+        api = make_replay_api(ReplaySession(capture.entries))
+
+        first = await api.fetch_last_db_changed_time()
+        assert await api.fetch_last_db_changed_time() == first
+
+    @pytest.mark.asyncio
+    async def test_recorded_timeout_is_raised_again(self):
+        session = ReplaySession(
+            [{"method": "GET", "url": "api/system/db-changed-time", "error": "timeout"}]
+        )
+        with pytest.raises(asyncio.TimeoutError):
+            await make_replay_api(session).fetch_last_db_changed_time()
+
+    @pytest.mark.asyncio
+    async def test_unknown_request_is_reported(self):
+        session = ReplaySession([])
+        with pytest.raises(aiohttp.ClientError):
+            await make_replay_api(session).fetch_last_db_changed_time()
+        assert session.unmatched == ["GET api/system/db-changed-time"]
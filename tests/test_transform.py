@@ -0,0 +1,176 @@
+"""Tests for the executor-side transformation of raw Grocy tables."""
+
+from custom_components.shopping_list_with_grocy.transform import (
+    fingerprint,
+    group_by_product,
+    is_interesting_product,
+    parse_products,
+    transform_grocy_data,
+)
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def make_data():
+    """Return a small but complete set of raw Grocy tables."""
+    return {
+        "products": [
+            {
+                "id": "1",
+                "name": "Lait",
+                "qu_id_purchase": "2",
+                "qu_id_stock": "1",
+                "qu_factor_purchase_to_stock": 6.0,
+                "location_id": "1",
+                "product_group_id": "1",
+            },
+            {
+                "id": "2",
+                "name": "Pain",
+                "qu_id_purchase": "1",
+                "qu_id_stock": "1",
+                "qu_factor_purchase_to_stock": 1.0,
+            },
+        ],
+        "shopping_lists": [{"id": 1, "name": "Courses"}, {"id": 2, "name": "Drive"}],
+        "shopping_list": [
+            {
+                "id": "10",
+                "product_id": "1",
+                "shopping_list_id": 1,
+                "amount": 12,
+                "done": 0,
+            },
+            {
+                "id": "11",
+                "product_id": "1",
+                "shopping_list_id": 2,
+                "amount": 6,
+                "done": 1,
+            },
+            {
+                "id": "12",
+                "product_id": None,
+                "shopping_list_id": 1,
+                "amount": 1,
+                "done": 0,
+            },
+        ],
+        "stock": [
+            {"product_id": "1", "amount": "4", "open": "1"},
+            {"product_id": "1", "amount": "2", "open": "0"},
+        ],
+        "locations": [{"id": "1", "name": "Frigo"}],
+        "product_groups": [{"id": "1", "name": "Laitages"}],
+        "quantity_units": [
+            {"id": "1", "name": "Bouteille"},
+            {"id": "2", "name": "Pack"},
+        ],
+    }
+
+
+# ── group_by_product ─────────────────────────────────────────────────────────
+
+
+class TestGroupByProduct:
+    def test_groups_by_string_id(self):
+        grouped = group_by_product(make_data()["shopping_list"])
+        assert set(grouped) == {"1"}
+        assert [row["id"] for row in grouped["1"]] == ["10", "11"]
+
+    def test_skips_rows_without_product(self):
+        grouped = group_by_product([{"product_id": None}])
+        assert dict(grouped) == {}
+
+
+# ── parse_products ───────────────────────────────────────────────────────────
+
+
+class TestParseProducts:
+    def test_aggregates_stock_and_lists(self):
+        products = parse_products(make_data())
+        milk = products["1"]
+
+        assert milk["qty_in_shopping_lists"] == 3
+        assert milk["attributes"]["qty_in_stock"] == 6.0
+        assert milk["attributes"]["qty_opened"] == 4.0
+        assert milk["attributes"]["qty_unopened"] == 2.0
+        assert milk["attributes"]["list_count"] == 2
+        assert milk["attributes"]["list_1_qty"] == 2
+        assert milk["attributes"]["list_2_shop_list_id"] == 11
+        assert milk["attributes"]["location"] == "Frigo"
+        assert milk["attributes"]["group"] == "Laitages"
+        assert milk["attributes"]["qty_unit_purchase"] == "Pack"
+
+    def test_product_without_rows(self):
+        bread = parse_products(make_data())["2"]
+        assert bread["qty_in_shopping_lists"] == 0
+        assert bread["attributes"]["qty_in_stock"] == 0
+        assert bread["attributes"]["list_count"] == 0
+
+
+# ── fingerprint ──────────────────────────────────────────────────────────────
+
+
+class TestFingerprint:
+    def test_independent_of_key_order(self):
+        assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+
+    def test_changes_with_value(self):
+        assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+# ── transform_grocy_data ─────────────────────────────────────────────────────
+
+
+class TestTransformGrocyData:
+    def test_output_shape(self):
+        result = transform_grocy_data(make_data())
+
+        assert set(result["homeassistant_products"]) == {"1", "2"}
+        assert set(result["product_hashes"]) == {"1", "2"}
+        assert set(result["shopping_list_hashes"]) == {"1", "2"}
+        assert [len(lst["products"]) for lst in result["shopping_lists_data"]] == [
+            1,
+            1,
+        ]
+
+    def test_hashes_only_change_for_touched_product(self):
+        data = make_data()
+        before = transform_grocy_data(data)["product_hashes"]
+
+        data["stock"].append({"product_id": "2", "amount": "1", "open": "0"})
+        after = transform_grocy_data(data)["product_hashes"]
+
+        assert before["1"] == after["1"]
+        assert before["2"] != after["2"]
+
+
+# ── is_interesting_product ───────────────────────────────────────────────────
+
+
+class TestIsInterestingProduct:
+    def _product(self, on_list=0, stock=0, min_stock=0):
+        return {
+            "product_id": 5,
+            "qty_in_shopping_lists": on_list,
+            "attributes": {"qty_in_stock": stock, "min_stock_amount": min_stock},
+        }
+
+    def test_on_shopping_list(self):
+        assert is_interesting_product(self._product(on_list=1))
+
+    def test_below_min_stock(self):
+        assert is_interesting_product(self._product(stock=1, min_stock="2"))
+
+    def test_stocked_product_is_not_interesting(self):
+        assert not is_interesting_product(self._product(stock=3, min_stock=2))
+        assert not is_interesting_product(self._product())
+
+    def test_pinned(self):
+        assert is_interesting_product(self._product(), pinned={"5"})
+
+    def test_restored_string_quantity(self):
+        assert is_interesting_product(self._product(on_list="2"))
+        assert not is_interesting_product(self._product(on_list="unknown"))
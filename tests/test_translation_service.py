@@ -0,0 +1,90 @@
+"""Tests for the in-memory translation service."""
+
+import json
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.shopping_list_with_grocy.const import DOMAIN
+from custom_components.shopping_list_with_grocy.translation_service import (
+    TranslationService,
+    flatten_translations,
+)
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def write_bundles(tmp_path, language, backend, frontend):
+    backend_dir = tmp_path / "backend"
+    frontend_dir = tmp_path / "frontend"
+    backend_dir.mkdir(exist_ok=True)
+    frontend_dir.mkdir(exist_ok=True)
+    (backend_dir / f"{language}.json").write_text(json.dumps(backend))
+    (frontend_dir / f"{language}.json").write_text(json.dumps({DOMAIN: frontend}))
+    return str(backend_dir), str(frontend_dir)
+
+
+def make_service(tmp_path, bundles):
+    for language, (backend, frontend) in bundles.items():
+        paths = write_bundles(tmp_path, language, backend, frontend)
+    hass = MagicMock()
+
+    async def run_in_executor(func, *args):
+        return func(*args)
+
+    hass.async_add_executor_job = run_in_executor
+    return TranslationService(hass, *paths)
+
+
+# ── flatten_translations ─────────────────────────────────────────────────────
+
+
+class TestFlatten:
+    def test_dotted_keys(self):
+        tree = {"a": {"b": "x", "c": {"d": "y"}}, "e": "z", "n": 1}
+        assert flatten_translations(tree) == {"a.b": "x", "a.c.d": "y", "e": "z"}
+
+
+# ── TranslationService ───────────────────────────────────────────────────────
+
+
+class TestTranslationService:
+    @pytest.mark.asyncio
+    async def test_backend_and_frontend_in_one_map(self, tmp_path):
+        service = make_service(
+            tmp_path,
+            {
+                "en": ({"issues": {"t": "Issue"}}, {"voice_responses": {"v": "Hi"}}),
+                "fr": ({"issues": {"t": "Problème"}}, {}),
+            },
+        )
+        await service.async_load("en")
+        await service.async_load("fr")
+
+        assert service.lookup("issues.t", "fr") == "Problème"
+        assert service.lookup("voice_responses.v", "fr") == "Hi"
+        assert service.lookup("missing", "fr") is None
+        assert service.frontend_bundle("fr") == {"voice_responses": {"v": "Hi"}}
+
+    @pytest.mark.asyncio
+    async def test_changed_file_is_reloaded(self, tmp_path):
+        service = make_service(tmp_path, {"en": ({"k": "old"}, {})})
+        await service.async_load("en")
+
+        backend_file = tmp_path / "backend" / "en.json"
+        backend_file.write_text(json.dumps({"k": "new"}))
+        mtime = os.path.getmtime(backend_file) + 10
+        os.utime(backend_file, (mtime, mtime))
+        await service._async_reload_changed()
+
+        assert service.lookup("k", "en") == "new"
+
+    @pytest.mark.asyncio
+    async def test_malformed_file_loads_nothing(self, tmp_path):
+        service = make_service(tmp_path, {"en": ({"k": "v"}, {"f": "w"})})
+        (tmp_path / "backend" / "en.json").write_text("{not json")
+
+        await service.async_load("en")
+
+        assert service.lookup("k", "en") is None
@@ -0,0 +1,151 @@
+"""Tests for the suggestions websocket commands."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.shopping_list_with_grocy.const import DOMAIN
+from custom_components.shopping_list_with_grocy.suggestions import SuggestionManager
+from custom_components.shopping_list_with_grocy.websocket_api import (
+    page_suggestions,
+    websocket_accept_suggestion,
+    websocket_dismiss_suggestion,
+    websocket_subscribe_suggestions,
+)
+
+PRODUCTS = [
+    {"id": "sensor.a", "name": "banane", "score": 0.2, "confidence": 0.9},
+    {"id": "sensor.b", "name": "Avoine", "score": 0.8, "confidence": 0.1},
+    {"id": "sensor.c", "name": "citron", "score": 0.5, "confidence": 0.5},
+]
+
+MODULE = "custom_components.shopping_list_with_grocy"
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def make_hass():
+    """Return a stub hass holding a suggestion manager with PRODUCTS."""
+    hass = MagicMock()
+    coordinator = MagicMock()
+    coordinator.add_product = AsyncMock()
+    hass.data = {
+        DOMAIN: {
+            "instances": {"coordinator": coordinator},
+            "suggestions": {
+                "version": 1,
+                "last_update": "x",
+                "products": list(PRODUCTS),
+            },
+        }
+    }
+    with patch(f"{MODULE}.suggestions.Store"):
+        manager = SuggestionManager(hass)
+    manager._store.async_save = AsyncMock()
+    hass.data[DOMAIN]["suggestion_manager"] = manager
+    return hass
+
+
+class Dispatcher:
+    """Delivers the suggestion signals to the websocket subscriptions."""
+
+    def __init__(self) -> None:
+        self.targets = []
+
+    def connect(self, hass, signal, target):
+        self.targets.append(target)
+        return lambda: self.targets.remove(target)
+
+    def send(self, hass, signal, *args):
+        for target in list(self.targets):
+            target(*args)
+
+
+async def subscribe_and_run(hass, handler, msg):
+    """Subscribe connection 1 to the deltas, then run *handler* on connection 2.
+
+    Returns the events received by the subscription and the second connection.
+    """
+    dispatcher = Dispatcher()
+    subscriber, connection = MagicMock(), MagicMock()
+    subscriber.subscriptions = {}
+    with (
+        patch(f"{MODULE}.websocket_api.async_dispatcher_connect", dispatcher.connect),
+        patch(f"{MODULE}.suggestions.async_dispatcher_send", dispatcher.send),
+    ):
+        websocket_subscribe_suggestions(
+            hass, subscriber, {"id": 1, "type": f"{DOMAIN}/suggestions/subscribe"}
+        )
+        await handler.__wrapped__(hass, connection, {"id": 2, **msg})
+    events = [call.args[0]["event"] for call in subscriber.send_message.call_args_list]
+    return events, connection
+
+
+# ── page_suggestions ─────────────────────────────────────────────────────────
+
+
+class TestPageSuggestions:
+    def test_default_is_best_score_first(self):
+        page = page_suggestions(PRODUCTS)
+        assert page["total"] == 3
+        assert [p["id"] for p in page["items"]] == ["sensor.b", "sensor.c", "sensor.a"]
+
+    def test_paging(self):
+        page = page_suggestions(PRODUCTS, offset=1, limit=1)
+        assert page["total"] == 3
+        assert [p["id"] for p in page["items"]] == ["sensor.c"]
+
+    def test_sort_by_name_ignores_case(self):
+        page = page_suggestions(PRODUCTS, sort_by="name", descending=False)
+        assert [p["name"] for p in page["items"]] == ["Avoine", "banane", "citron"]
+
+
+# ── accept and dismiss ───────────────────────────────────────────────────────
+
+
+class TestAcceptAndDismiss:
+    @pytest.mark.asyncio
+    async def test_accept_adds_the_product_and_notifies_subscribers(self):
+        hass = make_hass()
+        events, connection = await subscribe_and_run(
+            hass,
+            websocket_accept_suggestion,
+            {"suggestion_id": "sensor.b", "quantity": 2, "shopping_list_id": 3},
+        )
+
+        coordinator = hass.data[DOMAIN]["instances"]["coordinator"]
+        coordinator.add_product.assert_awaited_once_with("sensor.b", 3, "", 2)
+        manager = hass.data[DOMAIN]["suggestion_manager"]
+        assert [p["id"] for p in manager.data["products"]] == ["sensor.a", "sensor.c"]
+        connection.send_result.assert_called_once_with(2, {"version": 2})
+        assert events[-1]["version"] == 2
+        assert events[-1]["removed"] == ["sensor.b"]
+
+    @pytest.mark.asyncio
+    async def test_dismiss_drops_the_suggestion_only(self):
+        hass = make_hass()
+        events, connection = await subscribe_and_run(
+            hass, websocket_dismiss_suggestion, {"suggestion_id": "sensor.a"}
+        )
+
+        hass.data[DOMAIN]["instances"]["coordinator"].add_product.assert_not_awaited()
+        manager = hass.data[DOMAIN]["suggestion_manager"]
+        assert [p["id"] for p in manager.data["products"]] == ["sensor.b", "sensor.c"]
+        connection.send_result.assert_called_once_with(2, {"version": 2})
+        assert events[-1]["removed"] == ["sensor.a"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_suggestion_is_an_error(self):
+        hass = make_hass()
+        for handler, msg in (
+            (websocket_accept_suggestion, {"quantity": 1, "shopping_list_id": 1}),
+            (websocket_dismiss_suggestion, {}),
+        ):
+            events, connection = await subscribe_and_run(
+                hass, handler, {"suggestion_id": "sensor.z", **msg}
+            )
+
+            connection.send_error.assert_called_once()
+            assert len(events) == 1
+        assert hass.data[DOMAIN]["suggestion_manager"].data["version"] == 1